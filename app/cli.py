@@ -0,0 +1,242 @@
+"""Bulk extraction without the HTTP API.
+
+    python -m app.cli extract <dir> [-o results.jsonl] [--workers N] [--db results.db]
+    python -m app.cli export results.db -o resumes.parquet
+
+Walks <dir>, extracts every file on a process pool and appends one JSON line
+per file to the output. The SHA-256 of each finished file is appended to a
+checkpoint (<output>.done by default), so an interrupted run picks up where
+it stopped; files already in the checkpoint are skipped, wherever they now
+live. A file is finished when it was extracted or its format was rejected;
+timeouts, memory errors and other failures are marked "retry" and tried
+again on the next run. With --db, successful results are also written to a SQLite result
+store (app/store.py) in batches; export dumps a store to JSONL, Parquet or
+Arrow.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set
+
+from app.pipeline import to_json
+from app.store import STORE_BATCH_SIZE, ResultStore, export
+from parsers import (InvalidDocumentError, ParseTimeoutError, UnsupportedFormatError, parse_file,
+                     parser_for)
+from parsers.sandbox import SANDBOX_MAX_JOBS, SANDBOX_MEMORY_MB
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Seconds between progress lines on stderr
+PROGRESS_INTERVAL = 5.0
+
+_completed: Set[str] = frozenset()
+
+# Failures that will fail the same way next time, so their files are checkpointed
+PERMANENT_ERRORS = (UnsupportedFormatError, InvalidDocumentError)
+
+
+def walk(root: str) -> Iterator[str]:
+    """Files under root in a stable order, skipping hidden files and directories"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if not name.startswith("."):
+                yield os.path.join(dirpath, name)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+@contextmanager
+def alarm_after(seconds: float):
+    """Raise ParseTimeoutError in this (main) thread after seconds"""
+    if (not hasattr(signal, "setitimer") or seconds <= 0
+            or threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise ParseTimeoutError(f"Parsing timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _init_worker(completed: Set[str], memory_mb: int):
+    global _completed
+    _completed = completed
+    # The pool worker is the sandbox here: same memory cap as the API's parse workers
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def process_file(path: str) -> Optional[dict]:
+    """One output record, or None when the file is already in the checkpoint"""
+    try:
+        digest = file_hash(path)
+    except OSError as e:
+        return {"path": path, "sha256": None, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    if digest in _completed:
+        return None
+    record = {"path": path, "sha256": digest}
+    try:
+        with alarm_after(parser_for(path).timeout):
+            data = to_json(parse_file(path))
+        record.update(status="success", data=data)
+    except MemoryError:
+        record.update(status="error", error="ParseResourceError: Parser exceeded its memory limit", retry=True)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}",
+                      retry=not isinstance(e, PERMANENT_ERRORS))
+    return record
+
+
+def _progress(done: int, skipped: int, errors: int, total: int, started: float) -> str:
+    elapsed = time.perf_counter() - started
+    rate = (done - skipped) / elapsed if elapsed else 0.0
+    remaining = total - done
+    eta = time.strftime("%H:%M:%S", time.gmtime(remaining / rate)) if rate else "--:--:--"
+    return (f"{done}/{total} files ({skipped} skipped, {errors} errors) "
+            f"{rate:.1f} files/s, ETA {eta}")
+
+
+def extract(root: str, output: str, checkpoint: str, workers: int, chunksize: int = 4,
+            log=None, store: Optional[ResultStore] = None, batch_size: int = STORE_BATCH_SIZE) -> dict:
+    """Extract every file under root; returns counts. Progress goes to log if given
+
+    Successful results also go to store, batch_size per transaction.
+    """
+    completed = load_checkpoint(checkpoint)
+    paths = list(walk(root))
+    counts = {"total": len(paths), "processed": 0, "skipped": 0, "errors": 0}
+    started = last_report = time.perf_counter()
+
+    if workers > 0:
+        # fork shares the already loaded spaCy model and taxonomies with the workers
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        pool = multiprocessing.get_context(method).Pool(
+            workers, _init_worker, (frozenset(completed), SANDBOX_MEMORY_MB),
+            maxtasksperchild=SANDBOX_MAX_JOBS)
+        results = pool.imap_unordered(process_file, paths, chunksize)
+    else:
+        pool = None
+        global _completed
+        _completed = frozenset(completed)
+        results = map(process_file, paths)
+
+    # Finished records not yet in the checkpoint: with a store, until their batch is committed
+    unsaved: List[dict] = []
+
+    def commit(done):
+        if store is not None:
+            store.save_many((r["sha256"], r["data"], r["path"]) for r in unsaved if r["status"] == "success")
+        done.writelines(r["sha256"] + "\n" for r in unsaved if not r.get("retry"))
+        done.flush()
+        unsaved.clear()
+
+    try:
+        with open(output, "a", encoding="utf-8") as out, open(checkpoint, "a", encoding="utf-8") as done:
+            for n, record in enumerate(results, 1):
+                if record is None:
+                    counts["skipped"] += 1
+                else:
+                    counts["processed"] += 1
+                    counts["errors"] += record["status"] == "error"
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    if record["sha256"]:
+                        # Output first: a crash in between repeats a line rather than losing one
+                        out.flush()
+                        unsaved.append(record)
+                        if store is None or len(unsaved) >= batch_size:
+                            commit(done)
+                now = time.perf_counter()
+                if log and now - last_report >= PROGRESS_INTERVAL:
+                    last_report = now
+                    print(_progress(n, counts["skipped"], counts["errors"], len(paths), started), file=log)
+            commit(done)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    counts["seconds"] = round(time.perf_counter() - started, 3)
+    if log:
+        print(_progress(len(paths), counts["skipped"], counts["errors"], len(paths), started)
+              + f" in {counts['seconds']:.1f}s", file=log)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("extract", help="extract every resume under a directory to JSONL")
+    cmd.add_argument("directory")
+    cmd.add_argument("-o", "--output", default="results.jsonl")
+    cmd.add_argument("--checkpoint", help="completed file hashes (default: <output>.done)")
+    cmd.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                     help="worker processes; 0 extracts in this process")
+    cmd.add_argument("--chunksize", type=int, default=4)
+    cmd.add_argument("--db", help="also store successful results in this SQLite file")
+    cmd.add_argument("--batch", type=int, default=STORE_BATCH_SIZE, help="results per store transaction")
+    cmd = commands.add_parser("export", help="dump a result store to JSONL, Parquet or Arrow")
+    cmd.add_argument("db")
+    cmd.add_argument("-o", "--output", required=True)
+    cmd.add_argument("--format", choices=("jsonl", "parquet", "arrow"),
+                     help="default: from the output extension")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        if not os.path.exists(args.db):
+            parser.error(f"no such store: {args.db}")
+        store = ResultStore(args.db)
+        try:
+            count = export(store, args.output, args.format)
+        except (ValueError, RuntimeError) as e:
+            parser.error(str(e))
+        finally:
+            store.close()
+        print(f"{count} results written to {args.output}", file=sys.stderr)
+        return
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    store = ResultStore(args.db) if args.db else None
+    try:
+        extract(args.directory, args.output, args.checkpoint or args.output + ".done",
+                args.workers, args.chunksize, log=sys.stderr, store=store, batch_size=args.batch)
+    finally:
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Request deadlines and the optional work they cut.
+
+A deadline is set for the request's context (deadline_ms on /extract, or
+DEGRADE_DEADLINE_MS when more than DEGRADE_QUEUE_DEPTH requests are in
+flight) and followed into the parse and pipeline threads by contextvars.
+Optional work asks allows() before it starts: the NER stage, the fuzzy
+skills pass, and PDF pages beyond what the parse budget covers. Whatever is
+left out is listed on the deadline so the response can say so.
+"""
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from app.metrics import METRICS
+from common.resources import SANDBOX_WORKERS
+
+# Requests in flight above which requests without a deadline get DEGRADE_DEADLINE_MS; 0 disables
+DEGRADE_QUEUE_DEPTH = int(os.environ.get("DEGRADE_QUEUE_DEPTH", str(4 * max(SANDBOX_WORKERS, 1))))
+DEGRADE_DEADLINE_MS = float(os.environ.get("DEGRADE_DEADLINE_MS", "5000"))
+
+
+class Deadline:
+    """A point in time.monotonic() and the work skipped to meet it"""
+
+    __slots__ = ("expires", "skipped", "_lock")
+
+    def __init__(self, seconds: float):
+        self.expires = time.monotonic() + seconds
+        self.skipped: List[str] = []
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return self.expires - time.monotonic()
+
+    def skip(self, what: str):
+        with self._lock:
+            if what not in self.skipped:
+                self.skipped.append(what)
+        METRICS.incr(f"deadline.skipped.{what.split()[0]}")
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def within(seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """Run the block under a deadline seconds from now; None leaves the block unbounded"""
+    if seconds is None:
+        yield None
+        return
+    deadline = Deadline(seconds)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def current() -> Optional[Deadline]:
+    return _current.get()
+
+
+def allows(what: str, seconds: float = 0.0) -> bool:
+    """Whether optional work expected to take seconds still fits; records it as skipped if not"""
+    deadline = _current.get()
+    if deadline is None or deadline.remaining() > seconds:
+        return True
+    deadline.skip(what)
+    return False
+
+
+def skip(what: str):
+    """Record work left out for the current deadline"""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.skip(what)
@@ -1,7 +1,30 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import Body, FastAPI, UploadFile, File, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import hashlib
+import json
 import tempfile
 import os
-from app.pipeline import extract_text, to_json
+import time
+from typing import Optional, Tuple
+from app import deadline, profiling, readiness, tracing
+from app.metrics import METRICS
+from app.pipeline import extract_text, run_pipeline, to_json
+from app.store import default_store
+from parsers import ParseResourceError, ParseTimeoutError, parser_for
+from parsers.archive import ARCHIVE_MAX_TOTAL_MB, ArchiveLimitError, open_archive, read_member
+from extractors.nlp import nlp
+from common.resources import SANDBOX_WORKERS
+from parsers.sandbox import sandbox_stats
+
+# Archive members parsed at once; each holds its decompressed bytes until done
+ARCHIVE_CONCURRENCY = int(os.environ.get("ARCHIVE_CONCURRENCY", str(max(SANDBOX_WORKERS, 1))))
+
+# /extract, /extract/stream and /extract/archive requests currently being handled; only touched on the event loop
+_in_flight = 0
+# Recent /extract latencies for /ready
+LATENCY = readiness.LatencyWindow()
 
 app = FastAPI(
     title="Resume Extractor API",
@@ -14,8 +37,15 @@ async def root():
     return {
         "message": "Resume Extractor API",
         "endpoints": {
-            "POST /extract": "Upload a resume file to extract data",
-            "GET /health": "Check API health"
+            "POST /extract": "Upload a resume file to extract data (?profile=1 for a timing breakdown)",
+            "POST /extract/stream": "Upload a resume; field groups stream back as NDJSON when ready",
+            "POST /extract/archive": "Upload a zip of resumes; results stream back as NDJSON",
+            "GET /health": "Check API health",
+            "GET /ready": "Readiness for load balancers; 503 when saturated",
+            "GET /resumes/{sha256}": "A stored result by the SHA-256 of its file (RESULT_DB)",
+            "GET /search": "Boolean and field search over stored results, e.g. ?q=python AND k8s, 5+ years",
+            "POST /rank": "Rank stored results against a job description ({\"job\": ..., \"k\": 20})",
+            "GET /metrics": "Stage timings and counters"
         }
     }
 
@@ -23,45 +53,329 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """Saturation of this replica; 503 when a READY_* threshold is crossed"""
+    pool = sandbox_stats()
+    queued = sum(pool["waiting"].values()) if pool else 0
+    p95 = LATENCY.percentile(95)
+    p95_ms = round(p95 * 1000, 1) if p95 is not None else None
+    reasons = readiness.saturation(_in_flight, queued, p95_ms, nlp is not None)
+    body = {
+        "status": "ready" if not reasons else "saturated",
+        "reasons": reasons,
+        "model_loaded": nlp is not None,
+        "in_flight": _in_flight,
+        "queue": pool,
+        "p95_ms": p95_ms,
+    }
+    return JSONResponse(body, status_code=200 if not reasons else 503)
+
+@app.get("/metrics")
+async def metrics():
+    snapshot = METRICS.snapshot()
+    counters = snapshot["counters"]
+    heuristic = counters.get("identity.tier.heuristic", 0)
+    answered = heuristic + counters.get("identity.tier.spacy", 0)
+    # Share of resumes whose name/location never needed spaCy
+    snapshot["spacy_bypass_rate"] = round(heuristic / answered, 4) if answered else None
+    snapshot["in_flight"] = _in_flight
+    return snapshot
+
+@app.get("/resumes/{sha256}")
+async def stored_resume(sha256: str):
+    """A result stored by /extract or the bulk CLI, looked up by the file's SHA-256"""
+    store = default_store()
+    if store is None:
+        raise HTTPException(404, "Result store is disabled (set RESULT_DB)")
+    record = await run_in_threadpool(store.get, sha256.lower())
+    if record is None:
+        raise HTTPException(404, "No stored result for this hash")
+    return record
+
+@app.get("/search")
+async def search_resumes(q: str, limit: int = Query(20, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    """
+    Stored resumes matching a boolean query, newest first
+
+    Terms are ANDed unless joined by OR; NOT excludes; fields narrow a term
+    (skill:, role:, company:, degree:, text:) and years:5+ or "5+ years"
+    filters on total experience. See app/search.py.
+    """
+    store = default_store()
+    if store is None:
+        raise HTTPException(404, "Result store is disabled (set RESULT_DB)")
+    started = time.perf_counter()
+    try:
+        results = await run_in_threadpool(store.search, q, limit, offset)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return {"query": q, "results": results, "ms": round((time.perf_counter() - started) * 1000, 2)}
+
+@app.post("/rank")
+async def rank_resumes(job: str = Body(..., embed=True), k: int = Body(20, embed=True, ge=1, le=1000)):
+    """
+    Stored resumes most similar to a job description, best first
+
+    Cosine similarity over TF-IDF vectors of words and taxonomy skills; each
+    result lists the job's skills the resume has. See app/ranking.py.
+    """
+    store = default_store()
+    if store is None:
+        raise HTTPException(404, "Result store is disabled (set RESULT_DB)")
+    started = time.perf_counter()
+    results = await run_in_threadpool(store.rank, job, k)
+    return {"results": results, "ms": round((time.perf_counter() - started) * 1000, 2)}
+
 @app.post("/extract")
-async def extract_resume(file: UploadFile = File(...)):
+async def extract_resume(file: UploadFile = File(...), profile: bool = False, hot: int = 0,
+                         deadline_ms: Optional[float] = None,
+                         x_profile_token: Optional[str] = Header(None),
+                         traceparent: Optional[str] = Header(None)):
     """
     Extract structured data from resume file
     
     Supports: PDF, DOCX, JPG, PNG
+
+    With ?profile=1 (and the X-Profile-Token header) the response also has a
+    "profile" timing breakdown; ?hot=N adds the N hottest functions. Every
+    response carries an X-Trace-Id header (taken from traceparent if sent).
+
+    With ?deadline_ms=N, optional work (NER, fuzzy skills, later PDF pages) is
+    skipped when it would not fit in N ms; the response then has
+    "partial": true and lists what was "skipped". Under load, requests without
+    a deadline get DEGRADE_DEADLINE_MS.
+
+    With RESULT_DB set, complete results are stored under the SHA-256 of the
+    file (X-Resume-Sha256) for GET /resumes/{sha256}.
     """
+    global _in_flight
+    trace_id = tracing.new_trace_id(traceparent)
+    headers = {"X-Trace-Id": trace_id}
+    if deadline_ms is None and 0 < deadline.DEGRADE_QUEUE_DEPTH <= _in_flight:
+        deadline_ms = deadline.DEGRADE_DEADLINE_MS
+        METRICS.incr("deadline.degraded")
+    _in_flight += 1
+    started = time.perf_counter()
     try:
-        # Validate file
-        if not file.filename:
-            raise HTTPException(400, "No file provided")
-        
-        # Save uploaded file temporarily
+        with tracing.root_span("POST /extract", trace_id, filename=file.filename or "") as request_span, \
+                deadline.within(deadline_ms / 1000 if deadline_ms is not None else None) as budget:
+            try:
+                payload = await _extract_upload(file, profile, hot, x_profile_token, headers)
+            except HTTPException as e:
+                request_span.set(status=e.status_code)
+                raise HTTPException(e.status_code, e.detail, headers=headers)
+            except Exception as e:
+                status, detail = _error_status(e)
+                request_span.set(status=status, error_type=type(e).__name__)
+                raise HTTPException(status, detail, headers=headers)
+            request_span.set(status=200)
+            if budget is not None:
+                request_span.set(deadline_ms=deadline_ms, skipped=",".join(budget.skipped))
+                if budget.skipped:
+                    payload.update(partial=True, skipped=list(budget.skipped))
+            with tracing.span("serialize"):
+                return JSONResponse(payload, headers=headers)
+    finally:
+        _in_flight -= 1
+        elapsed = time.perf_counter() - started
+        LATENCY.add(elapsed)
+        METRICS.observe("request.extract", elapsed)
+
+async def _extract_upload(file: UploadFile, profile: bool, hot: int, profile_token: Optional[str],
+                          headers: dict) -> dict:
+    if profile and not profiling.authorized(profile_token):
+        raise HTTPException(403, "Profiling is disabled" if not profiling.PROFILE_TOKEN else "Invalid profile token")
+    # Validate file
+    if not file.filename:
+        raise HTTPException(400, "No file provided")
+
+    with tracing.span("upload.read") as span:
+        content = await file.read()
+        span.set(bytes=len(content))
+    # Unsupported formats fail here, before anything touches the disk
+    with tracing.span("dispatch") as span:
+        parser_name = parser_for(content, file.filename).parse.__name__
+        span.set(parser=parser_name)
+
+    # Save uploaded file temporarily
+    with tracing.span("tempfile.write"):
         with tempfile.NamedTemporaryFile(delete=False, suffix=file.filename) as tmp:
-            content = await file.read()
             tmp.write(content)
             tmp_path = tmp.name
-        
+
+    try:
+        if profile:
+            data, report = await run_in_threadpool(
+                profiling.profile_extraction, extract_text, run_pipeline, tmp_path, content,
+                file.filename, hot)
+            await _store_result(content, data, file.filename, headers)
+            return {"status": "success", "filename": file.filename, "data": data, "profile": report}
+
+        # Extract text; parsing and extraction block, so keep them off the event loop
+        with tracing.span("parse", parser=parser_name):
+            text = await run_in_threadpool(extract_text, tmp_path)
+
+        # Convert to structured JSON
+        data = await run_in_threadpool(to_json, text)
+        await _store_result(content, data, file.filename, headers)
+
+        return {
+            "status": "success",
+            "filename": file.filename,
+            "data": data
+        }
+    finally:
+        # Clean up temp file
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+async def _store_result(content: bytes, data: dict, filename: str, headers: dict):
+    """Keep a complete result in the RESULT_DB store"""
+    if default_store() is None:
+        return
+    with tracing.span("store"):
+        digest = await run_in_threadpool(_save_result, content, data, filename)
+    if digest is not None:
+        headers["X-Resume-Sha256"] = digest
+
+def _save_result(content: bytes, data: dict, filename: str) -> Optional[str]:
+    """Blocking half of _store_result; returns the stored hash, or None"""
+    store = default_store()
+    budget = deadline.current()
+    # A partial result must not replace a complete one
+    if store is None or (budget is not None and budget.skipped):
+        return None
+    digest = hashlib.sha256(content).hexdigest()
+    store.save(digest, data, filename)
+    return digest
+
+def _error_status(e: Exception) -> Tuple[int, str]:
+    """HTTP status and detail for an extraction failure"""
+    if isinstance(e, ParseTimeoutError):
+        return 504, str(e)
+    if isinstance(e, ParseResourceError):
+        return 422, str(e)
+    if isinstance(e, ValueError):
+        return 400, str(e)
+    return 500, f"Processing error: {str(e)}"
+
+async def _progressive_results(content: bytes, filename: str):
+    """NDJSON events: text, then each field group as its stages finish, then done"""
+    global _in_flight
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    started = time.perf_counter()
+
+    def emit(event, **payload):
+        # Called from the worker thread; the queue belongs to the event loop
+        payload = {"event": event, **payload, "ms": round((time.perf_counter() - started) * 1000, 1)}
+        loop.call_soon_threadsafe(events.put_nowait, payload)
+
+    def work():
         try:
-            # Extract text
-            text = extract_text(tmp_path)
-            
-            # Convert to structured JSON
-            data = to_json(text)
-            
-            return {
-                "status": "success",
-                "filename": file.filename,
-                "data": data
-            }
-        finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
-    
+            text = extract_text(content, filename)
+            emit("text", chars=len(text))
+            data, _ = run_pipeline(text, on_group=lambda group, fields: emit(group, data=fields))
+            _save_result(content, data, filename)
+            emit("done")
+        except Exception as e:
+            status, detail = _error_status(e)
+            emit("error", status=status, detail=detail)
+
+    # Counted from the first byte streamed until the last
+    _in_flight += 1
+    try:
+        # Keep a reference; a client that disconnects early leaves the thread to finish on its own
+        worker = asyncio.ensure_future(run_in_threadpool(work))
+        while True:
+            event = await events.get()
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+            if event["event"] in ("done", "error"):
+                break
+    finally:
+        _in_flight -= 1
+
+@app.post("/extract/stream")
+async def extract_resume_stream(file: UploadFile = File(...)):
+    """
+    Extract structured data, streaming field groups as NDJSON as they are ready
+
+    Events, in order of readiness: text, contacts, identity, sections, done
+    (or error). Identity waits on spaCy only when the resume header is not enough.
+    """
+    if not file.filename:
+        raise HTTPException(400, "No file provided")
+    content = await file.read()
+    # Unsupported formats still get a plain 400 before the stream starts
+    try:
+        parser_for(content, file.filename)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return StreamingResponse(_progressive_results(content, file.filename), media_type="application/x-ndjson")
+
+
+async def _archive_results(upload: UploadFile, archive, members):
+    """NDJSON lines, one per member in completion order, then a summary"""
+    global _in_flight
+    slots = asyncio.Semaphore(ARCHIVE_CONCURRENCY)
+    expanded = 0
+    started = time.perf_counter()
+    store = default_store()
+    # (sha256, data, filename) of every member extracted, stored in one batch at the end
+    results = []
+
+    async def extract_member(index, info):
+        nonlocal expanded
+        record = {"index": index, "filename": info.filename}
+        async with slots:
+            try:
+                data = await run_in_threadpool(read_member, archive, info)
+                expanded += len(data)
+                if expanded > ARCHIVE_MAX_TOTAL_MB << 20:
+                    raise ArchiveLimitError(f"Archive expands past {ARCHIVE_MAX_TOTAL_MB} MB")
+                text = await run_in_threadpool(extract_text, data, info.filename)
+                digest = hashlib.sha256(data).hexdigest()
+                del data
+                record.update(status="success", data=await run_in_threadpool(to_json, text))
+                results.append((digest, record["data"], info.filename))
+            except Exception as e:
+                record.update(status="error", error=str(e))
+        return record
+
+    _in_flight += 1
+    tasks = [asyncio.ensure_future(extract_member(i, info)) for i, info in enumerate(members)]
+    errors = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            errors += record["status"] == "error"
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+        if store is not None and results:
+            await run_in_threadpool(store.save_many, results)
+        yield json.dumps({"status": "done", "files": len(members), "errors": errors,
+                          "seconds": round(time.perf_counter() - started, 3)}) + "\n"
+    finally:
+        # Client went away: stop members that have not started
+        for task in tasks:
+            task.cancel()
+        archive.close()
+        await upload.close()
+        _in_flight -= 1
+
+@app.post("/extract/archive")
+async def extract_archive(file: UploadFile = File(...)):
+    """
+    Extract every resume in a zip archive
+
+    Members are read from the upload in memory and parsed in parallel; each
+    result is streamed back as one JSON line as soon as it is ready.
+    """
+    try:
+        archive, members = await run_in_threadpool(open_archive, file.file)
     except ValueError as e:
         raise HTTPException(400, str(e))
-    except Exception as e:
-        raise HTTPException(500, f"Processing error: {str(e)}")
+    return StreamingResponse(_archive_results(file, archive, members), media_type="application/x-ndjson")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+"""Memory budgets for the MEMORY_ACCOUNTING instrumentation mode.
+
+With MEMORY_ACCOUNTING=1 every parse (in its sandbox worker), pipeline stage
+and whole pipeline run records its peak traced allocations and RSS change in
+METRICS under memory.<name>: parse_pdf, stage.entities, pipeline, ...
+
+A measurement over budget prints a warning and counts as over_budget.
+MEMORY_BUDGET_MB applies to every name (0, the default, means none);
+MEMORY_BUDGETS overrides it per name, e.g. "parse_image=300,stage.entities=200".
+The larger of the traced peak and the RSS change is compared, since some
+libraries allocate outside the Python allocator.
+"""
+import os
+from typing import Dict, Optional
+
+from app import tracing
+from app.metrics import METRICS, Metrics
+from common.resources import MEMORY_ACCOUNTING, measure_memory, rss_bytes, traced_bytes
+
+MEMORY_BUDGET_MB = float(os.environ.get("MEMORY_BUDGET_MB", "0"))
+
+
+def parse_budgets(spec: str) -> Dict[str, float]:
+    """name=MB pairs separated by commas"""
+    budgets = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, mb = part.partition("=")
+        budgets[name.strip()] = float(mb)
+    return budgets
+
+
+MEMORY_BUDGETS = parse_budgets(os.environ.get("MEMORY_BUDGETS", ""))
+
+
+def budget_for(name: str) -> Optional[int]:
+    """Budget in bytes, or None"""
+    mb = MEMORY_BUDGETS.get(name, MEMORY_BUDGET_MB)
+    return int(mb * (1 << 20)) if mb > 0 else None
+
+
+def record(name: str, usage: dict, metrics: Metrics = METRICS) -> bool:
+    """Store a measure_memory result; returns True when it was over budget"""
+    peak, rss_delta = usage["peak_bytes"], usage["rss_delta_bytes"]
+    budget = budget_for(name)
+    over = budget is not None and max(peak, rss_delta) > budget
+    metrics.observe_memory(name, peak, rss_delta, over)
+    if over:
+        trace_id = tracing.current_trace_id()
+        print(f"Warning: {name} used {max(peak, rss_delta) / (1 << 20):.1f} MB; "
+              f"its budget is {budget / (1 << 20):g} MB" + (f" (trace {trace_id})" if trace_id else ""))
+    return over
+
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class Timing:
+    """Count, total and max of a timed operation plus a window of recent samples"""
+
+    __slots__ = ("count", "total", "max", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile (0-100) of the recent window, in seconds"""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def summary(self) -> dict:
+        ms = lambda s: round(s * 1000, 3) if s is not None else None
+        return {
+            "count": self.count,
+            "total_ms": ms(self.total),
+            "mean_ms": ms(self.total / self.count) if self.count else None,
+            "max_ms": ms(self.max),
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+        }
+
+
+class MemoryUsage:
+    """Peak traced allocations and RSS change of a measured operation, in bytes"""
+
+    __slots__ = ("count", "over_budget", "max_peak", "max_rss_delta", "recent")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.over_budget = 0
+        self.max_peak = 0
+        self.max_rss_delta = 0
+        self.recent = deque(maxlen=window)
+
+    def add(self, peak: int, rss_delta: int, over_budget: bool = False):
+        self.count += 1
+        self.over_budget += over_budget
+        self.max_peak = max(self.max_peak, peak)
+        self.max_rss_delta = max(self.max_rss_delta, rss_delta)
+        self.recent.append(peak)
+
+    def summary(self) -> dict:
+        mb = lambda b: round(b / (1 << 20), 3)
+        ordered = sorted(self.recent)
+        at = lambda q: mb(ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]) if ordered else None
+        return {
+            "count": self.count,
+            "peak_mb_p50": at(50),
+            "peak_mb_p95": at(95),
+            "peak_mb_max": mb(self.max_peak),
+            "rss_delta_mb_max": mb(self.max_rss_delta),
+            "over_budget": self.over_budget,
+        }
+
+
+class Metrics:
+    """In-process counters and timings, safe to update from worker threads"""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._window = window
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timings: Dict[str, Timing] = {}
+        self.memory: Dict[str, MemoryUsage] = {}
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = Timing(self._window)
+            timing.add(seconds)
+
+    def observe_memory(self, name: str, peak: int, rss_delta: int, over_budget: bool = False):
+        with self._lock:
+            usage = self.memory.get(name)
+            if usage is None:
+                usage = self.memory[name] = MemoryUsage(self._window)
+            usage.add(peak, rss_delta, over_budget)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """q-th percentile of a timing's recent window in seconds, None if never observed"""
+        with self._lock:
+            timing = self.timings.get(name)
+            return timing.percentile(q) if timing is not None else None
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timings": {name: t.summary() for name, t in self.timings.items()},
+                "memory": {name: m.summary() for name, m in self.memory.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+            self.memory.clear()
+
+
+# Process-wide instance used by the pipeline and the API
+METRICS = Metrics()
+
+if hasattr(os, "register_at_fork"):
+    # The lock may have been held by another thread at the moment of the fork
+    os.register_at_fork(after_in_child=lambda: setattr(METRICS, "_lock", threading.Lock()))
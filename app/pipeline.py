@@ -1,67 +1,144 @@
 import os
-from parsers.pdf_parser import parse_pdf
-from parsers.docx_parser import parse_docx
-from parsers.image_parser import parse_image
-from extractors.patterns import extract_email, extract_phone, extract_links
+import time
+from typing import Callable, Dict, Optional, Tuple
+from parsers import parse_sandboxed
+from parsers.registry import Source
+from extractors.patterns import extract_contacts
 from extractors.nlp import extract_entities
-from extractors.sections import split_sections
+from extractors.context import DocumentContext
 from extractors.skills import extract_skills
 from extractors.education import extract_education
 from extractors.experience import extract_experience
+from extractors.identity import guess_identity
+from extractors.fuzzy import BUDGET_MS as FUZZY_BUDGET_MS
+from app import deadline, memory
+from app.metrics import METRICS
+from app.registry import StageRegistry
 
-def extract_text(path: str) -> str:
-    """Extract text from file based on extension"""
-    ext = os.path.splitext(path)[1].lower()
-    
-    if ext == ".pdf":
-        return parse_pdf(path)
-    elif ext in [".docx", ".doc"]:
-        return parse_docx(path)
-    elif ext in [".jpg", ".jpeg", ".png", ".tiff", ".bmp"]:
-        return parse_image(path)
-    else:
-        raise ValueError(f"Unsupported file type: {ext}")
+# Typo-tolerant skill matching for OCR'd and hand-typed resumes
+FUZZY_SKILLS = os.environ.get("SKILLS_FUZZY", "1") == "1"
+# Answer name/location from the resume header and skip spaCy when confident
+IDENTITY_HEURISTICS = os.environ.get("IDENTITY_HEURISTICS", "1") == "1"
 
-def to_json(text: str) -> dict:
-    """Convert extracted text to structured JSON"""
-    # Split into sections
-    sections = split_sections(text)
-    
-    # Extract entities
-    ents = extract_entities(text)
-    
-    # Extract skills
-    skills_text = sections.get("skills", sections.get("technical skills", ""))
-    skills = extract_skills(skills_text)
-    
-    # Extract education
-    edu_text = sections.get("education", sections.get("academic", ""))
-    education = extract_education(edu_text)
-    
-    # Extract experience
-    exp_text = sections.get("experience", sections.get("work experience", ""))
-    experience = extract_experience(exp_text)
-    
-    # Get summary
-    summary = sections.get("summary", sections.get("objective", sections.get("profile", None)))
-    
-    # Extract basic info
-    name = ents["PERSON"][0] if ents["PERSON"] else None
-    location = ents["GPE"][0] if ents["GPE"] else None
-    
-    # Extract certifications
-    cert_text = sections.get("certifications", sections.get("certificates", ""))
-    certifications = [c.strip() for c in cert_text.splitlines() if c.strip()] if cert_text else []
-    
+# Response fields, in output order
+RESUME_FIELDS = (
+    "name", "email", "phone", "location", "links", "summary",
+    "skills", "experience", "education", "certifications"
+)
+
+# Field groups streamed by /extract/stream, each as soon as its fields are all set
+FIELD_GROUPS = {
+    "contacts": ("email", "phone", "links"),
+    "sections": ("summary", "skills", "experience", "education", "certifications"),
+    "identity": ("name", "location"),
+}
+
+STAGES = StageRegistry()
+
+def extract_text(source: Source, name: Optional[str] = None) -> str:
+    """Extract text from a file path or bytes based on content, not extension"""
+    # In a worker subprocess with a timeout and memory cap (PARSE_SANDBOX)
+    info = {}
+    request_deadline = deadline.current()
+    try:
+        return parse_sandboxed(source, name, info, request_deadline.expires if request_deadline else None)
+    finally:
+        for what in info.get("skipped", ()):
+            deadline.skip(what)
+        if "peak_bytes" in info:
+            memory.record(info["parser"], info)
+
+@STAGES.register("context", inputs=("text",), outputs=("ctx",))
+def context_stage(text):
+    # Normalize once: casefolded text, line/block offsets and section spans
+    return {"ctx": DocumentContext(text)}
+
+@STAGES.register("identity_guess", inputs=("text",), outputs=("identity_guess",))
+def identity_guess_stage(text):
+    # Header lines against the first-name and city gazetteers; well under a millisecond
+    return {"identity_guess": guess_identity(text) if IDENTITY_HEURISTICS else None}
+
+@STAGES.register("entities", inputs=("text", "identity_guess"), outputs=("entities",), threaded=True)
+def entities_stage(text, identity_guess):
+    if identity_guess is not None and identity_guess.sufficient:
+        return {"entities": None}
+    # Only spaCy is optional: its recent median, not the stage's mostly-bypassed one, must fit
+    expected = METRICS.percentile("stage.entities.spacy", 50) or 0.0
+    if not deadline.allows("stage.entities", expected):
+        return {"entities": None}
+    # spaCy releases the GIL while parsing, so this overlaps the regex stages
+    start = time.perf_counter()
+    entities = extract_entities(text)
+    METRICS.observe("stage.entities.spacy", time.perf_counter() - start)
+    return {"entities": entities}
+
+@STAGES.register("identity", inputs=("identity_guess", "entities"), outputs=("name", "location"))
+def identity_stage(identity_guess, entities):
+    name, location = identity_guess[:2] if identity_guess else (None, None)
+    if entities is None:
+        # Either the header was enough or the deadline skipped NER
+        sufficient = identity_guess is not None and identity_guess.sufficient
+        METRICS.incr("identity.tier.heuristic" if sufficient else "identity.tier.skipped")
+        return {"name": name, "location": location}
+    METRICS.incr("identity.tier.spacy")
+    # The header was not convincing enough to skip NER, so spaCy wins; the guess only fills gaps
     return {
-        "name": name,
-        "email": extract_email(text),
-        "phone": extract_phone(text),
-        "location": location,
-        "links": extract_links(text),
-        "summary": summary,
-        "skills": skills,
-        "experience": experience,
-        "education": education,
-        "certifications": certifications
+        "name": entities["PERSON"][0] if entities["PERSON"] else name,
+        "location": entities["GPE"][0] if entities["GPE"] else location
     }
+
+@STAGES.register("contacts", inputs=("text",), outputs=("email", "phone", "links"))
+def contacts_stage(text):
+    # Email, phone and links in one scan
+    return extract_contacts(text)
+
+@STAGES.register("skills", inputs=("ctx",), outputs=("skills",))
+def skills_stage(ctx):
+    # Skills anywhere in the resume; ambiguous names only in the skills section
+    # The typo pass is the first thing dropped when the deadline is close
+    fuzzy = FUZZY_SKILLS and deadline.allows("skills.fuzzy", FUZZY_BUDGET_MS / 1000)
+    return {"skills": extract_skills(ctx.section("skills", "technical skills"), ctx.document, fuzzy=fuzzy)}
+
+@STAGES.register("education", inputs=("ctx",), outputs=("education",))
+def education_stage(ctx):
+    return {"education": extract_education(ctx.section("education", "academic"))}
+
+@STAGES.register("experience", inputs=("ctx",), outputs=("experience",))
+def experience_stage(ctx):
+    return {"experience": extract_experience(ctx.section("experience", "work experience"))}
+
+@STAGES.register("summary", inputs=("ctx",), outputs=("summary",))
+def summary_stage(ctx):
+    summary_span = ctx.section("summary", "objective", "profile")
+    # Blank lines dropped, as the summary has always been returned
+    return {"summary": summary_span.joined_lines() if summary_span else None}
+
+@STAGES.register("certifications", inputs=("ctx",), outputs=("certifications",))
+def certifications_stage(ctx):
+    cert_span = ctx.section("certifications", "certificates")
+    return {"certifications": cert_span.lines() if cert_span else []}
+
+def run_pipeline(text: str, on_group: Optional[Callable[[str, dict], None]] = None
+                 ) -> Tuple[dict, Dict[str, float]]:
+    """Run every registered stage; returns (resume fields, seconds per stage).
+
+    on_group(group, fields) is called for each FIELD_GROUPS entry once its
+    stages have finished, so callers can publish cheap fields before NER.
+    """
+    on_stage = None
+    if on_group is not None:
+        ready, pending = {}, dict(FIELD_GROUPS)
+
+        def on_stage(name, outputs):
+            ready.update(outputs)
+            for group, fields in list(pending.items()):
+                if all(f in ready for f in fields):
+                    del pending[group]
+                    on_group(group, {f: ready[f] for f in fields})
+
+    values, timings = STAGES.run(on_stage=on_stage, text=text)
+    return {field: values[field] for field in RESUME_FIELDS}, timings
+
+def to_json(text: str) -> dict:
+    """Convert extracted text to structured JSON"""
+    return run_pipeline(text)[0]
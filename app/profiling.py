@@ -0,0 +1,79 @@
+"""Per-request profiling for POST /extract?profile=1.
+
+Disabled unless PROFILE_TOKEN is set, and then only honoured for requests
+that send the same value in the X-Profile-Token header. Requests without
+?profile=1 take the normal path and pay nothing for it.
+
+The report has wall time for parsing (including the sandbox round trip)
+and for each pipeline stage, the text's size and the page count. With
+?hot=N it also lists the N functions with the most self time under
+cProfile. The profiler sees the pipeline stages that run in the request's
+thread; the parser runs in a sandbox subprocess and threaded stages (NER)
+run in the stage pool, so those show up in the stage timings only.
+"""
+import cProfile
+import os
+import pstats
+import secrets
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from parsers.pdf_parser import PAGE_RE
+from parsers.registry import parser_for
+
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+# Upper bound on ?hot=N
+PROFILE_MAX_HOT = 100
+
+
+def authorized(token: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN) and token is not None and secrets.compare_digest(token, PROFILE_TOKEN)
+
+
+def page_count(content: bytes, name: Optional[str] = None) -> Optional[int]:
+    """Pages in a PDF (page objects, so None when they sit in object streams), 1 for an image"""
+    mime = parser_for(content, name).mime
+    if mime == "application/pdf":
+        return len(PAGE_RE.findall(content)) or None
+    return 1 if mime.startswith("image/") else None
+
+
+def hot_functions(profiler: cProfile.Profile, top: int) -> List[dict]:
+    """The top functions by self time"""
+    rows = sorted(pstats.Stats(profiler).stats.items(), key=lambda item: item[1][2], reverse=True)
+    return [{
+        "function": pstats.func_std_string(func),
+        "calls": calls,
+        "self_ms": round(self_time * 1000, 3),
+        "cumulative_ms": round(cumulative * 1000, 3),
+    } for func, (_, calls, self_time, cumulative, _) in rows[:top]]
+
+
+def profile_extraction(parse: Callable[[str], str], pipeline: Callable[[str], Tuple[dict, Dict[str, float]]],
+                       path: str, content: bytes, name: Optional[str], hot: int = 0) -> Tuple[dict, dict]:
+    """Run parse and pipeline on the upload; returns (resume fields, profile report)"""
+    ms = lambda s: round(s * 1000, 3)
+    started = time.perf_counter()
+    text = parse(path)
+    parsed = time.perf_counter()
+
+    profiler = cProfile.Profile() if hot > 0 else None
+    if profiler is not None:
+        data, timings = profiler.runcall(pipeline, text)
+    else:
+        data, timings = pipeline(text)
+    finished = time.perf_counter()
+
+    report = {
+        "total_ms": ms(finished - started),
+        "parse_ms": ms(parsed - started),
+        "pipeline_ms": ms(finished - parsed),
+        # In finishing order
+        "stages": {stage: ms(seconds) for stage, seconds in timings.items()},
+        "chars": len(text),
+        "lines": text.count("\n") + 1 if text else 0,
+        "pages": page_count(content, name),
+    }
+    if profiler is not None:
+        report["hot"] = hot_functions(profiler, min(hot, PROFILE_MAX_HOT))
+    return data, report
@@ -0,0 +1,241 @@
+"""Rank stored resumes against a job description with a TF-IDF matrix.
+
+Every resume is a row of a sparse matrix with these columns:
+- the words of its roles, companies, degrees and free text;
+- one `skill:<name>` feature per skill from extract_skills.
+
+Values are sublinear term frequencies, 1 + log(tf). A job description goes
+through the same tokenizer and taxonomy. Scoring every candidate is then one
+matrix-vector product, cosine similarity with smoothed idf weights. The k
+best come from a partial sort.
+
+The matrix lives in memory as COO arrays (row, column, value), which grow in
+place as resumes are added. Removing a resume zeroes its values, and the
+arrays are compacted once enough of them are dead.
+
+A column-major (CSC) copy lets a query read only its own terms' columns.
+Rows added since the copy was made are scanned from the COO tail. Row norms
+depend on idf, which drifts as resumes come and go. Once the corpus has
+changed by RANK_REFRESH, the norms and the CSC copy are rebuilt in one pass.
+Rows added in between are normed with the idf of the moment.
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app import search
+from extractors.skills import extract_skills
+
+# A skill counts as this many occurrences of a plain word
+SKILL_WEIGHT = float(os.environ.get("RANK_SKILL_WEIGHT", "3.0"))
+# Share of the corpus that may change before row norms are recomputed with fresh idf
+RANK_REFRESH = float(os.environ.get("RANK_REFRESH", "0.05"))
+
+WORD_RE = re.compile(r"[^\W\d_][\w+#]*")
+
+
+class Ranked(NamedTuple):
+    key: str
+    score: float
+    skills: List[str]
+
+
+def features(text: str, skills: Iterable[str]) -> Counter:
+    """Weighted term counts: words of two or more letters, plus skill:<name> features"""
+    counts = Counter(w for w in WORD_RE.findall(text.casefold()) if len(w) > 1)
+    for skill in skills:
+        counts[f"skill:{skill}"] += SKILL_WEIGHT
+    return counts
+
+
+def resume_features(data: dict) -> Counter:
+    roles, companies, degrees, body = search.documents(data)[1:5]
+    return features("\n".join((roles, companies, degrees, body)), data.get("skills") or ())
+
+
+class TfidfIndex:
+    """Sparse TF-IDF rows keyed by resume; safe to share between threads"""
+
+    def __init__(self, capacity: int = 1 << 16):
+        self._lock = threading.Lock()
+        self.vocabulary: Dict[str, int] = {}
+        self._df = np.zeros(1024, dtype=np.int64)
+        # Nonzeros in insertion order; a row's entries are contiguous
+        self._rows = np.zeros(capacity, dtype=np.int32)
+        self._cols = np.zeros(capacity, dtype=np.int32)
+        self._vals = np.zeros(capacity, dtype=np.float32)
+        self._size = 0
+        self._dead = 0
+        # Per row: key, [start, end) into the nonzeros, skills, norm
+        self._keys: List[Optional[str]] = []
+        self._spans: List[Tuple[int, int]] = []
+        self._skills: List[List[str]] = []
+        self._norms = np.zeros(1024, dtype=np.float32)
+        self._row_of: Dict[str, int] = {}
+        self._changed = 0
+        # Column-major copy of the first _base nonzeros; None until the first rank()
+        self._csc = None
+        self._base = 0
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _idf(self) -> np.ndarray:
+        n = len(self._row_of)
+        df = self._df[:len(self.vocabulary)]
+        return (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+    def _reserve(self, extra: int):
+        if self._size + extra > len(self._vals):
+            capacity = max(len(self._vals) * 2, self._size + extra)
+            for name in ("_rows", "_cols", "_vals"):
+                old = getattr(self, name)
+                grown = np.zeros(capacity, dtype=old.dtype)
+                grown[:self._size] = old[:self._size]
+                setattr(self, name, grown)
+
+    def add(self, key: str, data: dict):
+        """Add or replace one resume"""
+        self.add_many([(key, data)])
+
+    def add_many(self, items: Iterable[Tuple[str, dict]]):
+        """Add or replace resumes given as (key, resume data)"""
+        prepared = [(key, resume_features(data), sorted(data.get("skills") or ())) for key, data in items]
+        with self._lock:
+            first = None
+            for key, counts, skills in prepared:
+                if key in self._row_of:
+                    self._remove(key, compact=False)
+                cols = np.fromiter((self._column(term) for term in counts), dtype=np.int32, count=len(counts))
+                vals = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+                self._df[cols] += 1
+                row = len(self._keys)
+                self._reserve(len(cols))
+                start, end = self._size, self._size + len(cols)
+                self._rows[start:end], self._cols[start:end], self._vals[start:end] = row, cols, vals
+                self._size = end
+                self._keys.append(key)
+                self._spans.append((start, end))
+                self._skills.append(skills)
+                self._row_of[key] = row
+                self._changed += 1
+                first = row if first is None else first
+            if first is None:
+                return
+            rows = len(self._keys)
+            if rows > len(self._norms):
+                self._norms = np.concatenate([self._norms, np.zeros(rows, dtype=np.float32)])
+            # New rows are the tail of the arrays; norm them with the idf as it stands now
+            start = self._spans[first][0]
+            weights = self._vals[start:self._size] * self._idf()[self._cols[start:self._size]]
+            self._norms[first:rows] = np.sqrt(np.bincount(self._rows[start:self._size] - first,
+                                                          weights=weights * weights, minlength=rows - first))
+            if self._dead > self._size // 4:
+                self._compact()
+
+    def remove(self, key: str):
+        with self._lock:
+            if key in self._row_of:
+                self._remove(key)
+
+    def _remove(self, key: str, compact: bool = True):
+        row = self._row_of.pop(key)
+        start, end = self._spans[row]
+        self._df[self._cols[start:end]] -= 1
+        self._vals[start:end] = 0
+        # The CSC copy still has the row's values; an infinite norm scores it 0
+        if row < len(self._norms):
+            self._norms[row] = np.inf
+        self._keys[row] = None
+        self._dead += end - start
+        self._changed += 1
+        if compact and self._dead > self._size // 4:
+            self._compact()
+
+    def _column(self, term: str) -> int:
+        col = self.vocabulary.get(term)
+        if col is None:
+            col = self.vocabulary[term] = len(self.vocabulary)
+            if col >= len(self._df):
+                self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.int64)])
+        return col
+
+    def _compact(self):
+        """Drop removed rows and renumber the live ones"""
+        alive = np.array([key is not None for key in self._keys], dtype=bool)
+        new_row = np.cumsum(alive) - 1
+        keep = alive[self._rows[:self._size]]
+        size = int(keep.sum())
+        rows = new_row[self._rows[:self._size][keep]].astype(np.int32)
+        self._cols[:size] = self._cols[:self._size][keep]
+        self._vals[:size] = self._vals[:self._size][keep]
+        self._rows[:size] = rows
+        self._size, self._dead = size, 0
+        self._norms = np.concatenate([self._norms[:len(alive)][alive],
+                                      np.zeros(len(self._norms) - int(alive.sum()), dtype=np.float32)])
+        self._keys = [key for key in self._keys if key is not None]
+        self._skills = [skills for skills, live in zip(self._skills, alive) if live]
+        ends = np.cumsum(np.bincount(rows, minlength=len(self._keys)))
+        self._spans = list(zip(np.concatenate([[0], ends[:-1]]).tolist(), ends.tolist()))
+        self._row_of = {key: row for row, key in enumerate(self._keys)}
+        # Row numbers changed
+        self._csc = None
+
+    def _refresh(self, idf: np.ndarray):
+        """Norms with the current idf, and the CSC copy of every nonzero"""
+        n, size = len(self._keys), self._size
+        rows, cols, vals = self._rows[:size], self._cols[:size], self._vals[:size]
+        weights = vals * idf[cols]
+        self._norms[:n] = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+        order = np.argsort(cols, kind="stable")
+        indptr = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cols, minlength=len(self.vocabulary)), out=indptr[1:])
+        self._csc = (indptr, rows[order], vals[order])
+        self._base = size
+        self._changed = 0
+
+    def rank(self, job: str, k: int = 20) -> List[Ranked]:
+        """The k resumes most similar to a job description, best first"""
+        job_skills = set(extract_skills(job))
+        counts = features(job, job_skills)
+        with self._lock:
+            n = len(self._keys)
+            if not self._row_of or not counts:
+                return []
+            idf = self._idf()
+            if self._csc is None or self._changed > RANK_REFRESH * len(self._row_of):
+                self._refresh(idf)
+            # Dense query vector over the vocabulary; terms no resume has cannot score
+            query = np.zeros(len(self.vocabulary), dtype=np.float32)
+            for term, count in counts.items():
+                col = self.vocabulary.get(term)
+                if col is not None:
+                    query[col] = (1 + math.log(count)) * idf[col]
+            norm = float(np.linalg.norm(query))
+            if norm == 0:
+                return []
+            query *= idf / norm
+            # The matrix-vector product, X @ q: only the query's columns can contribute
+            indptr, csc_rows, csc_vals = self._csc
+            terms = [col for col in np.flatnonzero(query).tolist() if col + 1 < len(indptr)]
+            spans = [slice(indptr[col], indptr[col + 1]) for col in terms]
+            hit_rows = np.concatenate([csc_rows[span] for span in spans] or [np.zeros(0, np.int32)])
+            weights = np.concatenate([csc_vals[span] * query[col] for span, col in zip(spans, terms)]
+                                     or [np.zeros(0, np.float32)])
+            scores = np.bincount(hit_rows, weights=weights, minlength=n)
+            # Rows added since the copy: every nonzero times its query weight, summed per row
+            tail = slice(self._base, self._size)
+            scores += np.bincount(self._rows[tail], weights=self._vals[tail] * query[self._cols[tail]],
+                                  minlength=n)
+            scores /= np.maximum(self._norms[:n], 1e-12)
+            k = min(k, len(self._row_of))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [Ranked(self._keys[row], round(float(scores[row]), 4),
+                           [s for s in self._skills[row] if s in job_skills])
+                    for row in top.tolist() if scores[row] > 0 and self._keys[row] is not None]
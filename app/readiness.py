@@ -0,0 +1,66 @@
+"""Readiness for load balancers: GET /ready answers 503 when this replica is saturated.
+
+A replica is not ready when any of these is over its threshold (0 disables
+a check):
+
+    READY_MAX_IN_FLIGHT   /extract, /extract/stream and /extract/archive requests
+                          being handled (default 8 x SANDBOX_WORKERS)
+    READY_MAX_QUEUE       parses waiting for a sandbox worker (default 4 x SANDBOX_WORKERS)
+    READY_MAX_P95_MS      p95 /extract latency over the last READY_WINDOW_SECONDS (default 0)
+
+or when READY_REQUIRE_MODEL=1 and the spaCy model is not loaded. Latency is
+windowed by time rather than by count so that a replica taken out of
+rotation becomes ready again once its slow requests age out.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import List, Optional
+
+from common.resources import SANDBOX_WORKERS
+
+_WORKERS = max(SANDBOX_WORKERS, 1)
+READY_MAX_IN_FLIGHT = int(os.environ.get("READY_MAX_IN_FLIGHT", str(8 * _WORKERS)))
+READY_MAX_QUEUE = int(os.environ.get("READY_MAX_QUEUE", str(4 * _WORKERS)))
+READY_MAX_P95_MS = float(os.environ.get("READY_MAX_P95_MS", "0"))
+READY_WINDOW_SECONDS = float(os.environ.get("READY_WINDOW_SECONDS", "60"))
+READY_REQUIRE_MODEL = os.environ.get("READY_REQUIRE_MODEL", "0") == "1"
+
+
+class LatencyWindow:
+    """Request latencies from the last `seconds`"""
+
+    def __init__(self, seconds: float = READY_WINDOW_SECONDS, max_samples: int = 10000):
+        self.seconds = seconds
+        self._samples = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def add(self, latency: float):
+        with self._lock:
+            self._samples.append((time.monotonic(), latency))
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-th percentile in seconds, None when nothing finished within the window"""
+        cutoff = time.monotonic() - self.seconds
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            ordered = sorted(latency for _, latency in self._samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def saturation(in_flight: int, queued: int, p95_ms: Optional[float], model_loaded: bool) -> List[str]:
+    """Reasons this replica should not take traffic; empty when ready"""
+    reasons = []
+    if READY_MAX_IN_FLIGHT and in_flight >= READY_MAX_IN_FLIGHT:
+        reasons.append(f"{in_flight} requests in flight (limit {READY_MAX_IN_FLIGHT})")
+    if READY_MAX_QUEUE and queued >= READY_MAX_QUEUE:
+        reasons.append(f"{queued} parses queued (limit {READY_MAX_QUEUE})")
+    if READY_MAX_P95_MS and p95_ms is not None and p95_ms > READY_MAX_P95_MS:
+        reasons.append(f"p95 latency {p95_ms:.0f} ms (limit {READY_MAX_P95_MS:g} ms)")
+    if READY_REQUIRE_MODEL and not model_loaded:
+        reasons.append("spaCy model not loaded")
+    return reasons
@@ -0,0 +1,187 @@
+import contextvars
+import os
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from app import deadline, memory, tracing
+from app.metrics import METRICS, Metrics
+
+# Threads for stages that release the GIL (spaCy, OCR); 0 runs everything inline
+PIPELINE_WORKERS = int(os.environ.get("PIPELINE_WORKERS", "2"))
+
+# A forked child inherits executors whose threads did not survive the fork
+_REGISTRIES = weakref.WeakSet()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: [r._forget_pool() for r in list(_REGISTRIES)])
+
+
+class Stage(NamedTuple):
+    name: str
+    fn: Callable[..., dict]
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    # Worth a pool thread: the stage spends its time outside the GIL
+    threaded: bool = False
+    # May be skipped, outputs set to None, when the request's deadline cannot fit it
+    optional: bool = False
+
+
+class StageRegistry:
+    """Extractors declared by their inputs and outputs, run as a dependency graph.
+
+    A stage receives its inputs as keyword arguments and returns a dict of its
+    outputs. Threaded stages are handed to a pool as soon as their inputs are
+    ready while the remaining stages run in the calling thread, so a slow NER
+    stage overlaps the regex extractors instead of preceding them.
+    """
+
+    def __init__(self, metrics: Metrics = METRICS, workers: int = PIPELINE_WORKERS,
+                 track_memory: bool = memory.MEMORY_ACCOUNTING):
+        self.stages: Dict[str, Stage] = {}
+        self.metrics = metrics
+        self.workers = workers
+        # Peak allocations and RSS change per stage and per run, as memory.stage.<name> and memory.pipeline;
+        # every stage then runs inline so each peak is its own
+        self.track_memory = track_memory
+        self._executor = None
+        self._order = None
+        _REGISTRIES.add(self)
+
+    def register(self, name: str, inputs: Tuple[str, ...] = (), outputs: Tuple[str, ...] = (),
+                 threaded: bool = False, optional: bool = False):
+        """Decorator declaring a stage"""
+        def decorator(fn):
+            if name in self.stages:
+                raise ValueError(f"Stage already registered: {name}")
+            self.stages[name] = Stage(name, fn, tuple(inputs), tuple(outputs), threaded, optional)
+            self._order = None
+            return fn
+        return decorator
+
+    def plan(self, seeds: Tuple[str, ...] = ("text",)) -> List[Stage]:
+        """Stages in a valid execution order; raises ValueError on a bad graph"""
+        producers = {}
+        for stage in self.stages.values():
+            for out in stage.outputs:
+                if out in producers or out in seeds:
+                    raise ValueError(f"Output {out!r} of {stage.name} is produced twice")
+                producers[out] = stage.name
+        for stage in self.stages.values():
+            for need in stage.inputs:
+                if need not in producers and need not in seeds:
+                    raise ValueError(f"Input {need!r} of {stage.name} is never produced")
+
+        order, state = [], {}
+
+        def visit(name: str):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle through stage {name}")
+            state[name] = "visiting"
+            for need in self.stages[name].inputs:
+                if need in producers:
+                    visit(producers[need])
+            state[name] = "done"
+            order.append(self.stages[name])
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _forget_pool(self):
+        self._executor = None
+
+    def _pool(self) -> Optional[ThreadPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="stage")
+        return self._executor
+
+    def _call(self, stage: Stage, kwargs: dict) -> Tuple[dict, float, Optional[dict]]:
+        with tracing.span(f"stage.{stage.name}"):
+            start = time.perf_counter()
+            if self.track_memory:
+                out, usage = memory.measure_memory(stage.fn, **kwargs)
+            else:
+                out, usage = stage.fn(**kwargs), None
+            return out or {}, time.perf_counter() - start, usage
+
+    def run(self, on_stage: Optional[Callable[[str, dict], None]] = None,
+            **seeds) -> Tuple[dict, Dict[str, float]]:
+        """Run every stage; returns (values, seconds per stage).
+
+        on_stage(name, outputs) is called in the calling thread as each stage finishes.
+        """
+        if self._order is None:
+            self._order = self.plan(tuple(seeds))
+        with tracing.span("pipeline"):
+            return self._run(on_stage, seeds)
+
+    def _run(self, on_stage, seeds: dict) -> Tuple[dict, Dict[str, float]]:
+        values = dict(seeds)
+        timings = {}
+        pending = list(self._order)
+        running = {}
+        # tracemalloc's peak is process-wide: a stage resetting it would wipe a concurrent stage's peak
+        pool = None if self.track_memory else self._pool()
+        if self.track_memory:
+            run_usage = {"peak_bytes": 0}
+            run_base, run_rss = memory.traced_bytes(), memory.rss_bytes()
+
+        def finish(stage, result):
+            out, seconds, usage = result
+            values.update(out)
+            timings[stage.name] = seconds
+            self.metrics.observe(f"stage.{stage.name}", seconds)
+            if usage is not None:
+                memory.record(f"stage.{stage.name}", usage, self.metrics)
+                # Stage peaks are relative to where the stage started; the run's is relative to its own start
+                run_usage["peak_bytes"] = max(run_usage["peak_bytes"],
+                                              usage["base_bytes"] + usage["peak_bytes"] - run_base)
+            if on_stage is not None:
+                on_stage(stage.name, out)
+
+        while pending or running:
+            ready = [s for s in pending if all(k in values for k in s.inputs)]
+            for stage in [s for s in ready if s.optional]:
+                # Its recent median must fit in what is left of the deadline
+                expected = self.metrics.percentile(f"stage.{stage.name}", 50) or 0.0
+                if not deadline.allows(f"stage.{stage.name}", expected):
+                    pending.remove(stage)
+                    ready.remove(stage)
+                    out = dict.fromkeys(stage.outputs)
+                    values.update(out)
+                    if on_stage is not None:
+                        on_stage(stage.name, out)
+            threaded = [s for s in ready if s.threaded and pool is not None]
+            for stage in threaded:
+                pending.remove(stage)
+                # Copy the caller's context so context variables follow the stage
+                ctx = contextvars.copy_context()
+                kwargs = {k: values[k] for k in stage.inputs}
+                running[pool.submit(ctx.run, self._call, stage, kwargs)] = stage
+            if threaded:
+                # Hand over the GIL so the worker reaches its GIL-free section now
+                # rather than after a full switch interval of inline regex work
+                time.sleep(0)
+            inline = next((s for s in ready if s in pending), None)
+            if inline is not None:
+                pending.remove(inline)
+                finish(inline, self._call(inline, {k: values[k] for k in inline.inputs}))
+            elif running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+            elif pending:
+                raise ValueError(f"Stages can never run: {[s.name for s in pending]}")
+            for future in [f for f in running if f.done()]:
+                finish(running.pop(future), future.result())
+
+        if self.track_memory:
+            run_usage["rss_delta_bytes"] = memory.rss_bytes() - run_rss
+            memory.record("pipeline", run_usage, self.metrics)
+        return values, timings
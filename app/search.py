@@ -0,0 +1,233 @@
+"""Boolean search over stored resumes.
+
+The result store keeps an FTS5 inverted index (`resume_text`) next to its
+tables, one row per resume with these columns:
+- `skills`: canonical skill names;
+- `role`, `company` and `degree`;
+- `body`: name, location, summary, role descriptions, institutions and
+  certifications;
+- `years`: the tokens y1..yN for N whole years of experience.
+
+It is contentless: only the posting lists are stored, not a second copy of
+the text. Queries look like
+
+    python AND (kubernetes OR k8s) NOT role:intern, 5+ years
+    skill:"customer service" company:acme degree:msc*
+
+Words and "phrases" are ANDed unless joined by OR; NOT excludes. A field
+prefix narrows a term to one column: skill(s), role, company, degree or
+text. A trailing * matches a prefix. `years:5+`, `years:2-4` or
+"5+ years" filter on total experience. Skill terms go through the taxonomy,
+so `skill:k8s` finds kubernetes.
+"""
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from extractors.experience import total_months
+from extractors.skills import extract_skills
+
+# Index columns; a field name in a query maps to one of them
+COLUMNS = ("skills", "role", "company", "degree", "body", "years")
+FIELDS = {"skill": "skills", "skills": "skills", "role": "role", "title": "role",
+          "company": "company", "degree": "degree", "text": "body"}
+
+TOKEN_RE = re.compile(
+    r'\s*(?:(?P<paren>[()])'
+    r'|(?P<field>[A-Za-z]+):(?:"(?P<fphrase>[^"]*)"|(?P<fword>[^\s()",]+))'
+    r'|"(?P<phrase>[^"]*)"(?P<pstar>\*)?'
+    r'|(?P<word>[^\s()",]+)'
+    r'|,)')
+# "5+ years", "5+ yrs" in a query is years:5+
+YEARS_PHRASE_RE = re.compile(r"(?<![\w:])(\d+)\s*\+\s*(?:years?|yrs?)\b(?!:)", re.IGNORECASE)
+YEARS_RE = re.compile(r"(\d+)(?:\+|-(\d+))?")
+OPERATORS = ("AND", "OR", "NOT")
+# Experience is indexed as y1..yN; longer careers count as this many years
+MAX_YEARS = 60
+WORDS_RE = re.compile(r"[^\W_]+(?:\s+[^\W_]+)*")
+
+
+class Query(NamedTuple):
+    """A parsed query: an FTS5 MATCH expression and a total-experience range in months"""
+    match: Optional[str]
+    # Set only for a query of nothing but a years range that starts at 0, which the index cannot express
+    min_months: Optional[int] = None
+    max_months: Optional[int] = None
+
+
+def skill_token(name: str) -> str:
+    """One index token per canonical skill: "c++" is c_2b_2b, "customer service" customer_20service"""
+    return "".join(c if c.isalnum() else f"_{ord(c):02x}" for c in name.casefold())
+
+
+def documents(data: dict) -> Tuple[str, ...]:
+    """Index column values for one resume, in COLUMNS order"""
+    experience = data.get("experience") or []
+    education = data.get("education") or []
+    body = [data.get("name"), data.get("location"), data.get("summary")]
+    body += [item.get("description") for item in experience]
+    body += [item.get("institution") for item in education]
+    body += data.get("certifications") or []
+    join = lambda values: "\n".join(v for v in values if v)
+    years = min(experience_months(data) // 12, MAX_YEARS)
+    return (
+        " ".join(skill_token(skill) for skill in data.get("skills") or ()),
+        join(item.get("role") for item in experience),
+        join(item.get("company") for item in experience),
+        join(item.get("degree") for item in education),
+        join(body),
+        # "at least N years" becomes one posting list to intersect rather than a filter on every hit
+        " ".join(f"y{n}" for n in range(1, years + 1)),
+    )
+
+
+def experience_months(data: dict) -> int:
+    return total_months(data.get("experience") or [])
+
+
+def _quote(text: str, prefix: bool = False) -> str:
+    return '"' + text.replace('"', '""') + '"' + (" *" if prefix else "")
+
+
+def _skill_tokens(text: str) -> List[str]:
+    # Aliases ("k8s", "python 3") resolve to their skill; anything else is taken as named
+    return [skill_token(s) for s in extract_skills(text)] or [skill_token(text.strip())]
+
+
+class _Parser:
+    """Recursive descent over the tokens: OR binds loosest, then AND (or juxtaposition), then NOT"""
+
+    def __init__(self, query: str):
+        query = YEARS_PHRASE_RE.sub(lambda m: f"years:{m.group(1)}+", query)
+        self.tokens, pos = [], 0
+        while pos < len(query):
+            m = TOKEN_RE.match(query, pos)
+            if not m or m.end() == pos:
+                if not query[pos:].strip():
+                    break
+                raise ValueError(f"Cannot parse query near {query[pos:pos + 20]!r}")
+            pos = m.end()
+            if m.group(0).strip() not in ("", ","):
+                self.tokens.append(m)
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        if self.pos >= len(self.tokens):
+            return None
+        m = self.tokens[self.pos]
+        if m.group("paren"):
+            return m.group("paren")
+        return m.group("word") if m.group("word") in OPERATORS else "term"
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("Empty query")
+        node = self.or_expr()
+        if self.pos < len(self.tokens):
+            raise ValueError(f"Unexpected {self.tokens[self.pos].group(0).strip()!r} in query")
+        return node
+
+    def or_expr(self):
+        parts = [self.and_expr()]
+        while self.peek() == "OR":
+            self.pos += 1
+            parts.append(self.and_expr())
+        return parts[0] if len(parts) == 1 else ("or", parts)
+
+    def and_expr(self):
+        parts = [self.unary()]
+        while self.peek() in ("AND", "NOT", "term", "("):
+            if self.peek() == "AND":
+                self.pos += 1
+            parts.append(self.unary())
+        return parts[0] if len(parts) == 1 else ("and", parts)
+
+    def unary(self):
+        if self.peek() == "NOT":
+            self.pos += 1
+            return ("not", self.unary())
+        if self.peek() == "(":
+            self.pos += 1
+            node = self.or_expr()
+            if self.peek() != ")":
+                raise ValueError("Unbalanced parentheses in query")
+            self.pos += 1
+            return node
+        if self.peek() != "term":
+            raise ValueError("Query ends where a term was expected" if self.peek() is None
+                             else f"Unexpected {self.peek()!r} in query")
+        m = self.tokens[self.pos]
+        self.pos += 1
+        if m.group("field"):
+            field = m.group("field").lower()
+            value = m.group("fphrase") if m.group("fphrase") is not None else m.group("fword")
+            if field in ("years", "year"):
+                years = YEARS_RE.fullmatch(value)
+                if not years:
+                    raise ValueError(f"years: takes N+ or N-M, not {value!r}")
+                low = int(years.group(1))
+                high = int(years.group(2)) if years.group(2) else None
+                return ("years", low, high)
+            if field not in FIELDS:
+                raise ValueError(f"Unknown field {field!r}; use {', '.join(sorted(FIELDS))} or years")
+            prefix = m.group("fword") is not None and value.endswith("*")
+            return ("term", FIELDS[field], value.rstrip("*") if prefix else value, prefix)
+        if m.group("phrase") is not None:
+            return ("term", None, m.group("phrase"), bool(m.group("pstar")))
+        word = m.group("word")
+        return ("term", None, word.rstrip("*"), word.endswith("*"))
+
+
+def _compile(node) -> str:
+    """FTS5 expression for a node without years filters"""
+    kind = node[0]
+    if kind == "term":
+        _, column, text, prefix = node
+        if not text.strip():
+            raise ValueError("Empty term in query")
+        if column == "skills":
+            tokens = [skill_token(text.strip())] if prefix else _skill_tokens(text)
+            return " AND ".join(f"skills : {_quote(t, prefix)}" for t in tokens)
+        if column is not None:
+            return f"{column} : {_quote(text, prefix)}"
+        # Anywhere, including the skill a word or alias stands for
+        skills = [] if prefix else extract_skills(text)
+        # "c++" would tokenize to a bare "c"; such a name only makes sense as the skill
+        terms = [_quote(text, prefix)] if not skills or WORDS_RE.fullmatch(text) else []
+        terms += [f"skills : {_quote(skill_token(s))}" for s in skills if skill_token(s) != text.casefold()]
+        return terms[0] if len(terms) == 1 else "(" + " OR ".join(terms) + ")"
+    if kind == "years":
+        raise ValueError("years: can only narrow the whole query, not sit inside OR or NOT")
+    if kind == "not":
+        raise ValueError("NOT needs something to exclude from, e.g. python NOT java")
+    if kind == "or":
+        return "(" + " OR ".join(_compile(part) for part in node[1]) + ")"
+    positive = [part for part in node[1] if part[0] != "not"]
+    negative = [part[1] for part in node[1] if part[0] == "not"]
+    if not positive:
+        raise ValueError("NOT needs something to exclude from, e.g. python NOT java")
+    expr = "(" + " AND ".join(_compile(part) for part in positive) + ")"
+    for part in negative:
+        expr += f" NOT {_compile(part)}"
+    return f"({expr})"
+
+
+def parse_query(query: str) -> Query:
+    """Parse a search query; raises ValueError with a readable message if it is malformed"""
+    node = _Parser(query).parse()
+    # Years filters apply to the whole query, so they may only be top-level conjuncts
+    parts = node[1] if node[0] == "and" else [node]
+    years = [part for part in parts if part[0] == "years"]
+    rest = [part for part in parts if part[0] != "years"]
+    low = min(max((part[1] for part in years), default=0), MAX_YEARS)
+    high = min((part[2] for part in years if part[2] is not None), default=None)
+    if high is not None and high < low:
+        raise ValueError(f"years range {low}-{high} is empty")
+    positive = [_compile(rest[0] if len(rest) == 1 else ("and", rest))] if rest else []
+    if low:
+        positive.append(f'years : "y{low}"')
+    if not positive:
+        return Query(None, 0, high * 12 + 11 if high is not None else None)
+    match = " AND ".join(positive)
+    if high is not None and high < MAX_YEARS:
+        match = f'({match}) NOT years : "y{high + 1}"'
+    return Query(match)
@@ -0,0 +1,403 @@
+"""Extraction results kept in SQLite, so a resume can be looked up without re-parsing it.
+
+Each result is a row in `resumes` keyed by the SHA-256 of the uploaded file,
+with its experience, education and skills in their own tables. The database
+runs in WAL mode, so readers never wait on the writer. Writes go in batches,
+one transaction each. Storing the same file again replaces its rows. An FTS5
+index over skills, roles, companies, degrees and text (app/search.py) is
+kept up to date in the same transaction. The TF-IDF matrix for ranking
+(app/ranking.py) is built in memory on first use and updated on every save.
+
+    python -m app.cli export results.db -o resumes.parquet
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from app import ranking, search
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Parquet/Arrow export only; JSONL always works
+    pyarrow = None
+
+# SQLite file that /extract stores every successful result in; unset keeps nothing
+RESULT_DB = os.environ.get("RESULT_DB", "")
+# Results per transaction when writing in bulk
+STORE_BATCH_SIZE = int(os.environ.get("STORE_BATCH_SIZE", "500"))
+
+EXPERIENCE_FIELDS = ("company", "role", "start_date", "end_date", "tenure_months", "description")
+EDUCATION_FIELDS = ("institution", "degree", "start_year", "end_year")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL UNIQUE,
+    filename TEXT,
+    extracted_at REAL NOT NULL,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    location TEXT,
+    summary TEXT,
+    links TEXT NOT NULL DEFAULT '[]',
+    certifications TEXT NOT NULL DEFAULT '[]',
+    experience_months INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS resumes_email ON resumes (email);
+CREATE TABLE IF NOT EXISTS experience (
+    resume_id INTEGER NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    company TEXT,
+    role TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    tenure_months INTEGER,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS experience_resume ON experience (resume_id);
+CREATE TABLE IF NOT EXISTS education (
+    resume_id INTEGER NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    institution TEXT,
+    degree TEXT,
+    start_year TEXT,
+    end_year TEXT
+);
+CREATE INDEX IF NOT EXISTS education_resume ON education (resume_id);
+CREATE TABLE IF NOT EXISTS skills (
+    resume_id INTEGER NOT NULL REFERENCES resumes (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    skill TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS skills_resume ON skills (resume_id);
+CREATE INDEX IF NOT EXISTS skills_skill ON skills (skill);
+"""
+
+# Bumped when an upgrade needs more than CREATE ... IF NOT EXISTS
+SCHEMA_VERSION = 2
+
+# Created once the resumes table has every column (version 2 added experience_months)
+SEARCH_SCHEMA = f"""
+CREATE INDEX IF NOT EXISTS resumes_experience ON resumes (experience_months);
+CREATE VIRTUAL TABLE IF NOT EXISTS resume_text USING fts5 (
+    {', '.join(search.COLUMNS)}, content='', tokenize="unicode61 remove_diacritics 2 tokenchars '_'"
+);
+"""
+
+_INSERT_RESUME = ("INSERT INTO resumes (sha256, filename, extracted_at, name, email, phone, location, "
+                  "summary, links, certifications, experience_months) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERT_EXPERIENCE = (f"INSERT INTO experience (resume_id, position, {', '.join(EXPERIENCE_FIELDS)}) "
+                      f"VALUES (?, ?{', ?' * len(EXPERIENCE_FIELDS)})")
+_INSERT_EDUCATION = (f"INSERT INTO education (resume_id, position, {', '.join(EDUCATION_FIELDS)}) "
+                     f"VALUES (?, ?{', ?' * len(EDUCATION_FIELDS)})")
+_INSERT_SKILL = "INSERT INTO skills (resume_id, position, skill) VALUES (?, ?, ?)"
+_INDEX = (f"INSERT INTO resume_text (rowid, {', '.join(search.COLUMNS)}) "
+          f"VALUES (?{', ?' * len(search.COLUMNS)})")
+# A contentless index forgets a row only when given the values it was indexed with
+_UNINDEX = (f"INSERT INTO resume_text (resume_text, rowid, {', '.join(search.COLUMNS)}) "
+            f"VALUES ('delete', ?{', ?' * len(search.COLUMNS)})")
+
+
+class ResultStore:
+    """Resume records in one SQLite file; safe to share between threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL syncs at checkpoints, not every commit; a power cut can lose the last commits, not corrupt
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._ranker = None
+
+    def _migrate(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(resumes)")}
+        if "experience_months" not in columns:
+            self._conn.execute("ALTER TABLE resumes ADD COLUMN experience_months INTEGER NOT NULL DEFAULT 0")
+        self._conn.executescript(SEARCH_SCHEMA)
+        self.reindex()
+        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def reindex(self, batch_size: int = STORE_BATCH_SIZE) -> int:
+        """Rebuild the search index and experience totals from the stored rows"""
+        count = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("INSERT INTO resume_text (resume_text) VALUES ('delete-all')")
+                last = 0
+                while True:
+                    rows = self._conn.execute("SELECT * FROM resumes WHERE id > ? ORDER BY id LIMIT ?",
+                                              (last, batch_size)).fetchall()
+                    if not rows:
+                        break
+                    last = rows[-1]["id"]
+                    records = self._assemble(rows)
+                    self._conn.executemany("UPDATE resumes SET experience_months = ? WHERE id = ?", [
+                        (search.experience_months(r["data"]), row["id"]) for row, r in zip(rows, records)])
+                    self._conn.executemany(_INDEX, [(row["id"], *search.documents(r["data"]))
+                                                    for row, r in zip(rows, records)])
+                    count += len(rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def save(self, sha256: str, data: dict, filename: Optional[str] = None):
+        """Store one result, replacing any earlier one for the same file"""
+        self.save_many([(sha256, data, filename)])
+
+    def save_many(self, records: Iterable[tuple]) -> int:
+        """Store (sha256, data, filename) results in one transaction; returns how many
+
+        A hash repeated in the batch is stored once, from its last record.
+        """
+        # Child and index rows are written after the loop, so a second copy must not delete the first's parent
+        records = {record[0]: record for record in records}.values()
+        now = time.time()
+        experience, education, skills, index, saved = [], [], [], [], []
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                for sha256, data, filename in records:
+                    old = cursor.execute("SELECT * FROM resumes WHERE sha256 = ?", (sha256,)).fetchone()
+                    if old is not None:
+                        previous = self._assemble([old])[0]["data"]
+                        cursor.execute(_UNINDEX, (old["id"], *search.documents(previous)))
+                        # Cascades to the child rows of the earlier extraction
+                        cursor.execute("DELETE FROM resumes WHERE id = ?", (old["id"],))
+                    cursor.execute(_INSERT_RESUME, (
+                        sha256, filename, now, data.get("name"), data.get("email"), data.get("phone"),
+                        data.get("location"), data.get("summary"),
+                        json.dumps(data.get("links") or [], ensure_ascii=False),
+                        json.dumps(data.get("certifications") or [], ensure_ascii=False),
+                        search.experience_months(data)))
+                    resume_id = cursor.lastrowid
+                    index.append((resume_id, *search.documents(data)))
+                    saved.append((sha256, data))
+                    experience.extend((resume_id, i, *(item.get(f) for f in EXPERIENCE_FIELDS))
+                                      for i, item in enumerate(data.get("experience") or ()))
+                    education.extend((resume_id, i, *(item.get(f) for f in EDUCATION_FIELDS))
+                                     for i, item in enumerate(data.get("education") or ()))
+                    skills.extend((resume_id, i, skill) for i, skill in enumerate(data.get("skills") or ()))
+                # Child rows for the whole batch in three statements
+                cursor.executemany(_INSERT_EXPERIENCE, experience)
+                cursor.executemany(_INSERT_EDUCATION, education)
+                cursor.executemany(_INSERT_SKILL, skills)
+                cursor.executemany(_INDEX, index)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            if self._ranker is not None:
+                # Under the store lock, so the matrix sees saves in commit order
+                self._ranker.add_many(saved)
+        return len(saved)
+
+    def get(self, sha256: str) -> Optional[dict]:
+        """The stored result for a file hash, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM resumes WHERE sha256 = ?", (sha256,)).fetchone()
+            if row is None:
+                return None
+            return self._assemble([row])[0]
+
+    def with_skill(self, skill: str, limit: int = 100) -> List[str]:
+        """Hashes of stored resumes listing skill, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.sha256 FROM skills s JOIN resumes r ON r.id = s.resume_id "
+                "WHERE s.skill = ? ORDER BY r.extracted_at DESC, r.id DESC LIMIT ?", (skill, limit))
+            return [row["sha256"] for row in rows]
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[dict]:
+        """Stored resumes matching a query (see app/search.py), newest first"""
+        parsed = search.parse_query(query)
+        where, params = [], []
+        if parsed.match is not None:
+            where.append("resume_text MATCH ?")
+            params.append(parsed.match)
+        if parsed.min_months is not None:
+            where.append("r.experience_months >= ?")
+            params.append(parsed.min_months)
+        if parsed.max_months is not None:
+            where.append("r.experience_months <= ?")
+            params.append(parsed.max_months)
+        if parsed.match is not None:
+            # Ordered by the index's own rowid, FTS5 walks its posting lists newest first and
+            # LIMIT stops it after the first hits; ORDER BY r.id would sort every match
+            source, order = "resume_text JOIN resumes r ON r.id = resume_text.rowid", "resume_text.rowid"
+        else:
+            source, order = "resumes r", "r.id"
+        sql = (f"SELECT r.sha256, r.filename, r.name, r.experience_months FROM {source} "
+               f"WHERE {' AND '.join(where)} ORDER BY {order} DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+            except sqlite3.OperationalError as e:
+                raise ValueError(f"Invalid query: {e}") from None
+        return [{"sha256": row["sha256"], "filename": row["filename"], "name": row["name"],
+                 "experience_years": round(row["experience_months"] / 12, 1)} for row in rows]
+
+    def ranker(self) -> ranking.TfidfIndex:
+        """The TF-IDF matrix over every stored result, loaded on first use"""
+        with self._lock:
+            if self._ranker is not None:
+                return self._ranker
+            ranker = ranking.TfidfIndex()
+            last = 0
+            while True:
+                rows = self._conn.execute("SELECT * FROM resumes WHERE id > ? ORDER BY id LIMIT ?",
+                                          (last, STORE_BATCH_SIZE)).fetchall()
+                if not rows:
+                    break
+                last = rows[-1]["id"]
+                ranker.add_many((r["sha256"], r["data"]) for r in self._assemble(rows))
+            self._ranker = ranker
+            return ranker
+
+    def rank(self, job: str, k: int = 20) -> List[dict]:
+        """The k stored resumes closest to a job description, best first"""
+        ranked = self.ranker().rank(job, k)
+        if not ranked:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT sha256, filename, name FROM resumes WHERE sha256 IN ({', '.join('?' * len(ranked))})",
+                [r.key for r in ranked]).fetchall()
+        found = {row["sha256"]: row for row in rows}
+        return [{"sha256": r.key, "filename": found[r.key]["filename"], "name": found[r.key]["name"],
+                 "score": r.score, "skills": r.skills} for r in ranked if r.key in found]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def records(self, batch_size: int = STORE_BATCH_SIZE) -> Iterator[List[dict]]:
+        """Every stored result in insertion order, batch_size at a time"""
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute("SELECT * FROM resumes WHERE id > ? ORDER BY id LIMIT ?",
+                                          (last, batch_size)).fetchall()
+                if not rows:
+                    return
+                batch = self._assemble(rows)
+            last = rows[-1]["id"]
+            yield batch
+
+    def _assemble(self, rows: List[sqlite3.Row]) -> List[dict]:
+        """Records for resume rows, children fetched in one query per table"""
+        ids = [row["id"] for row in rows]
+        marks = ", ".join("?" * len(ids))
+        children = {}
+        for table, fields in (("experience", EXPERIENCE_FIELDS), ("education", EDUCATION_FIELDS),
+                              ("skills", ("skill",))):
+            by_resume = children[table] = {i: [] for i in ids}
+            query = (f"SELECT resume_id, {', '.join(fields)} FROM {table} "
+                     f"WHERE resume_id IN ({marks}) ORDER BY resume_id, position")
+            for child in self._conn.execute(query, ids):
+                item = {f: child[f] for f in fields}
+                by_resume[child["resume_id"]].append(item["skill"] if table == "skills" else item)
+        return [{
+            "sha256": row["sha256"],
+            "filename": row["filename"],
+            "extracted_at": row["extracted_at"],
+            "data": {
+                "name": row["name"], "email": row["email"], "phone": row["phone"],
+                "location": row["location"], "links": json.loads(row["links"]), "summary": row["summary"],
+                "skills": children["skills"][row["id"]],
+                "experience": children["experience"][row["id"]],
+                "education": children["education"][row["id"]],
+                "certifications": json.loads(row["certifications"]),
+            },
+        } for row in rows]
+
+
+def arrow_schema():
+    """Columns of the Parquet/Arrow export: one row per resume, sections as nested lists"""
+    pa = pyarrow
+    text = pa.string()
+    return pa.schema([
+        ("sha256", text), ("filename", text), ("extracted_at", pa.float64()),
+        ("name", text), ("email", text), ("phone", text), ("location", text),
+        ("links", pa.list_(text)), ("summary", text), ("skills", pa.list_(text)),
+        ("experience", pa.list_(pa.struct([(f, pa.int64() if f == "tenure_months" else text)
+                                           for f in EXPERIENCE_FIELDS]))),
+        ("education", pa.list_(pa.struct([(f, text) for f in EDUCATION_FIELDS]))),
+        ("certifications", pa.list_(text)),
+    ])
+
+
+def export(store: ResultStore, path: str, fmt: Optional[str] = None,
+           batch_size: int = STORE_BATCH_SIZE) -> int:
+    """Write every stored result to path as jsonl, parquet or arrow; returns how many.
+
+    The format defaults to the file extension. Results are streamed batch by
+    batch, so the export never holds the whole store in memory.
+    """
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in ("jsonl", "parquet", "arrow"):
+        raise ValueError(f"Unknown export format: {fmt!r} (jsonl, parquet or arrow)")
+    count = 0
+    if fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as out:
+            for batch in store.records(batch_size):
+                out.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in batch)
+                count += len(batch)
+        return count
+
+    if pyarrow is None:
+        raise RuntimeError(f"{fmt} export needs pyarrow: pip install pyarrow")
+    schema = arrow_schema()
+    writer = (pyarrow.parquet.ParquetWriter(path, schema) if fmt == "parquet"
+              else pyarrow.ipc.new_file(path, schema))
+    try:
+        for batch in store.records(batch_size):
+            rows = [{"sha256": r["sha256"], "filename": r["filename"], "extracted_at": r["extracted_at"],
+                     **r["data"]} for r in batch]
+            writer.write_table(pyarrow.Table.from_pylist(rows, schema=schema))
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def default_store() -> Optional[ResultStore]:
+    """The RESULT_DB store, opened on first use; None when RESULT_DB is unset"""
+    global _store
+    if not RESULT_DB:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(RESULT_DB)
+        return _store
+
+
+if hasattr(os, "register_at_fork"):
+    # A connection must not be used across a fork; the child opens its own
+    os.register_at_fork(after_in_child=lambda: globals().update(_store=None, _store_lock=threading.Lock()))
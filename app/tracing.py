@@ -0,0 +1,403 @@
+"""Request tracing: a trace ID per request and timed spans for each step.
+
+    TRACE_FILE=spans.jsonl uvicorn app.main:app
+    TRACE_OTLP_ENDPOINT=http://localhost:4318/v1/traces uvicorn app.main:app
+    python -m app.tracing collect --port 4318 -o spans.jsonl   # local collector stand-in
+    python -m app.tracing slowest spans.jsonl -n 10            # slowest traces, span by span
+
+Spans nest through a context variable, so stages run on the pipeline's
+thread pool (which copies the caller's context) still hang off their
+request. Finished spans are queued and written by a background thread as
+JSON lines to TRACE_FILE, or posted in batches as OTLP/HTTP JSON to
+TRACE_OTLP_ENDPOINT. With neither set, span() is a no-op and only the
+trace ID is kept.
+"""
+import argparse
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+
+from app.metrics import METRICS
+
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+TRACE_OTLP_ENDPOINT = os.environ.get("TRACE_OTLP_ENDPOINT", "")
+TRACE_SERVICE = os.environ.get("TRACE_SERVICE", "resume-extractor")
+# Spans held for export before new ones are dropped, and the longest a span waits
+TRACE_QUEUE_SIZE = int(os.environ.get("TRACE_QUEUE_SIZE", "10000"))
+TRACE_FLUSH_SECONDS = float(os.environ.get("TRACE_FLUSH_SECONDS", "1"))
+
+# (trace_id, span_id) of the innermost open span
+_current: contextvars.ContextVar[Optional[Tuple[str, Optional[str]]]] = \
+    contextvars.ContextVar("trace", default=None)
+
+
+def new_trace_id(traceparent: Optional[str] = None) -> str:
+    """The trace ID from a W3C traceparent header, or a fresh one"""
+    if traceparent:
+        parts = traceparent.split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and parts[1] != "0" * 32:
+            try:
+                int(parts[1], 16)
+                return parts[1].lower()
+            except ValueError:
+                pass
+    return secrets.token_hex(16)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current.get()
+    return trace[0] if trace else None
+
+
+class Span:
+    """A timed, named step; use as a context manager"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start", "end",
+                 "error", "_started", "_token")
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, attributes: Optional[dict] = None):
+        parent = _current.get()
+        self.name = name
+        self.trace_id = trace_id or (parent[0] if parent else secrets.token_hex(16))
+        self.parent_id = parent[1] if parent and parent[0] == self.trace_id else None
+        self.span_id = secrets.token_hex(8)
+        self.attributes = attributes or {}
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.start = time.time_ns()
+        self._started = time.perf_counter_ns()
+        self._token = _current.set((self.trace_id, self.span_id))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = self.start + time.perf_counter_ns() - self._started
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _exporter.submit(self)
+        return False
+
+    def record(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_ns": self.start,
+            "duration_ms": round((self.end - self.start) / 1e6, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _TraceContext:
+    """Makes trace_id current without recording a span, when tracing is off"""
+
+    __slots__ = ("trace_id", "_token")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self):
+        self._token = _current.set((self.trace_id, None))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        return False
+
+
+def span(name: str, **attributes):
+    """A child of the current span; a shared no-op when no exporter is configured"""
+    if _exporter.sink is None:
+        return _NOOP
+    return Span(name, attributes=attributes)
+
+
+def root_span(name: str, trace_id: str, **attributes):
+    """The top span of a request; makes trace_id current even when nothing is exported"""
+    if _exporter.sink is None:
+        return _TraceContext(trace_id)
+    return Span(name, trace_id, attributes)
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_otlp_value(value: dict):
+    kind, v = next(iter(value.items()))
+    return int(v) if kind == "intValue" else v
+
+
+def to_otlp(records: List[dict], service: str = TRACE_SERVICE) -> dict:
+    """An OTLP/HTTP JSON ExportTraceServiceRequest for span records"""
+    spans = []
+    for r in records:
+        otlp = {
+            "traceId": r["trace_id"],
+            "spanId": r["span_id"],
+            "name": r["name"],
+            "kind": 2 if r["parent_id"] is None else 1,
+            "startTimeUnixNano": str(r["start_unix_ns"]),
+            "endTimeUnixNano": str(r["start_unix_ns"] + int(r["duration_ms"] * 1e6)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in r["attributes"].items()],
+            "status": {"code": 2, "message": r["error"]} if r["error"] else {"code": 1},
+        }
+        if r["parent_id"]:
+            otlp["parentSpanId"] = r["parent_id"]
+        spans.append(otlp)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service}}]},
+        "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": spans}],
+    }]}
+
+
+def from_otlp(body: dict) -> List[dict]:
+    """Span records from an OTLP/HTTP JSON request"""
+    records = []
+    for resource in body.get("resourceSpans", []):
+        for scope in resource.get("scopeSpans", []):
+            for s in scope.get("spans", []):
+                start, end = int(s["startTimeUnixNano"]), int(s["endTimeUnixNano"])
+                status = s.get("status", {})
+                records.append({
+                    "trace_id": s["traceId"],
+                    "span_id": s["spanId"],
+                    "parent_id": s.get("parentSpanId") or None,
+                    "name": s["name"],
+                    "start_unix_ns": start,
+                    "duration_ms": round((end - start) / 1e6, 3),
+                    "status": "error" if status.get("code") == 2 else "ok",
+                    "error": status.get("message") if status.get("code") == 2 else None,
+                    "attributes": {a["key"]: _from_otlp_value(a["value"]) for a in s.get("attributes", [])},
+                })
+    return records
+
+
+class JsonLinesSink:
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, records: List[dict]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+
+class OtlpSink:
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def write(self, records: List[dict]):
+        request = urllib.request.Request(self.endpoint, json.dumps(to_otlp(records)).encode(),
+                                         {"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as resp:
+            resp.read()
+
+
+class Exporter:
+    """Queues finished spans and writes them in batches from a daemon thread"""
+
+    def __init__(self, sink=None, queue_size: int = TRACE_QUEUE_SIZE, interval: float = TRACE_FLUSH_SECONDS):
+        self.sink = sink
+        self.interval = interval
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._failed = False
+
+    def submit(self, span: Span):
+        if self.sink is None:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            METRICS.incr("tracing.dropped")
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, daemon=True, name="trace-export")
+                    self._thread.start()
+
+    def _drain(self) -> List[Span]:
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def flush(self):
+        batch = self._drain()
+        if not batch or self.sink is None:
+            return
+        try:
+            self.sink.write([s.record() for s in batch])
+            self._failed = False
+        except Exception as e:
+            METRICS.incr("tracing.dropped", len(batch))
+            if not self._failed:
+                # Once per outage, not once per batch
+                print(f"Warning: could not export {len(batch)} spans: {e}")
+                self._failed = True
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def _after_fork(self):
+        # The export thread did not survive the fork; the child starts its own
+        self._thread = None
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(self._queue.maxsize)
+
+
+def _default_sink():
+    if TRACE_OTLP_ENDPOINT:
+        return OtlpSink(TRACE_OTLP_ENDPOINT)
+    if TRACE_FILE:
+        return JsonLinesSink(TRACE_FILE)
+    return None
+
+
+_exporter = Exporter(_default_sink())
+atexit.register(lambda: _exporter.flush())
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _exporter._after_fork())
+
+
+def configure(sink) -> Exporter:
+    """Replace the exporter (None disables tracing); returns the previous one"""
+    global _exporter
+    previous, _exporter = _exporter, Exporter(sink)
+    previous.flush()
+    return previous
+
+
+def load(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def slowest(records: List[dict], n: int = 10) -> List[dict]:
+    """The n slowest traces by root span, each with its spans in start order"""
+    traces = defaultdict(list)
+    for r in records:
+        traces[r["trace_id"]].append(r)
+    roots = [next((s for s in spans if s["parent_id"] is None), None) for spans in traces.values()]
+    roots = sorted((r for r in roots if r is not None), key=lambda r: r["duration_ms"], reverse=True)[:n]
+    return [{"root": root, "spans": sorted(traces[root["trace_id"]], key=lambda s: s["start_unix_ns"])}
+            for root in roots]
+
+
+def _print_slowest(path: str, n: int):
+    for trace in slowest(load(path), n):
+        root = trace["root"]
+        print(f"{root['trace_id']} {root['name']} {root['duration_ms']:.1f} ms {root['status']} "
+              + " ".join(f"{k}={v}" for k, v in root["attributes"].items()))
+        depth = {root["span_id"]: 0}
+        for s in trace["spans"]:
+            if s is root:
+                continue
+            depth[s["span_id"]] = depth.get(s["parent_id"], 0) + 1
+            share = s["duration_ms"] / root["duration_ms"] if root["duration_ms"] else 0
+            flag = f"  {s['error']}" if s["error"] else ""
+            print(f"  {'  ' * (depth[s['span_id']] - 1)}{s['name']:{28 - 2 * depth[s['span_id']]}} "
+                  f"{s['duration_ms']:9.2f} ms {share:5.0%}{flag}")
+
+
+def collect(port: int, output: str):
+    """Accept OTLP/HTTP JSON on /v1/traces and append the spans to output as JSON lines"""
+    sink = JsonLinesSink(output)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/v1/traces":
+                self.send_error(404)
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                sink.write(from_otlp(body))
+            except (ValueError, KeyError) as e:
+                self.send_error(400, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, fmt, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"collecting spans on http://127.0.0.1:{port}/v1/traces into {output}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.tracing", description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    cmd = commands.add_parser("collect", help="run a local OTLP/HTTP JSON collector writing JSON lines")
+    cmd.add_argument("--port", type=int, default=4318)
+    cmd.add_argument("-o", "--output", default="spans.jsonl")
+    cmd = commands.add_parser("slowest", help="print the slowest traces in a JSON-lines span file")
+    cmd.add_argument("path")
+    cmd.add_argument("-n", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == "collect":
+        collect(args.port, args.output)
+    else:
+        _print_slowest(args.path, args.n)
+
+
+if __name__ == "__main__":
+    main()
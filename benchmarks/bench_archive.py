@@ -0,0 +1,69 @@
+"""Zip uploads: one /extract/archive call vs a /extract call per file.
+
+    python -m benchmarks.bench_archive [--copies 10]
+
+A zip of the bundled DOCX and PDF samples is posted to /extract/archive
+and, as today's clients do, unpacked and posted file by file to /extract.
+Both go through the in-process test client and the parse sandbox. A
+deflated member of 1 GB of zeros shows how quickly a zip bomb is refused.
+"""
+import argparse
+import io
+import os
+import time
+import zipfile
+
+from tests.fixtures import SAMPLES
+
+
+def main():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=10)
+    args = parser.parse_args()
+
+    members = {}
+    for name in ("Sample Resume 2.docx", "sampleresume.pdf"):
+        with open(os.path.join(SAMPLES, name), "rb") as f:
+            data = f.read()
+        stem, ext = os.path.splitext(name)
+        for i in range(args.copies):
+            members[f"{stem}-{i}{ext}"] = data
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in members.items():
+            z.writestr(name, data)
+    archive = buf.getvalue()
+
+    client = TestClient(app)
+    client.post("/extract", files={"file": ("warm.docx", members[next(iter(members))])})  # start the sandbox
+    print(f"{len(members)} files, {len(archive) >> 10} KB zip")
+
+    start = time.perf_counter()
+    for name, data in members.items():
+        assert client.post("/extract", files={"file": (name, data)}).status_code == 200
+    print(f"  /extract per file          {time.perf_counter() - start:7.2f} s")
+
+    start = time.perf_counter()
+    resp = client.post("/extract/archive", files={"file": ("batch.zip", archive)})
+    lines = resp.text.splitlines()
+    assert len(lines) == len(members) + 1 and '"errors": 0' in lines[-1]
+    print(f"  /extract/archive           {time.perf_counter() - start:7.2f} s")
+
+    bomb = io.BytesIO()
+    with zipfile.ZipFile(bomb, "w", zipfile.ZIP_DEFLATED) as z:
+        with z.open("zeros.pdf", "w", force_zip64=True) as f:
+            chunk = bytes(1 << 20)
+            for _ in range(1024):
+                f.write(chunk)
+    start = time.perf_counter()
+    resp = client.post("/extract/archive", files={"file": ("bomb.zip", bomb.getvalue())})
+    seconds = time.perf_counter() - start
+    print(f"  1 GB bomb ({len(bomb.getvalue()) >> 10} KB zip)     {seconds * 1000:7.1f} ms, "
+          f"HTTP {resp.status_code}: {resp.json().get('detail') if resp.status_code != 200 else resp.text.strip()}")
+
+
+if __name__ == "__main__":
+    main()
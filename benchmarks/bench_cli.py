@@ -0,0 +1,64 @@
+"""Bulk extraction throughput: HTTP API per file vs the CLI's process pool.
+
+    python -m benchmarks.bench_cli [--copies 20] [--workers N]
+
+Copies of the bundled DOCX and PDF samples (each made unique so the
+checkpoint does not skip them) are extracted by posting each file to
+/extract through the in-process test client, then by app.cli with no pool
+and with --workers processes. A final rerun shows the cost of skipping
+files already in the checkpoint.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from tests.fixtures import SAMPLES
+
+
+def main():
+    from fastapi.testclient import TestClient
+    from app.cli import extract
+    from app.main import app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--copies", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        root = os.path.join(tmp, "resumes")
+        os.makedirs(root)
+        for name in ("Sample Resume 2.docx", "sampleresume.pdf"):
+            with open(os.path.join(SAMPLES, name), "rb") as f:
+                data = f.read()
+            stem, ext = os.path.splitext(name)
+            for i in range(args.copies):
+                with open(os.path.join(root, f"{stem}-{i}{ext}"), "wb") as f:
+                    f.write(data + f"\n%{i}\n".encode())  # trailing bytes: same text, new hash
+        files = sorted(os.listdir(root))
+        print(f"{len(files)} files, {os.cpu_count()} CPUs")
+
+        client = TestClient(app)
+        start = time.perf_counter()
+        for name in files:
+            with open(os.path.join(root, name), "rb") as f:
+                assert client.post("/extract", files={"file": (name, f)}).status_code == 200
+        seconds = time.perf_counter() - start
+        print(f"  HTTP /extract, sequential    {len(files) / seconds:7.1f} files/s")
+
+        for label, workers in [("CLI, in-process", 0), (f"CLI, {args.workers} workers", args.workers)]:
+            out = os.path.join(tmp, f"out{workers}.jsonl")
+            counts = extract(root, out, out + ".done", workers)
+            assert counts["errors"] == 0
+            print(f"  {label:28} {len(files) / counts['seconds']:7.1f} files/s")
+        counts = extract(root, out, out + ".done", args.workers)
+        print(f"  CLI rerun, all checkpointed  {len(files) / counts['seconds']:7.1f} files/s")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
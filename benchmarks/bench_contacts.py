@@ -0,0 +1,85 @@
+"""Contact extraction: three legacy regex scans vs the fused single scan.
+
+    python -m benchmarks.bench_contacts [--size 100000]
+
+Documents are deterministic and digit-heavy: numeric tables, spaced digit
+groups that look almost like phone numbers, and unbroken digit/identifier
+runs (hashes, scanned barcodes) where the legacy email pattern backtracks
+quadratically. Quadratic cases are timed on a smaller slice.
+"""
+import argparse
+import random
+import re
+
+from benchmarks.bench_skills import RESUME, timed
+from extractors.patterns import extract_contacts
+
+LEGACY_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+LEGACY_PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-\s]?)?(?:\d{10}|\d{3}[-\s]?\d{3}[-\s]?\d{4})")
+LEGACY_URL_RE = re.compile(r"https?://[^\s]+|(?:www\.)?linkedin\.com/[^\s]+|github\.com/[^\s]+")
+
+
+def legacy_contacts(text: str) -> dict:
+    email = LEGACY_EMAIL_RE.search(text)
+    phone = LEGACY_PHONE_RE.search(text)
+    return {
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0) if phone else None,
+        "links": list(set(LEGACY_URL_RE.findall(text))),
+    }
+
+
+def legacy_positions(text: str) -> list:
+    """What the fused scan returns, with the legacy regexes: three full passes"""
+    return sorted(
+        (m.start(), m.end(), kind)
+        for kind, regex in (("email", LEGACY_EMAIL_RE), ("phone", LEGACY_PHONE_RE), ("url", LEGACY_URL_RE))
+        for m in regex.finditer(text)
+    )
+
+
+def documents(size: int) -> dict:
+    rng = random.Random(11)
+    table = "\n".join(
+        "\t".join(f"{rng.random() * 1000:.2f}" for _ in range(10)) for _ in range(size // 70)
+    )
+    groups = "\n".join(
+        " ".join(str(rng.randrange(10 ** rng.randrange(1, 9))) for _ in range(12))
+        for _ in range(size // 60)
+    )
+    run = "".join(rng.choice("0123456789") for _ in range(size))
+    ident = ".".join(f"ab{rng.randrange(10 ** 6)}" for _ in range(size // 9))
+    return {
+        "resume": RESUME,
+        "resume + table": RESUME + table,
+        "spaced digit groups": groups + RESUME,
+        "digit run": run + "\n" + RESUME,
+        "dotted id run": ident + "\n" + RESUME,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    quadratic = {"digit run", "dotted id run"}
+    print("legacy: first email/phone + all links (3 scans); legacy all: every match with offsets")
+    print(f"{'document':22} {'chars':>8} {'legacy ms':>10} {'legacy all':>11} {'fused ms':>10}")
+    for name, text in documents(args.size).items():
+        legacy_text = text
+        note = ""
+        if name in quadratic:
+            # Legacy cost grows with the square of the run; time a slice of it
+            legacy_text = text[-(len(RESUME) + args.size // 10):]
+            note = f"  (legacy on {len(legacy_text)} chars)"
+        legacy = timed(lambda: legacy_contacts(legacy_text), repeat=1 if name in quadratic else 10)
+        legacy_all = timed(lambda: legacy_positions(legacy_text), repeat=1 if name in quadratic else 10)
+        fused = timed(lambda: extract_contacts(text), repeat=10)
+        print(f"{name:22} {len(text):8} {legacy:10.2f} {legacy_all:11.2f} {fused:10.2f}{note}")
+
+    print("fields agree on the resume:", extract_contacts(RESUME) == legacy_contacts(RESUME))
+
+
+if __name__ == "__main__":
+    main()
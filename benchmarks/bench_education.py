@@ -0,0 +1,103 @@
+"""Education matching: legacy substring scans vs compiled degree/institution matchers.
+
+    python -m benchmarks.bench_education [--sizes 150,5000,50000]
+
+Vocabularies are the bundled degree list and gazetteer padded with
+deterministic synthetic variants and institution names. The legacy approach
+tests every vocabulary entry as a substring of every block (and matches "ba"
+inside "database"); the matchers scan each block once.
+"""
+import argparse
+import random
+import string
+import time
+import tracemalloc
+
+from benchmarks.bench_skills import timed
+from extractors.education import (
+    Degree, Institution, build_degree_matcher, build_institution_matcher,
+    load_degrees, load_institutions,
+)
+from extractors.sections import as_span
+
+
+def education_section(institutions: list) -> str:
+    """Ten entries naming institutions spread across the gazetteer, plus one unknown school"""
+    step = max(1, len(institutions) // 9)
+    names = [inst.name for inst in institutions[::step][:9]] + ["Springfield Community College"]
+    return "\n\n".join(
+        f"Bachelor of Science in Computer Science – {name} – Philadelphia, PA\t{2000 + i}\n"
+        f"Coursework: databases, distributed systems, statistics. GPA 3.{i}"
+        for i, name in enumerate(names)
+    )
+
+
+def legacy_extract(section_text: str, degree_words: list, institutions: list) -> list:
+    found = []
+    for block in section_text.split("\n\n"):
+        block_lower = block.lower()
+        if any(deg in block_lower for deg in degree_words):
+            degree = next((d for d in degree_words if d in block_lower), None)
+            institution = next((i for i in institutions if i in block_lower), None)
+            found.append((degree, institution))
+    return found
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+
+
+def vocabularies(size: int) -> tuple:
+    rng = random.Random(size)
+    degrees = load_degrees()
+    while sum(1 + len(d.aliases) for d in degrees) < size // 10:
+        degrees.append(Degree(f"Master of {_word(rng).title()}", (f"m.{_word(rng)[:3]}",), ()))
+    institutions = load_institutions()
+    templates = ("University of {}", "{} College", "{} Institute of Technology", "{} {} University")
+    while len(institutions) < size:
+        name = rng.choice(templates).format(*(_word(rng).title() for _ in range(2)))
+        institutions.append(Institution(name, None, ()))
+    return degrees, institutions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="150,5000,50000")
+    args = parser.parse_args()
+
+    print(f"{'institutions':>12} {'degree vars':>11} {'build ms':>9} {'heap MB':>8} "
+          f"{'legacy ms':>10} {'matcher ms':>11}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        degrees, institutions = vocabularies(size)
+        degree_words = [v.casefold() for d in degrees for v in (d.name,) + d.aliases + d.ambiguous]
+        inst_names = [i.name.casefold() for i in institutions]
+
+        start = time.perf_counter()
+        degree_matcher = build_degree_matcher(degrees)
+        inst_matcher = build_institution_matcher(institutions)
+        build = (time.perf_counter() - start) * 1000
+        # Heap is measured on a second build; tracemalloc would inflate the timing
+        tracemalloc.start()
+        kept = build_degree_matcher(degrees), build_institution_matcher(institutions)
+        heap = tracemalloc.get_traced_memory()[0] / 2 ** 20
+        del kept
+        tracemalloc.stop()
+
+        section = education_section(institutions)
+        span = as_span(section)
+
+        def matched():
+            found = []
+            for block in span.blocks():
+                lowered = block.lower
+                found.append((degree_matcher.find(lowered), inst_matcher.find(lowered)))
+            return found
+
+        legacy = timed(lambda: legacy_extract(section, degree_words, inst_names), repeat=5)
+        fast = timed(matched)
+        print(f"{len(institutions):12} {len(degree_words):11} {build:9.0f} {heap:8.1f} "
+              f"{legacy:10.2f} {fast:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
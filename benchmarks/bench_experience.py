@@ -0,0 +1,72 @@
+"""Experience segmentation: legacy blank-line blocks vs the single-pass segmenter.
+
+    python -m benchmarks.bench_experience [--positions 30,100,300]
+
+Sections are deterministic and laid out the way pdfplumber emits them: no
+blank lines, dates either at the end of the header line or on their own line
+above it. The legacy extractor sees one block and one date range; the
+segmenter should find every position at a constant cost per line.
+"""
+import argparse
+import random
+import re
+
+from benchmarks.bench_skills import timed
+from extractors.experience import extract_experience
+from extractors.sections import as_span
+
+LEGACY_DATE_RANGE = re.compile(
+    r"([A-Za-z]{3,9}\s?\d{4}|\d{4})\s?[-–—]\s?([A-Za-z]{3,9}\s?\d{4}|\d{4}|present|current)",
+    re.IGNORECASE
+)
+MONTHS = ("Jan", "Feb", "March", "April", "May", "June", "July", "Aug", "Sept", "October", "Nov", "Dec")
+
+
+def legacy_extract(section_text: str) -> list:
+    items = []
+    for block in section_text.split("\n\n"):
+        lines = [l.strip() for l in block.split("\n") if l.strip()]
+        if lines:
+            m = LEGACY_DATE_RANGE.search(block)
+            items.append((lines[0], m.groups() if m else (None, None)))
+    return items
+
+
+def experience_section(positions: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    lines = []
+    year = 2024
+    for i in range(positions):
+        start_year = year - rng.randint(1, 3)
+        dates = f"{rng.choice(MONTHS)} {start_year} – {rng.choice(MONTHS)} {year}"
+        header = f"Senior Engineer – Company{i} – Philadelphia, PA"
+        if i % 2:
+            lines.append(f"{header}\t{dates}")
+        else:
+            lines += [dates, header]
+        lines += [f"• Built service {j} handling {rng.randint(10, 900)}k requests per day." for j in range(4)]
+        # Long synthetic histories wrap around rather than leave the 1900s
+        year = start_year if start_year > 1960 else 2024
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--positions", default="30,100,300")
+    args = parser.parse_args()
+
+    print(f"{'positions':>9} {'chars':>7} {'legacy found':>12} {'found':>6} "
+          f"{'legacy ms':>10} {'segmenter ms':>13} {'us/position':>12}")
+    for n in (int(p) for p in args.positions.split(",")):
+        section = experience_section(n)
+        span = as_span(section)
+        legacy_found = len(legacy_extract(section))
+        found = len(extract_experience(span))
+        legacy = timed(lambda: legacy_extract(section), repeat=10)
+        fast = timed(lambda: extract_experience(span), repeat=10)
+        print(f"{n:9} {len(section):7} {legacy_found:12} {found:6} "
+              f"{legacy:10.3f} {fast:13.3f} {fast * 1000 / n:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
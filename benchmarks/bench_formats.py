@@ -0,0 +1,76 @@
+"""Rejecting bad uploads: extension dispatch vs content sniffing with pre-validation.
+
+    python -m benchmarks.bench_formats
+
+Each case is a file a client might upload: mislabeled documents, an
+encrypted PDF, a PDF with no pages and an oversized image. The legacy path
+picks the parser from the extension and fails (or succeeds) inside the full
+parse; the new path sniffs magic bytes and runs the parser's cheap checks.
+Tesseract may not be installed, so for images the legacy cost is the
+decode and grayscale conversion that precede OCR.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image, ImageOps
+
+from parsers import parse_docx, parse_file, parse_pdf
+from tests.fixtures import EMPTY_PDF, ENCRYPTED_PDF, SAMPLES
+
+
+def legacy(path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        return parse_pdf(path)
+    if ext in (".docx", ".doc"):
+        return parse_docx(path)
+    # parse_image up to the OCR call
+    return ImageOps.grayscale(Image.open(path))
+
+
+def timed_outcome(fn, path: str, repeat: int = 5) -> tuple:
+    best, outcome = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            fn(path)
+            outcome = "parsed"
+        except Exception as e:
+            outcome = type(e).__name__
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, outcome
+
+
+def main():
+    tmp = tempfile.mkdtemp()
+    try:
+        cases = []
+        for name, src in [("docx named .pdf", "Sample Resume 2.docx"),
+                          ("pdf named .docx", "sampleresume.pdf"),
+                          ("jpeg named .pdf", "Simple-Sales-Manager-CV-Resume-1.jpg")]:
+            ext = ".docx" if "docx" in name.split()[-1] else ".pdf"
+            path = os.path.join(tmp, name.replace(" ", "_") + ext)
+            shutil.copy(os.path.join(SAMPLES, src), path)
+            cases.append((name, path))
+        for name, data in [("encrypted pdf", ENCRYPTED_PDF), ("pdf without pages", EMPTY_PDF)]:
+            path = os.path.join(tmp, name.replace(" ", "_") + ".pdf")
+            with open(path, "wb") as f:
+                f.write(data)
+            cases.append((name, path))
+        path = os.path.join(tmp, "huge.png")
+        Image.new("L", (9000, 9000), 255).save(path)
+        cases.append(("9000x9000 png", path))
+
+        print(f"{'case':20} {'legacy ms':>10} {'outcome':>22} {'sniffed ms':>11} {'outcome':>22}")
+        for name, path in cases:
+            old_ms, old = timed_outcome(legacy, path)
+            new_ms, new = timed_outcome(parse_file, path)
+            print(f"{name:20} {old_ms:10.2f} {old:>22} {new_ms:11.3f} {new:>22}")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Fuzzy skill matching on OCR-style text: recall and latency.
+
+    python -m benchmarks.bench_fuzzy [--docs 50] [--vocab 20000]
+
+Tesseract output for tests/sample_resumes/*.jpg is used when tesseract is
+installed. In every case, deterministic OCR-like noise (transpositions,
+drops, rn/m and l/1 confusions) is applied to the skill mentions of
+synthetic resumes. The bundled taxonomy is compared exact vs fuzzy, and
+lookup latency over a large synthetic vocabulary is compared between the
+trigram index and a naive edit-distance scan of every term.
+"""
+import argparse
+import glob
+import os
+import random
+import shutil
+import time
+
+from benchmarks.bench_skills import REAL_TERMS, synthetic_terms, timed
+from extractors.context import DocumentContext
+from extractors.fuzzy import TrigramIndex, allowed_edits, bounded_distance, find_fuzzy
+from extractors.skills import extract_skills
+from tests.fixtures import SAMPLES
+
+SKILLS = ["python", "kubernetes", "postgresql", "javascript", "tensorflow", "docker",
+          "terraform", "elasticsearch", "machine learning", "typescript", "jenkins", "pandas"]
+CONFUSIONS = [("rn", "m"), ("m", "rn"), ("l", "1"), ("e", "c"), ("i", "l")]
+
+
+def ocr_noise(word: str, rng: random.Random) -> str:
+    kind = rng.randrange(4)
+    i = rng.randrange(1, len(word) - 1)
+    if kind == 0:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    if kind == 1:
+        return word[:i] + word[i + 1:]
+    if kind == 2:
+        return word[:i] + word[i] + word[i:]
+    for a, b in CONFUSIONS:
+        j = word.find(a, 1)
+        if j > 0:
+            return word[:j] + b + word[j + len(a):]
+    return word[:i] + word[i + 1:]
+
+
+def synthetic_doc(rng: random.Random) -> tuple:
+    chosen = rng.sample(SKILLS, 6)
+    noisy = [ocr_noise(s, rng) for s in chosen]
+    text = (
+        "Jane Doe\njane@example.com\n\nSummary\nEngineer with experience in "
+        + ", ".join(noisy[:3]) + " at scale.\n\nSkills\n" + ", ".join(noisy[3:])
+        + "\n\nExperience\nBuilt services and data pipelines for analytics teams.\n"
+    )
+    return text, set(chosen)
+
+
+def ocr_samples() -> list:
+    if not shutil.which("tesseract"):
+        return []
+    from parsers.image_parser import parse_image
+    return [parse_image(p) for p in sorted(glob.glob(os.path.join(SAMPLES, "*.jpg")))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--vocab", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    docs = [synthetic_doc(rng) for _ in range(args.docs)]
+    hits = {"exact": 0, "fuzzy": 0}
+    total = false_pos = 0
+    latency = []
+    for text, truth in docs:
+        ctx = DocumentContext(text)
+        section = ctx.section("skills")
+        exact = set(extract_skills(section, ctx.document))
+        start = time.perf_counter()
+        fuzzy = set(extract_skills(section, ctx.document, fuzzy=True))
+        latency.append((time.perf_counter() - start) * 1000)
+        total += len(truth)
+        hits["exact"] += len(exact & truth)
+        hits["fuzzy"] += len(fuzzy & truth)
+        false_pos += len(fuzzy - truth)
+    latency.sort()
+    print(f"synthetic OCR docs: {args.docs}, skill mentions: {total}")
+    print(f"recall exact {hits['exact'] / total:.0%}, fuzzy {hits['fuzzy'] / total:.0%}, "
+          f"fuzzy false positives {false_pos}")
+    print(f"extract_skills(fuzzy=True) p50 {latency[len(latency) // 2]:.2f} ms, "
+          f"max {latency[-1]:.2f} ms")
+
+    for i, text in enumerate(ocr_samples()):
+        ctx = DocumentContext(text)
+        exact = set(extract_skills(ctx.section("skills"), ctx.document))
+        fuzzy = set(extract_skills(ctx.section("skills"), ctx.document, fuzzy=True))
+        print(f"tesseract sample {i}: exact {sorted(exact)}, fuzzy adds {sorted(fuzzy - exact)}")
+
+    # Lookup cost against a large vocabulary: trigram index vs naive scan
+    vocab = synthetic_terms(args.vocab, seed=5) + list(REAL_TERMS) + SKILLS
+    start = time.perf_counter()
+    index = TrigramIndex((t, t) for t in vocab)
+    build_ms = (time.perf_counter() - start) * 1000
+    queries = [ocr_noise(s, rng).replace(" ", "") for s in SKILLS]
+
+    def naive():
+        for q in queries:
+            k = allowed_edits(len(q))
+            min((bounded_distance(q, t.replace(" ", ""), k), t) for t in vocab)
+
+    def indexed():
+        index._cache.clear()
+        for q in queries:
+            index.lookup(q, allowed_edits(len(q)))
+
+    text = docs[0][0].casefold()
+    print(f"vocabulary {len(vocab)} terms (index build {build_ms:.0f} ms), {len(queries)} queries:")
+    print(f"  naive scan    {timed(naive, repeat=3) / len(queries):8.3f} ms/query")
+    print(f"  trigram index {timed(indexed) / len(queries):8.3f} ms/query")
+    print(f"  full document pass, cold cache: "
+          f"{timed(lambda: (index._cache.clear(), find_fuzzy(index, text, budget_ms=1e9))):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
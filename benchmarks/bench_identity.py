@@ -0,0 +1,67 @@
+"""Identity heuristics: how often the header answers, and what it costs.
+
+    python -m benchmarks.bench_identity [--docs 500]
+
+Synthetic resume headers vary the layout (name alone, name with contact
+details on one line, uppercase, a job title first, no name at all) and the
+location (City, ST; gazetteer city; none). Reported are the share of
+headers that skip spaCy, the share whose guessed name is right, and the
+heuristic latency per resume.
+"""
+import argparse
+import random
+
+from benchmarks.bench_skills import RESUME, timed
+from extractors.identity import guess_identity, load_first_names
+
+SURNAMES = ["Smith", "Garcia", "Nguyen", "O'Brien", "Kowalski", "Patel", "Okafor", "Larsen",
+            "Haddad", "Moreau", "Tanaka", "Silva", "Fischer", "Byrne", "Novak", "Reyes"]
+LOCATIONS = ["Austin, TX", "Toronto, ON", "Pune, India", "London", "Berlin, Germany", None]
+TITLES = ["Senior Software Engineer", "Data Analyst", "Product Manager"]
+
+
+def header(rng: random.Random, first_names: list) -> tuple:
+    """(header text, expected name)"""
+    name = f"{rng.choice(first_names).title()} {rng.choice(SURNAMES)}"
+    email = f"{name.split()[0].lower()}@example.com"
+    location = rng.choice(LOCATIONS)
+    contact = " | ".join(p for p in (email, "+1 512 555 0100", location) if p)
+    layout = rng.randrange(5)
+    if layout == 0:
+        lines = [name, contact]
+    elif layout == 1:
+        lines = [f"{name} | {contact}"]
+    elif layout == 2:
+        lines = [name.upper(), TITLES[rng.randrange(3)], contact]
+    elif layout == 3:
+        lines = [TITLES[rng.randrange(3)], name, contact]
+    else:
+        name, lines = None, [contact]
+    return "\n".join(lines) + "\n\n" + RESUME.split("\n", 2)[2], name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    first_names = sorted(load_first_names())
+    docs = [header(rng, first_names) for _ in range(args.docs)]
+    guesses = [guess_identity(text) for text, _ in docs]
+    bypass = sum(g.sufficient for g in guesses)
+    named = [(g, expected) for g, (_, expected) in zip(guesses, docs) if expected]
+    right = sum(g.name == expected for g, expected in named)
+    wrong = sum(g.sufficient and g.name != expected for g, expected in named)
+    invented = sum(g.name is not None for g, (_, expected) in zip(guesses, docs) if not expected)
+
+    print(f"{args.docs} synthetic headers, {len(named)} with a name")
+    print(f"  spaCy skipped          {bypass / args.docs:7.1%}")
+    print(f"  name correct           {right / len(named):7.1%}")
+    print(f"  skipped with bad name  {wrong:7d}")
+    print(f"  name where none given  {invented:7d}")
+    print(f"  guess_identity         {timed(lambda: guess_identity(docs[0][0]), repeat=200) * 1000:7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
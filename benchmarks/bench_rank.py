@@ -0,0 +1,76 @@
+"""Ranking resumes against a job description: TF-IDF matrix vs a per-resume loop.
+
+    python -m benchmarks.bench_rank [--resumes 1000 10000 50000] [--k 20]
+
+Builds the TF-IDF index over deterministic synthetic resumes (the same as
+bench_search) and times one ranking call, best of --repeat. The loop scores
+each resume in Python from its own term-weight dict, with the same idf and
+norms, then sorts. Both must agree on the top k.
+"""
+import argparse
+import math
+import time
+
+from app.ranking import TfidfIndex, features, resume_features
+from benchmarks.bench_search import synthetic_resumes
+from extractors.skills import extract_skills
+
+JOB = ("Senior Platform Engineer. Python, Kubernetes and AWS required; Terraform and Go a plus. "
+       "You will run clusters, build CI/CD pipelines and own latency for customers.")
+
+
+def loop_ranker(index: TfidfIndex, resumes):
+    """Per-resume term-weight dicts with the index's idf, and a scoring loop over them"""
+    idf = dict(zip(index.vocabulary, index._idf().tolist()))
+    vectors = []
+    for key, data, _ in resumes:
+        weights = {t: (1 + math.log(c)) * idf[t] for t, c in resume_features(data).items()}
+        vectors.append((key, weights, math.sqrt(sum(w * w for w in weights.values()))))
+
+    def rank(job: str, k: int):
+        query = {t: (1 + math.log(c)) * idf[t] for t, c in features(job, extract_skills(job)).items() if t in idf}
+        qnorm = math.sqrt(sum(w * w for w in query.values()))
+        scores = []
+        for key, weights, norm in vectors:
+            dot = sum(w * weights.get(t, 0.0) for t, w in query.items())
+            scores.append((dot / (norm * qnorm) if norm else 0.0, key))
+        scores.sort(reverse=True)
+        return [key for score, key in scores[:k] if score > 0]
+    return rank
+
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    extract_skills(JOB)  # load the taxonomy outside the timings
+    print(f"{'resumes':>8} {'nonzeros':>10} {'build s':>8} {'matrix ms':>10} {'loop ms':>9} {'speedup':>8}")
+    for n in args.resumes:
+        resumes = list(synthetic_resumes(n))
+        index = TfidfIndex()
+        start = time.perf_counter()
+        index.add_many((key, data) for key, data, _ in resumes)
+        build = time.perf_counter() - start
+        index.rank(JOB, args.k)  # first call refreshes the norms
+        loop = loop_ranker(index, resumes)
+        assert [r.key for r in index.rank(JOB, args.k)] == loop(JOB, args.k)
+        matrix_ms = best_ms(lambda: index.rank(JOB, args.k), args.repeat)
+        loop_ms = best_ms(lambda: loop(JOB, args.k), max(1, args.repeat // 2))
+        print(f"{n:>8} {index._size:>10} {build:>8.2f} {matrix_ms:>10.2f} {loop_ms:>9.1f} "
+              f"{loop_ms / matrix_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
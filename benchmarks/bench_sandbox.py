@@ -0,0 +1,67 @@
+"""Sandboxed parsing: overhead per document and isolation from a rogue one.
+
+    python -m benchmarks.bench_sandbox
+
+Compares in-process parse_file with the subprocess pool on the bundled
+samples (cold start, warm workers, and the cost of recycling), then parses
+the samples while a second worker spins on a document until its timeout,
+to show healthy requests are unaffected.
+
+Workers re-import this module as __main__, so heavy imports stay inside
+main() to keep them out of the measured worker start.
+"""
+import os
+import threading
+import time
+
+from parsers import ParseTimeoutError, SandboxPool, parse_file
+from parsers.registry import PARSERS
+from tests.fixtures import SAMPLES, spin
+
+DOCS = [os.path.join(SAMPLES, name) for name in ("sampleresume.pdf", "Sample Resume 2.docx")]
+
+
+def parse_all(pool=None):
+    for path in DOCS:
+        (pool.parse if pool else parse_file)(path)
+
+
+def main():
+    from benchmarks.bench_skills import timed
+
+    start = time.perf_counter()
+    pool = SandboxPool(workers=1)
+    parse_all(pool)
+    cold = (time.perf_counter() - start) * 1000
+    print(f"{len(DOCS)} documents")
+    print(f"  in-process                    {timed(parse_all, repeat=10):8.1f} ms")
+    print(f"  sandbox, warm worker          {timed(lambda: parse_all(pool), repeat=10):8.1f} ms")
+    print(f"  sandbox, first call           {cold:8.1f} ms (forkserver start + preload)")
+    pool.close()
+
+    recycling = SandboxPool(workers=1, max_jobs=1)
+    parse_all(recycling)
+    print(f"  sandbox, new worker per doc   {timed(lambda: parse_all(recycling), repeat=10):8.1f} ms")
+    recycling.close()
+
+    PARSERS["application/pdf"] = PARSERS["application/pdf"]._replace(timeout=3)
+    rogue = SandboxPool(workers=1, parse=spin)
+    healthy = SandboxPool(workers=1)
+    parse_all(healthy)
+
+    def stuck():
+        try:
+            rogue.parse(DOCS[0])
+        except ParseTimeoutError:
+            pass
+
+    thread = threading.Thread(target=stuck)
+    thread.start()
+    print(f"  sandbox, beside a rogue parse {timed(lambda: parse_all(healthy), repeat=10):8.1f} ms")
+    thread.join()
+    rogue.close()
+    healthy.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Search latency over a synthetic result store of a given size.
+
+    python -m benchmarks.bench_search [--resumes 100000] [--db store.db] [--scan]
+
+Fills a store with deterministic synthetic resumes (skills drawn from the real
+taxonomy with a skewed distribution, one to five dated roles each), reports
+write rate and on-disk size, then times each query: best and median of
+repeated runs, and the number of hits in the first page. --db keeps the store
+for later runs; an existing store with enough resumes is reused. --scan also
+times the same boolean query as a linear pass over the stored JSON.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.store import ResultStore
+from extractors.skills import load_taxonomy
+
+ROLES = ("engineer", "developer", "analyst", "manager", "consultant", "designer", "scientist",
+         "administrator", "architect", "intern", "lead", "director")
+LEVELS = ("", "senior ", "junior ", "staff ", "principal ")
+AREAS = ("software", "data", "platform", "backend", "frontend", "sales", "marketing", "support",
+         "security", "cloud", "mobile", "research")
+DEGREES = ("BSc Computer Science", "MSc Data Science", "BA Economics", "MBA", "PhD Physics",
+           "BEng Electrical Engineering", "MSc Software Engineering", "BA Marketing")
+
+QUERIES = (
+    "python",
+    "python AND kubernetes",
+    "python AND kubernetes, 5+ years",
+    "skill:k8s AND (go OR rust) NOT role:intern",
+    'role:"senior software engineer" company:company17',
+    "degree:msc* years:2-4",
+    "text:clusters AND skill:aws",
+    "years:15+",
+    "cobol AND fortran AND haskell",
+)
+
+
+def synthetic_resumes(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    skills = [s.name for s in load_taxonomy()]
+    # Zipf-like: a few skills are on most resumes, the tail on few
+    weights = [1 / (rank + 1) for rank in range(len(skills))]
+    words = [f"w{i}" for i in range(5000)] + ["clusters", "pipelines", "customers", "migrations", "latency"]
+    for i in range(n):
+        experience = []
+        year = rng.randint(1998, 2022)
+        for _ in range(rng.randint(1, 5)):
+            months = rng.randint(3, 72)
+            end = year * 12 + rng.randint(0, 11) + months
+            experience.append({
+                "company": f"Company{rng.randint(0, 5000)}",
+                "role": f"{rng.choice(LEVELS)}{rng.choice(AREAS)} {rng.choice(ROLES)}".title(),
+                "start_date": f"{year}-{rng.randint(1, 12):02d}",
+                "end_date": f"{end // 12}-{end % 12 + 1:02d}",
+                "tenure_months": months,
+                "description": " ".join(rng.choices(words, k=rng.randint(10, 40))),
+            })
+            year = end // 12
+        data = {
+            "name": f"Person {i}", "email": f"person{i}@example.com", "phone": None, "location": None,
+            "links": [], "summary": " ".join(rng.choices(words, k=20)),
+            "skills": sorted(set(rng.choices(skills, weights, k=rng.randint(4, 15)))),
+            "experience": experience,
+            "education": [{"institution": f"University {rng.randint(0, 300)}", "degree": rng.choice(DEGREES),
+                           "start_year": None, "end_year": None}],
+            "certifications": [],
+        }
+        yield f"{i:064x}", data, f"resume{i}.pdf"
+
+
+def fill(store: ResultStore, n: int, batch: int = 2000) -> float:
+    """Resumes written per second"""
+    have = store.count()
+    pending, start = [], time.perf_counter()
+    for record in synthetic_resumes(n):
+        if int(record[0], 16) < have:
+            continue
+        pending.append(record)
+        if len(pending) >= batch:
+            store.save_many(pending)
+            pending.clear()
+    store.save_many(pending)
+    return (n - have) / (time.perf_counter() - start) if n > have else 0.0
+
+
+def linear_scan(store: ResultStore) -> int:
+    hits = 0
+    for batch in store.records(5000):
+        for record in batch:
+            skills = set(record["data"]["skills"])
+            months = sum(item["tenure_months"] or 0 for item in record["data"]["experience"])
+            hits += "python" in skills and "kubernetes" in skills and months >= 60
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=100000)
+    parser.add_argument("--db", help="store to build or reuse (default: a temp file)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scan", action="store_true", help="also time a linear scan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "results.db")
+        store = ResultStore(path)
+        rate = fill(store, args.resumes)
+        store._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        index_bytes = store._conn.execute("SELECT SUM(LENGTH(block)) FROM resume_text_data").fetchone()[0]
+        print(f"{store.count()} resumes" + (f", written at {rate:.0f}/s" if rate else " (reused)")
+              + f"; store {os.path.getsize(path) / 1e6:.0f} MB, search index {index_bytes / 1e6:.0f} MB")
+
+        print(f"{'query':<48} {'best ms':>8} {'p50 ms':>8} {'hits':>5}")
+        for query in QUERIES:
+            hits = len(store.search(query))
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                store.search(query)
+                times.append((time.perf_counter() - start) * 1000)
+            print(f"{query:<48} {min(times):>8.2f} {statistics.median(times):>8.2f} {hits:>5}")
+
+        if args.scan:
+            start = time.perf_counter()
+            hits = linear_scan(store)
+            print(f"linear scan for python AND kubernetes, 5+ years: {hits} hits in "
+                  f"{time.perf_counter() - start:.1f} s")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
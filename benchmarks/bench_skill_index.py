@@ -0,0 +1,73 @@
+"""Worker startup: compiling the taxonomy in-process vs mapping the binary index.
+
+    python -m benchmarks.bench_skill_index [--skills 20000]
+
+Generates a deterministic synthetic taxonomy (three aliases per skill) in a
+temp directory, then reports load time, Python heap growth (tracemalloc) and
+per-resume scan time for both paths.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_skills import REAL_TERMS, RESUME, synthetic_terms, timed
+from extractors.skill_index import compile_index, load_index, taxonomy_digest
+from extractors.skills import build_matcher, load_taxonomy
+
+
+def write_taxonomy(path: str, n: int):
+    terms = synthetic_terms(n * 4, seed=11)
+    with open(path, "w", encoding="utf-8") as f:
+        for term in REAL_TERMS:
+            f.write(f"{term}\treal\t\t\n")
+        for i in range(n):
+            name, *aliases = terms[i * 4:i * 4 + 4]
+            f.write(f"{name}\tcat{i % 50}\t{'|'.join(aliases)}\t\n")
+
+
+def measure(fn):
+    # Timed without tracemalloc, whose hooks would dominate the mmap path
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    result = fn()
+    heap = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, heap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skills", type=int, default=20000)
+    args = parser.parse_args()
+
+    text = RESUME.casefold()
+    with tempfile.TemporaryDirectory() as tmp:
+        tsv, idx = os.path.join(tmp, "skills.tsv"), os.path.join(tmp, "skills.idx")
+        write_taxonomy(tsv, args.skills)
+
+        start = time.perf_counter()
+        compile_index(load_taxonomy(tsv), idx, taxonomy_digest(tsv))
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        # Mapped first: once the in-process automaton exists, GC passes over its
+        # millions of objects would be charged to whatever is timed next
+        # (get_matcher() also hashes the taxonomy to check staleness)
+        mapped, load_ms, load_heap = measure(lambda: (taxonomy_digest(tsv), load_index(idx))[1])
+        built, build_ms, build_heap = measure(lambda: build_matcher(load_taxonomy(tsv)))
+        assert built.find(text) == mapped.find(text)
+
+        print(f"taxonomy: {args.skills} skills + aliases, {len(built)} phrases; "
+              f"index {os.path.getsize(idx) / 1e6:.2f} MB (offline compile {compile_ms:.0f} ms)")
+        print(f"{'path':<12} {'startup ms':>11} {'heap MB':>9} {'scan ms':>9}")
+        print(f"{'in-process':<12} {build_ms:>11.1f} {build_heap / 1e6:>9.2f} "
+              f"{timed(lambda: built.find(text)):>9.3f}")
+        print(f"{'mmap index':<12} {load_ms:>11.1f} {load_heap / 1e6:>9.2f} "
+              f"{timed(lambda: mapped.find(text)):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Skill matching: legacy exact set lookup vs the token Aho-Corasick matcher.
+
+    python -m benchmarks.bench_skills [--sizes 55,2000,20000,100000]
+
+The legacy approach only recognizes a skill when a whole comma/bullet/line
+token equals it, so it is timed on the skills section alone; the matcher
+scans the full resume. Synthetic taxonomies are deterministic.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+from extractors.matcher import PhraseMatcher
+from extractors.skills import get_matcher
+
+RESUME = """Jane Doe
+jane@example.com | +1 415 555 0100
+
+Summary
+Backend engineer, proficient in Python and Docker, shipping k8s services on AWS.
+
+Skills
+Python, Java, SQL, Docker, Kubernetes, Go
+Machine Learning • React • CI/CD
+
+Experience
+""" + "\n".join(
+    f"Senior Engineer at Company{i}\nJan 2015 - Mar 2016\n"
+    "• Built Node.js and PostgreSQL microservices with Kafka and Redis, cutting p99 latency\n"
+    "• Led migration from Jenkins to GitHub Actions; mentored engineers on TDD and scrum\n"
+    for i in range(30)
+)
+
+
+def legacy_extract(section_text: str, known: set) -> set:
+    tokens = re.split(r"[,\n;•·\|]", section_text.lower())
+    return {t.strip() for t in tokens if t.strip() in known}
+
+
+def synthetic_terms(n: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < n:
+        words = rng.choice((1, 1, 2, 2, 3))
+        terms.add(" ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+            for _ in range(words)
+        ))
+    return sorted(terms)
+
+
+def timed(fn, repeat: int = 30) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+# Real skills mixed into every synthetic taxonomy so both sides have something to find
+REAL_TERMS = ("python", "java", "sql", "docker", "kubernetes", "go", "machine learning",
+              "react", "ci/cd", "k8s", "node.js", "postgresql", "kafka", "redis", "jenkins", "aws")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="55,2000,20000,100000")
+    args = parser.parse_args()
+
+    text = RESUME.casefold()
+    section = text[text.index("skills\n") + 7:text.index("experience\n")]
+
+    print(f"resume: {len(text)} chars, skills section: {len(section)} chars")
+    print(f"{'terms':>8} {'build ms':>10} {'legacy ms':>10} {'matcher ms':>11} {'found legacy/matcher':>22}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        terms = synthetic_terms(size) + list(REAL_TERMS)
+        start = time.perf_counter()
+        matcher = PhraseMatcher()
+        for term in terms:
+            matcher.add(term, term)
+        matcher.build()
+        build_ms = (time.perf_counter() - start) * 1000
+        known = set(terms)
+
+        legacy_ms = timed(lambda: legacy_extract(section, known))
+        matcher_ms = timed(lambda: matcher.find(text))
+        found = (len(legacy_extract(section, known)), len({m.value for m in matcher.find(text)}))
+        print(f"{size:>8} {build_ms:>10.1f} {legacy_ms:>10.3f} {matcher_ms:>11.3f} {str(found):>22}")
+
+    bundled = get_matcher()
+    print(f"bundled taxonomy: {len(bundled)} phrases, "
+          f"full-resume scan {timed(lambda: bundled.find(text)):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
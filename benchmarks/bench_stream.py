@@ -0,0 +1,52 @@
+"""Progressive results: when each field group is ready vs the full response.
+
+    python -m benchmarks.bench_stream [--ner-ms 30]
+
+Each bundled sample is parsed and run through run_pipeline with an on_group
+callback, recording when the text, each field group and the whole result
+are available. spaCy's model may not be installed, so NER is stood in for
+by a --ner-ms sleep, and the header heuristics are switched off to time
+the case where NER is needed.
+"""
+import argparse
+import os
+import time
+
+import app.pipeline as pipeline
+from parsers import parse_file
+from tests.fixtures import SAMPLES
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ner-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    real = pipeline.extract_entities
+
+    def slow_entities(text):
+        time.sleep(args.ner_ms / 1000)
+        return real(text)
+
+    pipeline.extract_entities = slow_entities
+    pipeline.IDENTITY_HEURISTICS = False
+    for name in ("sampleresume.pdf", "Sample Resume 2.docx"):
+        path = os.path.join(SAMPLES, name)
+        pipeline.run_pipeline(parse_file(path))  # warm matchers
+        best = {}
+        for _ in range(5):
+            marks = {}
+            start = time.perf_counter()
+            text = parse_file(path)
+            marks["text"] = time.perf_counter() - start
+            pipeline.run_pipeline(text, on_group=lambda group, _: marks.setdefault(group, time.perf_counter() - start))
+            marks["full response"] = time.perf_counter() - start
+            for k, v in marks.items():
+                best[k] = min(best.get(k, v), v)
+        print(name)
+        for event, seconds in sorted(best.items(), key=lambda kv: kv[1]):
+            print(f"  {event:14} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
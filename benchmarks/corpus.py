@@ -0,0 +1,209 @@
+"""Deterministic synthetic resumes written as PDF, DOCX and PNG.
+
+    python -m benchmarks.corpus <out_dir> [--count 12] [--seed 7]
+
+Content is drawn from the bundled vocabularies (first names, cities, skills,
+degrees, institutions) with a seeded RNG, so the same seed always yields
+the same files. Resumes vary in length (1 to 40 positions) and layout:
+
+    classic   name line, contact line, Title-case headers
+    compact   name | email | phone on one line, UPPERCASE headers,
+              education before experience
+    table     skills as a table (DOCX) or a pipe-separated grid
+
+PDFs are written directly (Helvetica text objects, one page per 60 lines)
+so no PDF library is needed; images use PIL's bundled font.
+"""
+import argparse
+import datetime
+import io
+import os
+import random
+import zipfile
+from typing import List, NamedTuple
+
+from docx import Document
+from PIL import Image, ImageDraw, ImageFont
+
+from extractors.education import load_degrees, load_institutions
+from extractors.identity import CITIES_PATH, load_first_names
+from extractors.skills import load_taxonomy
+
+LENGTHS = (1, 3, 8, 15, 40)
+LAYOUTS = ("classic", "compact", "table")
+FORMATS = ("pdf", "docx", "png")
+SURNAMES = ("Smith", "Garcia", "Nguyen", "Kowalski", "Patel", "Okafor", "Larsen", "Haddad",
+            "Moreau", "Tanaka", "Silva", "Fischer", "Byrne", "Novak", "Reyes", "Ahmed")
+COMPANIES = ("Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Hooli",
+             "Vandelay Imports", "Wayne Enterprises", "Cyberdyne", "Soylent Foods")
+ROLES = ("Software Engineer", "Data Analyst", "Product Manager", "DevOps Engineer",
+         "Backend Developer", "Data Scientist", "QA Engineer", "Engineering Manager")
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+VERBS = ("Built", "Led", "Migrated", "Designed", "Automated", "Maintained", "Scaled", "Reduced")
+
+PDF_LINES_PER_PAGE = 60
+IMAGE_LINES = 70
+
+
+class Resume(NamedTuple):
+    name: str
+    email: str
+    layout: str
+    positions: int
+    lines: List[str]
+    skills: List[str]
+
+
+def _cities() -> List[str]:
+    with open(CITIES_PATH, encoding="utf-8") as f:
+        return [l.split("\t")[0] for l in f if l.strip() and not l.startswith("#")]
+
+
+def make_resume(rng: random.Random, positions: int, layout: str) -> Resume:
+    """One resume's text lines"""
+    first = rng.choice(sorted(load_first_names())).title()
+    name = f"{first} {rng.choice(SURNAMES)}"
+    email = f"{first.lower()}.{rng.randrange(100, 999)}@example.com"
+    phone = f"+1 {rng.randrange(200, 999)} {rng.randrange(200, 999)} {rng.randrange(1000, 9999)}"
+    city = rng.choice(_cities())
+    skills = rng.sample([s.name for s in load_taxonomy()], 12)
+    header = str.upper if layout == "compact" else str.title
+
+    if layout == "compact":
+        lines = [f"{name} | {email} | {phone}", city, ""]
+    else:
+        lines = [name, f"{email} | {phone} | {city}", ""]
+    lines += [header("summary"), f"{rng.choice(ROLES)} with {positions + 2} years of experience "
+              f"in {skills[0]} and {skills[1]}.", ""]
+
+    skill_lines = [header("skills")]
+    if layout == "table":
+        skill_lines += [" | ".join(skills[i:i + 4]) for i in range(0, len(skills), 4)]
+    else:
+        skill_lines.append(", ".join(skills))
+    skill_lines.append("")
+
+    experience = [header("experience")]
+    year = 2024
+    for _ in range(positions):
+        start = year - rng.randrange(1, 4)
+        experience += [f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)}",
+                       f"{rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year}"]
+        for _ in range(rng.randrange(2, 4)):
+            experience.append(f"• {rng.choice(VERBS)} {rng.choice(skills)} services used by "
+                              f"{rng.randrange(2, 90)}k customers")
+        year = start if start > 1985 else 2024
+    experience.append("")
+
+    degree = rng.choice(load_degrees()).name.title()
+    school = rng.choice(load_institutions()).name
+    education = [header("education"), degree, f"{school}, {year - rng.randrange(1, 5)}", ""]
+
+    sections = [skill_lines, education, experience] if layout == "compact" else [skill_lines, experience, education]
+    for section in sections:
+        lines += section
+    return Resume(name, email, layout, positions, lines, skills)
+
+
+def _pdf_escape(line: str) -> str:
+    # Helvetica's WinAnsi encoding has no bullet glyph at U+2022's code point
+    line = line.replace("•", "-").encode("latin-1", "replace").decode("latin-1")
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, lines: List[str]):
+    """Minimal text PDF: one Helvetica content stream per page"""
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+    objects = [b"<</Type/Catalog/Pages 2 0 R>>", None,
+               b"<</Type/Font/Subtype/Type1/BaseFont/Helvetica/Encoding/WinAnsiEncoding>>"]
+    kids = []
+    for page in pages:
+        body = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({_pdf_escape(l)}) Tj T*" for l in page) + " ET"
+        stream = body.encode("latin-1")
+        objects.append(b"<</Length %d>>stream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]"
+                       b"/Resources<</Font<</F1 3 0 R>>>>/Contents %d 0 R>>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = b"<</Type/Pages/Kids[%s]/Count %d>>" % (" ".join(f"{k} 0 R" for k in kids).encode(), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path: str, resume: Resume):
+    doc = Document()
+    lines = resume.lines
+    if resume.layout == "table":
+        # Skills go in a real table, which parse_docx reads after all paragraphs
+        start = next(i for i, l in enumerate(lines) if l.lower() == "skills")
+        end = lines.index("", start)
+        rows, lines = lines[start + 1:end], lines[:start + 1] + lines[end:]
+        table = doc.add_table(rows=len(rows), cols=4)
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row.split(" | ")):
+                table.cell(r, c).text = cell
+    for line in lines:
+        doc.add_paragraph(line)
+    # Fixed timestamps in the core properties and zip entries keep files byte-identical
+    stamp = datetime.datetime(2024, 1, 1)
+    doc.core_properties.created = doc.core_properties.modified = stamp
+    buf = io.BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            dst.writestr(zipfile.ZipInfo(info.filename, stamp.timetuple()[:6]), src.read(info),
+                         zipfile.ZIP_DEFLATED)
+
+
+def write_png(path: str, lines: List[str]):
+    """First IMAGE_LINES lines rendered black on white, roughly a 150 dpi letter page"""
+    font = ImageFont.load_default(size=22)
+    img = Image.new("L", (1275, 1650), 255)
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(lines[:IMAGE_LINES]):
+        draw.text((60, 40 + i * 22), line.replace("•", "-"), fill=0, font=font)
+    img.save(path, optimize=False)
+
+
+def generate(out_dir: str, count: int = 12, seed: int = 7, formats=FORMATS) -> List[dict]:
+    """Write count resumes per format; returns one manifest entry per file"""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = []
+    for i in range(count):
+        resume = make_resume(rng, LENGTHS[i % len(LENGTHS)], LAYOUTS[i % len(LAYOUTS)])
+        for fmt in formats:
+            path = os.path.join(out_dir, f"resume-{i:03d}-{resume.layout}-{resume.positions}.{fmt}")
+            if fmt == "pdf":
+                write_pdf(path, resume.lines)
+            elif fmt == "docx":
+                write_docx(path, resume)
+            else:
+                write_png(path, resume.lines)
+            manifest.append({"path": path, "format": fmt, "name": resume.name, "email": resume.email,
+                             "layout": resume.layout, "positions": resume.positions,
+                             "text": "\n".join(resume.lines)})
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    manifest = generate(args.out_dir, args.count, args.seed)
+    print(f"wrote {len(manifest)} files to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""HTTP load test for POST /extract: latency percentiles, errors and throughput per format.
+
+    python -m benchmarks.loadtest --start --concurrency 4 --requests 200
+    python -m benchmarks.loadtest --url http://host:8000 --rate 5 --duration 60
+    python -m benchmarks.loadtest --start --sweep 1,2,4,8 --duration 30 --slo-ms 2000
+    python -m benchmarks.loadtest --asgi --requests 50 --out load.json --compare previous.json
+
+Files come from the synthetic corpus (benchmarks.corpus, same seed) or from
+--corpus <dir>, mixed by --mix (e.g. pdf=0.5,docx=0.4,png=0.1). The request
+sequence is drawn from --seed, so two runs send the same files in the same
+order and runs are comparable across commits; the JSON output records the
+commit.
+
+Closed loop (--concurrency N): N clients send back to back. Open loop
+(--rate R): requests start on a seeded Poisson schedule whatever the
+server's state, and latency is measured from the scheduled start, so a
+stalled server shows up in the tail instead of slowing the generator down.
+--sweep runs the open loop at each rate and reports the highest one whose
+error rate and p99 stay within --max-error-rate and --slo-ms.
+
+The target is --url, a server started here with --start (uvicorn on
+--port), or --asgi, which calls the app in-process with no network.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import generate
+
+DEFAULT_MIX = "pdf=0.5,docx=0.4,png=0.1"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        fmt, _, weight = part.partition("=")
+        mix[fmt.strip()] = float(weight or 1)
+    return mix
+
+
+def load_corpus(directory: Optional[str], count: int, seed: int, tmp: str) -> Dict[str, List[tuple]]:
+    """format -> [(filename, bytes)]"""
+    if directory:
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(directory) for name in names)
+    else:
+        paths = [entry["path"] for entry in generate(tmp, count, seed)]
+    files = defaultdict(list)
+    for path in paths:
+        fmt = os.path.splitext(path)[1].lstrip(".").lower()
+        fmt = {"jpg": "jpeg", "jpeg": "jpeg"}.get(fmt, fmt)
+        with open(path, "rb") as f:
+            files[fmt].append((os.path.basename(path), f.read()))
+    return files
+
+
+def schedule(files: Dict[str, List[tuple]], mix: Dict[str, float], n: int, seed: int) -> List[tuple]:
+    """The seeded request sequence: [(format, filename, bytes)]"""
+    rng = random.Random(seed)
+    formats = [fmt for fmt in mix if files.get(fmt)]
+    if not formats:
+        raise SystemExit(f"no corpus files for any format in the mix {mix}")
+    weights = [mix[fmt] for fmt in formats]
+    picks = []
+    for _ in range(n):
+        fmt = rng.choices(formats, weights)[0]
+        picks.append((fmt, *rng.choice(files[fmt])))
+    return picks
+
+
+def percentile(ordered: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: List[tuple], seconds: float) -> dict:
+    """samples: [(format, status, latency seconds)]; status 0 is a transport error"""
+    report = {}
+    groups = defaultdict(list)
+    for sample in samples:
+        groups[sample[0]].append(sample)
+        groups["all"].append(sample)
+    for fmt, group in sorted(groups.items()):
+        ok = sorted(latency * 1000 for _, status, latency in group if 200 <= status < 300)
+        statuses = defaultdict(int)
+        for _, status, _ in group:
+            statuses[str(status)] += 1
+        report[fmt] = {
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "error_rate": round((len(group) - len(ok)) / len(group), 4),
+            "statuses": dict(sorted(statuses.items())),
+            "rps": round(len(ok) / seconds, 2) if seconds else None,
+            **{f"p{q}_ms": round(percentile(ok, q), 1) if ok else None for q in (50, 95, 99)},
+            "max_ms": round(ok[-1], 1) if ok else None,
+        }
+    return report
+
+
+async def _send(client: httpx.AsyncClient, fmt: str, filename: str, data: bytes, started: float,
+                samples: list):
+    try:
+        resp = await client.post("/extract", files={"file": (filename, data)})
+        status = resp.status_code
+    except httpx.HTTPError:
+        status = 0
+    samples.append((fmt, status, time.perf_counter() - started))
+
+
+async def closed_loop(client: httpx.AsyncClient, picks: List[tuple], concurrency: int) -> tuple:
+    samples, queue = [], list(reversed(picks))
+
+    async def worker():
+        while queue:
+            fmt, filename, data = queue.pop()
+            await _send(client, fmt, filename, data, time.perf_counter(), samples)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+async def open_loop(client: httpx.AsyncClient, picks: List[tuple], rate: float, seed: int) -> tuple:
+    samples, tasks = [], []
+    rng = random.Random(seed + 1)
+    start = time.perf_counter()
+    due = start
+    for fmt, filename, data in picks:
+        due += rng.expovariate(rate)
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Latency counts from when the request was due, not when it got sent
+        tasks.append(asyncio.ensure_future(_send(client, fmt, filename, data, due, samples)))
+    await asyncio.gather(*tasks)
+    return samples, time.perf_counter() - start
+
+
+def start_server(port: int) -> subprocess.Popen:
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+                             "--log-level", "warning"])
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit("server exited during startup (is uvicorn installed?)")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            time.sleep(0.25)
+    proc.kill()
+    raise SystemExit("server did not become healthy within 60s")
+
+
+def client_for(args) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if args.asgi:
+        from app.main import app
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://asgi", timeout=timeout)
+    return httpx.AsyncClient(base_url=args.url, timeout=timeout, limits=limits)
+
+
+async def run(args, picks: List[tuple]) -> dict:
+    async with client_for(args) as client:
+        # One untimed request per format warms parsers and the sandbox
+        seen = set()
+        for fmt, filename, data in picks:
+            if fmt not in seen:
+                seen.add(fmt)
+                await client.post("/extract", files={"file": (filename, data)})
+        if args.sweep:
+            steps = []
+            for rate in [float(r) for r in args.sweep.split(",")]:
+                n = max(1, int(rate * args.duration))
+                samples, seconds = await open_loop(client, picks[:n] if n <= len(picks) else
+                                                   (picks * (n // len(picks) + 1))[:n], rate, args.seed)
+                summary = summarize(samples, seconds)
+                total = summary["all"]
+                ok = total["error_rate"] <= args.max_error_rate and \
+                    (total["p99_ms"] is not None and total["p99_ms"] <= args.slo_ms)
+                steps.append({"rate": rate, "sustainable": ok, "seconds": round(seconds, 2), "formats": summary})
+            sustainable = [s["rate"] for s in steps if s["sustainable"]]
+            return {"sweep": steps, "max_sustainable_rps": max(sustainable) if sustainable else None}
+        if args.rate:
+            samples, seconds = await open_loop(client, picks, args.rate, args.seed)
+        else:
+            samples, seconds = await closed_loop(client, picks, args.concurrency)
+        return {"seconds": round(seconds, 2), "formats": summarize(samples, seconds)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_formats(formats: dict, previous: Optional[dict] = None):
+    print(f"  {'format':7} {'reqs':>5} {'err%':>6} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for fmt, r in formats.items():
+        cells = [f"{r[k]:9.1f}" if r[k] is not None else f"{'-':>9}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")]
+        print(f"  {fmt:7} {r['requests']:5d} {r['error_rate'] * 100:5.1f}% {r['rps'] or 0:7.2f} {' '.join(cells)}")
+        before = (previous or {}).get(fmt)
+        if before:
+            deltas = []
+            for k in ("p50_ms", "p95_ms", "p99_ms"):
+                if r[k] is not None and before.get(k):
+                    deltas.append(f"{k[:3]} {r[k] / before[k] - 1:+.0%}")
+            print(f"  {'':7} vs previous: {', '.join(deltas)}; rps {before['rps']} -> {r['rps']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://127.0.0.1:8000")
+    target.add_argument("--start", action="store_true", help="start uvicorn on --port for the run")
+    target.add_argument("--asgi", action="store_true", help="call the app in-process")
+    parser.add_argument("--port", type=int, default=8099)
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=4)
+    load.add_argument("--rate", type=float, help="open-loop arrivals per second")
+    load.add_argument("--sweep", help="comma-separated open-loop rates")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30, help="seconds per --sweep step")
+    parser.add_argument("--slo-ms", type=float, default=2000, help="p99 bound for --sweep")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--corpus", help="directory of resumes instead of the synthetic corpus")
+    parser.add_argument("--count", type=int, default=12, help="synthetic resumes per format")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", help="write the report as JSON")
+    parser.add_argument("--compare", help="earlier --out report to diff against")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp()
+    server = None
+    try:
+        files = load_corpus(args.corpus, args.count, args.seed, tmp)
+        picks = schedule(files, parse_mix(args.mix), args.requests, args.seed)
+        if args.start:
+            server = start_server(args.port)
+            args.url = f"http://127.0.0.1:{args.port}"
+        report = asyncio.run(run(args, picks))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(10)
+        shutil.rmtree(tmp)
+
+    report["meta"] = {
+        "commit": git_commit(),
+        "target": "asgi" if args.asgi else args.url,
+        "mode": "sweep" if args.sweep else "open" if args.rate else "closed",
+        "concurrency": None if args.rate or args.sweep else args.concurrency,
+        "rate": args.rate, "requests": args.requests, "mix": parse_mix(args.mix),
+        "seed": args.seed, "corpus": args.corpus or f"synthetic:{args.count}",
+        "cpus": os.cpu_count(),
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"previous: commit {previous['meta'].get('commit')}, {previous['meta'].get('mode')} mode")
+
+    meta = report["meta"]
+    print(f"commit {meta['commit']}, {meta['mode']} load against {meta['target']}")
+    if args.sweep:
+        for step in report["sweep"]:
+            print(f"rate {step['rate']:g}/s over {step['seconds']} s: {'ok' if step['sustainable'] else 'over limits'}")
+            print_formats(step["formats"])
+        print(f"max sustainable rate: {report['max_sustainable_rps']} req/s "
+              f"(p99 <= {args.slo_ms:g} ms, errors <= {args.max_error_rate:.0%})")
+    else:
+        print(f"{args.requests} requests in {report['seconds']} s")
+        print_formats(report["formats"], previous.get("formats") if previous else None)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Per-stage benchmark suite over a synthetic corpus, with a stored baseline.
+
+    python -m benchmarks.suite [--count 12] [--out results.json] [--memory]
+                               [--baseline benchmarks/baseline.json] [--update-baseline]
+
+Generates the deterministic corpus (benchmarks.corpus) in a temporary
+directory, then times every parser and validator in parsers/, every
+extractor in extractors/, to_json on the extracted text, and parse+to_json
+per format. Each stage runs on every applicable document (best of --repeat
+runs per document); p50/p95/mean are over documents.
+
+Results are written as JSON and compared with the baseline: a stage
+regresses when its p50 exceeds the baseline's by more than the threshold
+(--threshold, or a per-stage "thresholds" entry in the baseline file) and
+by more than --floor-ms, which keeps sub-millisecond noise out. The exit
+status is 1 when anything regressed. Baselines are machine-specific; the
+meta block records where one was taken.
+
+--memory also runs each stage once per document under tracemalloc and adds
+its peak allocation (p50 and max, in KB) and largest RSS change to the
+results; stages over their MEMORY_BUDGETS / MEMORY_BUDGET_MB budget are
+reported (see app/memory.py) and fail the run like a regression.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from app import memory
+from app.pipeline import to_json
+from benchmarks.corpus import generate
+from extractors.context import DocumentContext
+from extractors.education import extract_education
+from extractors.experience import extract_experience
+from extractors.identity import guess_identity
+from extractors.nlp import extract_entities, nlp
+from extractors.patterns import extract_contacts
+from extractors.skills import extract_skills
+from parsers import parse_docx, parse_file, parse_image, parse_pdf, sniff
+from parsers.docx_parser import validate_docx
+from parsers.image_parser import validate_image
+from parsers.pdf_parser import validate_pdf
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _sections(text: str):
+    ctx = DocumentContext(text)
+    return ctx, ctx.section("skills", "technical skills"), ctx.section("education", "academic"), \
+        ctx.section("experience", "work experience")
+
+
+def stages(tesseract: bool) -> Dict[str, tuple]:
+    """name -> (input kind, fn); kinds are a file format or "text" for extracted text"""
+    table = {
+        "sniff": ("file", sniff),
+        "validate_pdf": ("pdf", validate_pdf),
+        "validate_docx": ("docx", validate_docx),
+        "validate_image": ("png", validate_image),
+        "parse_pdf": ("pdf", parse_pdf),
+        "parse_docx": ("docx", parse_docx),
+        "document_context": ("text", DocumentContext),
+        "extract_contacts": ("text", extract_contacts),
+        "guess_identity": ("text", guess_identity),
+        "extract_skills": ("sections", lambda s: extract_skills(s[1], s[0].document, fuzzy=True)),
+        "extract_education": ("sections", lambda s: extract_education(s[2])),
+        "extract_experience": ("sections", lambda s: extract_experience(s[3])),
+        "extract_entities": ("text", extract_entities),
+        "to_json": ("text", to_json),
+        "end_to_end_pdf": ("pdf", lambda p: to_json(parse_file(p))),
+        "end_to_end_docx": ("docx", lambda p: to_json(parse_file(p))),
+    }
+    if tesseract:
+        table["parse_image"] = ("png", parse_image)
+        table["end_to_end_png"] = ("png", lambda p: to_json(parse_file(p)))
+    return table
+
+
+def best_of(fn: Callable, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def summarize(samples: List[float]) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "mean_ms": round(statistics.fmean(ordered), 4),
+    }
+
+
+def memory_of(fn: Callable, args: list) -> dict:
+    """Peak traced allocation and RSS change of one call per argument"""
+    peaks, rss = [], []
+    tracing = tracemalloc.is_tracing()
+    for arg in args:
+        usage = memory.measure_memory(fn, arg)[1]
+        peaks.append(usage["peak_bytes"] / 1024)
+        rss.append(usage["rss_delta_bytes"] / 1024)
+    if not tracing:
+        # Tracing slows every allocation; keep it off the next stage's timings
+        tracemalloc.stop()
+    ordered = sorted(peaks)
+    return {
+        "peak_kb_p50": round(statistics.median(ordered), 1),
+        "peak_kb_max": round(ordered[-1], 1),
+        "rss_delta_kb_max": round(max(rss), 1),
+    }
+
+
+def over_budget(results: dict) -> List[str]:
+    """Messages for stages whose measured memory exceeds their budget"""
+    messages = []
+    for name, stats in results["stages"].items():
+        budget = memory.budget_for(name)
+        if budget is None or "peak_kb_max" not in stats:
+            continue
+        used = max(stats["peak_kb_max"], stats["rss_delta_kb_max"]) * 1024
+        if used > budget:
+            messages.append(f"{name}: {used / (1 << 20):.1f} MB vs budget {budget / (1 << 20):g} MB")
+    return messages
+
+
+def run_suite(count: int, seed: int, repeat: int, only: Optional[str] = None, log=None,
+              measure_memory: bool = False) -> dict:
+    tmp = tempfile.mkdtemp()
+    try:
+        manifest = generate(tmp, count, seed)
+        texts = [entry["text"] for entry in manifest if entry["format"] == "pdf"]
+        inputs = {
+            "file": [e["path"] for e in manifest],
+            "text": texts,
+            "sections": [_sections(t) for t in texts],
+        }
+        for fmt in ("pdf", "docx", "png"):
+            inputs[fmt] = [e["path"] for e in manifest if e["format"] == fmt]
+        to_json(texts[0])  # load matchers and indexes outside the timings
+
+        results = {}
+        for name, (kind, fn) in stages(shutil.which("tesseract") is not None).items():
+            if only and only not in name:
+                continue
+            samples = [best_of(fn, arg, repeat) for arg in inputs[kind]]
+            results[name] = summarize(samples)
+            line = f"  {name:20} p50 {results[name]['p50_ms']:9.3f} ms  p95 {results[name]['p95_ms']:9.3f} ms"
+            if measure_memory:
+                # After the timings, so tracemalloc does not slow them down
+                results[name].update(memory_of(fn, inputs[kind]))
+                line += f"  peak {results[name]['peak_kb_max']:9.1f} KB"
+            if log:
+                print(line, file=log)
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "spacy_model": nlp is not None,
+                "corpus": {"count": count, "seed": seed, "files": len(manifest)},
+                "repeat": repeat,
+                "memory": measure_memory,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "stages": results,
+        }
+    finally:
+        shutil.rmtree(tmp)
+
+
+def compare(results: dict, baseline: dict, threshold: float, floor_ms: float) -> List[str]:
+    """Regression messages, one per stage slower than the baseline allows"""
+    thresholds = baseline.get("thresholds", {})
+    regressions = []
+    for name, now in results["stages"].items():
+        before = baseline.get("stages", {}).get(name)
+        if before is None:
+            continue
+        allowed = before["p50_ms"] * (1 + thresholds.get(name, threshold))
+        if now["p50_ms"] > allowed and now["p50_ms"] - before["p50_ms"] > floor_ms:
+            regressions.append(f"{name}: p50 {now['p50_ms']:.3f} ms vs baseline {before['p50_ms']:.3f} ms "
+                               f"(+{now['p50_ms'] / before['p50_ms'] - 1:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=12, help="resumes per format")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", help="run stages whose name contains this")
+    parser.add_argument("--out", default="results.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--floor-ms", type=float, default=0.05)
+    parser.add_argument("--memory", action="store_true", help="also record peak memory per stage")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.count, args.seed, args.repeat, args.only, log=sys.stdout,
+                        measure_memory=args.memory)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    budget_alerts = over_budget(results)
+    for message in budget_alerts:
+        print(f"OVER BUDGET {message}")
+
+    if args.update_baseline:
+        previous = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                previous = json.load(f)
+        # Keep hand-tuned per-stage thresholds across refreshes
+        results["thresholds"] = previous.get("thresholds", {})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return 1 if budget_alerts else 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --update-baseline")
+        return 1 if budget_alerts else 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("cpus") != results["meta"]["cpus"] or \
+            baseline["meta"].get("machine") != results["meta"]["machine"]:
+        print("Warning: baseline was taken on a different machine; expect noise")
+    regressions = compare(results, baseline, args.threshold, args.floor_ms)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    print(f"{len(results['stages'])} stages, {len(regressions)} regressions")
+    return 1 if regressions or budget_alerts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Process settings and memory measurement shared by the API and the parse sandbox"""
+import os
+import tracemalloc
+from typing import Callable, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Parse worker subprocesses; other sizes (queues, concurrency) default to multiples of it
+SANDBOX_WORKERS = int(os.environ.get("SANDBOX_WORKERS", "2"))
+# Record peak traced allocations and RSS growth per parse and pipeline stage
+MEMORY_ACCOUNTING = os.environ.get("MEMORY_ACCOUNTING", "0") == "1"
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # No procfs: the high-water mark is the closest portable figure (KiB on Linux, bytes on macOS)
+        if resource is None:
+            return 0
+        scale = 1 if os.uname().sysname == "Darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def traced_bytes() -> int:
+    """Bytes currently allocated through Python's allocator; starts tracemalloc on first use"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def measure_memory(fn: Callable, *args, **kwargs) -> Tuple[object, dict]:
+    """Call fn; returns (result, usage) with the peak traced bytes above the starting
+    point, the RSS change and the traced bytes at the start.
+
+    The traced peak is process-wide: work in other threads counts towards it,
+    and overlapping measurements reset each other's, so attribute stages with
+    one request at a time. Memory allocated outside Python's allocator (PIL
+    image buffers, for one) only shows in the RSS change.
+    """
+    base = traced_bytes()
+    tracemalloc.reset_peak()
+    rss = rss_bytes()
+    result = fn(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    return result, {"peak_bytes": max(peak - base, 0), "rss_delta_bytes": rss_bytes() - rss, "base_bytes": base}
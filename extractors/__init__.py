@@ -1,6 +1,7 @@
-from .patterns import extract_email, extract_phone, extract_links
+from .patterns import extract_email, extract_phone, extract_links, extract_contacts, scan_contacts
 from .nlp import extract_entities
-from .sections import split_sections
+from .sections import split_sections, find_sections, SectionSpan
+from .context import DocumentContext
 from .skills import extract_skills
 from .education import extract_education
 from .experience import extract_experience
@@ -9,8 +10,13 @@ __all__ = [
     'extract_email',
     'extract_phone',
     'extract_links',
+    'extract_contacts',
+    'scan_contacts',
     'extract_entities',
     'split_sections',
+    'find_sections',
+    'SectionSpan',
+    'DocumentContext',
     'extract_skills',
     'extract_education',
     'extract_experience'
@@ -0,0 +1,26 @@
+from typing import Optional
+from .sections import SectionSpan, find_sections, fold_text
+
+
+class DocumentContext:
+    """Normalized views of one resume, built once per request and shared by extractors"""
+
+    __slots__ = ("text", "folded", "sections")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.folded = fold_text(text)
+        self.sections = find_sections(text, self.folded)
+
+    @property
+    def document(self) -> SectionSpan:
+        """The whole text as a span"""
+        return SectionSpan(self.text, 0, len(self.text), self.folded)
+
+    def section(self, *names: str) -> Optional[SectionSpan]:
+        """Return the first present section span among `names`"""
+        for name in names:
+            if name in self.sections:
+                return self.sections[name]
+        return None
+
@@ -1,40 +1,144 @@
+import os
 import re
-from typing import List
-
-DEGREE_WORDS = [
-    "b.tech", "b.e", "b.e.", "btech", "bachelor",
-    "bsc", "b.sc", "ba", "b.a",
-    "m.tech", "m.e", "m.e.", "mtech", "master",
-    "msc", "m.sc", "ms", "m.s", "mba", "m.b.a",
-    "phd", "ph.d", "doctorate",
-    "diploma", "associate"
-]
-
-def extract_education(section_text: str) -> List[dict]:
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Union
+from .matcher import PhraseMatch, PhraseMatcher
+from .sections import SectionSpan, as_span
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEGREES_PATH = os.environ.get("DEGREES_PATH", os.path.join(DATA_DIR, "degrees.tsv"))
+INSTITUTIONS_PATH = os.environ.get("INSTITUTIONS_PATH", os.path.join(DATA_DIR, "institutions.tsv"))
+
+YEAR_RE = re.compile(r"(?<!\d)(?:19|20)\d{2}(?!\d)")
+# Fallback when the gazetteer has no match: the part of a line naming a school
+INSTITUTION_WORD_RE = re.compile(
+    r"\b(?:university|universit[éäy]|universidad|college|institute|school|academy|polytechnic)\b", re.I
+)
+# "Bachelor of Science – Drexel University – Philadelphia, PA" -> parts
+LINE_PART_SEP_RE = re.compile(r"\s+[–—-]\s+|[|\t•;,]")
+TRAILING_YEARS_RE = re.compile(r"(?:\s*[–—-]?\s*(?:19|20)\d{2})+\s*$")
+
+
+class Degree(NamedTuple):
+    name: str
+    aliases: tuple
+    ambiguous: tuple
+
+
+class Institution(NamedTuple):
+    name: str
+    country: Optional[str]
+    aliases: tuple
+
+
+def _split_aliases(field: str) -> tuple:
+    return tuple(a.strip() for a in field.split("|") if a.strip())
+
+
+def _rows(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            yield (line.rstrip("\n").split("\t") + ["", ""])[:3]
+
+
+def load_degrees(path: str = DEGREES_PATH) -> List[Degree]:
+    """Read the degree TSV: degree, |-separated aliases, |-separated ambiguous aliases"""
+    return [Degree(name.strip(), _split_aliases(aliases), _split_aliases(ambiguous))
+            for name, aliases, ambiguous in _rows(path)]
+
+
+def load_institutions(path: str = INSTITUTIONS_PATH) -> List[Institution]:
+    """Read the institution gazetteer TSV: institution, country, |-separated aliases"""
+    return [Institution(name.strip(), country.strip() or None, _split_aliases(aliases))
+            for name, country, aliases in _rows(path)]
+
+
+def build_degree_matcher(degrees: List[Degree]) -> PhraseMatcher:
+    """Compile degree names and variants; values are (degree, ambiguous)"""
+    matcher = PhraseMatcher()
+    for degree in degrees:
+        matcher.add(degree.name, (degree.name, False))
+        for alias in degree.aliases:
+            matcher.add(alias, (degree.name, False))
+    for degree in degrees:
+        for alias in degree.ambiguous:
+            matcher.add(alias, (degree.name, True))
+    return matcher.build()
+
+
+def build_institution_matcher(institutions: List[Institution]) -> PhraseMatcher:
+    """Compile institution names and aliases; values are canonical names"""
+    matcher = PhraseMatcher()
+    for inst in institutions:
+        matcher.add(inst.name, inst.name)
+    # Aliases go in after every canonical name so a name always maps to itself
+    for inst in institutions:
+        for alias in inst.aliases:
+            matcher.add(alias, inst.name)
+    return matcher.build()
+
+
+@lru_cache(maxsize=None)
+def get_degree_matcher(path: str = DEGREES_PATH) -> PhraseMatcher:
+    return build_degree_matcher(load_degrees(path))
+
+
+@lru_cache(maxsize=None)
+def get_institution_matcher(path: str = INSTITUTIONS_PATH) -> PhraseMatcher:
+    return build_institution_matcher(load_institutions(path))
+
+
+def _pick_degree(matches: List[PhraseMatch]) -> Optional[str]:
+    """First specific degree in the entry, else the first ambiguous one ("MS")"""
+    fallback = None
+    for m in matches:
+        name, ambiguous = m.value
+        if not ambiguous:
+            return name
+        fallback = fallback or name
+    return fallback
+
+
+def _institution_from_lines(lines: List[str]) -> str:
+    """The line part that names a school, else the first line"""
+    for line in lines:
+        if INSTITUTION_WORD_RE.search(line):
+            for part in LINE_PART_SEP_RE.split(line):
+                if INSTITUTION_WORD_RE.search(part):
+                    return TRAILING_YEARS_RE.sub("", part).strip()
+    return lines[0]
+
+
+def extract_education(section: Union[str, SectionSpan]) -> List[dict]:
     """Extract education entries"""
-    if not section_text:
+    section = as_span(section)
+    if not section:
         return []
-    
+
+    degrees = get_degree_matcher()
+    institutions = get_institution_matcher()
     items = []
-    blocks = section_text.split("\n\n")
-    
-    for block in blocks:
-        lines = [l for l in block.splitlines() if l.strip()]
+
+    for block in section.blocks():
+        lines = block.lines()
         if not lines:
             continue
-        
-        block_lower = block.lower()
-        has_degree = any(deg in block_lower for deg in DEGREE_WORDS)
-        
-        if has_degree:
-            years = re.findall(r"(19|20)\d{2}", block)
-            degree = next((d for d in DEGREE_WORDS if d in block_lower), None)
-            
+
+        haystack, offset = block.lower_view()
+        start, end = block.start - offset, block.end - offset
+        degree = _pick_degree(degrees.find(haystack, start, end))
+        institution = next((m.value for m in institutions.find(haystack, start, end)), None)
+
+        if degree or institution:
+            years = YEAR_RE.findall(block.source, block.start, block.end)
+
             items.append({
-                "institution": lines[0] if lines else None,
+                "institution": institution or _institution_from_lines(lines),
                 "degree": degree,
                 "start_year": years[0] if len(years) >= 1 else None,
                 "end_year": years[1] if len(years) >= 2 else years[0] if len(years) == 1 else None
             })
-    
+
     return items
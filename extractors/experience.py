@@ -1,52 +1,201 @@
 import re
-from typing import List
+from datetime import date
+from typing import List, Optional, Tuple, Union
+from .sections import SectionSpan, as_span
 
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+# "Jan 2020", "January, 2020", "03/2020", "2020-03" or a bare year
+_DATE = (
+    r"(?:(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?,?\s?(?:19|20)\d{2}"
+    r"|(?:0?[1-9]|1[0-2])[/.](?:19|20)\d{2}"
+    r"|(?:19|20)\d{2}(?:[-/.](?:0?[1-9]|1[0-2])(?!\d))?)"
+)
+# The leading lookahead lets most word starts fail on one character test
 DATE_RANGE = re.compile(
-    r"([A-Za-z]{3,9}\s?\d{4}|\d{4})\s?[-–—]\s?([A-Za-z]{3,9}\s?\d{4}|\d{4}|present|current)",
+    r"(?=[jfmasond\d])\b(" + _DATE + r")\s?(?:[-–—]|to|until)\s?(" + _DATE + r"|present|current|now|today|date)(?!\d)",
+    re.IGNORECASE
+)
+DATE_RE = re.compile(
+    r"(?:(?P<mon>[a-z]{3})[a-z]*\.?,?\s?|(?P<mm>\d{1,2})[/.])?(?P<year>\d{4})(?:[-/.](?P<im>\d{1,2}))?",
     re.IGNORECASE
 )
+ONGOING = {"present", "current", "now", "today", "date"}
+# Bulleted or sentence-like lines are details, never a role/company header
+BULLET_RE = re.compile(r"[•·▪◦●■♦\-*–—>o]\s")
+HEADER_SEP_RE = re.compile(r"\s+[–—-]\s+|\s*\|\s*|\t+")
+# Separators left around a date once it is cut out of a header line
+DATE_PUNCT = " \t|,;:()[]–—-"
+
+
+def parse_date(text: str) -> Tuple[Optional[str], Optional[int], Optional[int]]:
+    """Normalize a date to ISO ("2020-03" or "2020") plus (year, month)"""
+    if text.lower() in ONGOING:
+        today = date.today()
+        return "present", today.year, today.month
+    m = DATE_RE.fullmatch(text.strip())
+    if not m:
+        return None, None, None
+    year = int(m.group("year"))
+    month = MONTHS.get((m.group("mon") or "").lower()) or int(m.group("mm") or m.group("im") or 0)
+    if month:
+        return f"{year:04d}-{month:02d}", year, month
+    return f"{year:04d}", year, None
+
+
+def tenure_months(start: tuple, end: tuple) -> Optional[int]:
+    """Months between two parsed dates, both months inclusive.
+
+    A bare year counts from or to its middle, so "2019 - 2020" is 12 months.
+    """
+    (_, sy, sm), (_, ey, em) = start, end
+    if sy is None or ey is None:
+        return None
+    months = (ey - sy) * 12 + (em or 7) - (sm or 7) + (1 if sm and em else 0)
+    return months if months >= 0 else None
+
+
+def total_months(experience: List[dict]) -> int:
+    """Months covered by the dated entries, overlapping roles counted once"""
+    spans = []
+    for item in experience:
+        start, end = parse_date(item.get("start_date") or ""), parse_date(item.get("end_date") or "")
+        months = tenure_months(start, end)
+        if months is None:
+            continue
+        # Same convention as tenure_months: a bare year counts from its middle
+        first = start[1] * 12 + (start[2] or 7)
+        spans.append((first, first + months))
+    total, reached = 0, None
+    for first, last in sorted(spans):
+        if reached is not None and first < reached:
+            first = reached
+        if last > first:
+            total += last - first
+            reached = last
+    return total
+
+
+def _is_detail(line: str) -> bool:
+    return bool(BULLET_RE.match(line)) or line.endswith(".") or len(line) > 100
+
+
+def _split_header(header: str) -> Tuple[Optional[str], Optional[str]]:
+    """(role, company) from "Role at Company" or "Role – Company – City" lines"""
+    if " at " in header:
+        role, company = header.split(" at ", 1)
+        return role.strip(), company.strip()
+    parts = [p for p in HEADER_SEP_RE.split(header) if p.strip()]
+    if len(parts) >= 2:
+        return parts[0].strip(), parts[1].strip()
+    return header or None, None
+
+
+def _lines(section: SectionSpan) -> List[Tuple[int, int]]:
+    """Absolute (start, end) offsets of the non-blank, stripped lines of the span"""
+    bounds = []
+    pos = section.start
+    for line in section.text.split("\n"):
+        s, e = pos, pos + len(line)
+        pos = e + 1
+        while s < e and section.source[s].isspace():
+            s += 1
+        while e > s and section.source[e - 1].isspace():
+            e -= 1
+        if s < e:
+            bounds.append((s, e))
+    return bounds
 
-def extract_experience(section_text: str) -> List[dict]:
-    """Extract work experience entries"""
-    if not section_text:
+
+def _entry(header: Optional[str], dates, details: List[str]) -> dict:
+    role, company = _split_header(header) if header else (None, None)
+    start, end = (parse_date(dates[0]), parse_date(dates[1])) if dates else ((None,) * 3, (None,) * 3)
+    return {
+        "company": company,
+        "role": role,
+        "start_date": start[0],
+        "end_date": end[0],
+        "tenure_months": tenure_months(start, end),
+        "description": "\n".join(details) if details else None
+    }
+
+
+def _legacy_blocks(section: SectionSpan) -> List[dict]:
+    """Undated sections: one entry per blank-line separated block"""
+    items = []
+    for block in section.blocks():
+        lines = block.lines()
+        if lines:
+            items.append(_entry(lines[0], None, lines[1:]))
+    return items
+
+
+def extract_experience(section: Union[str, SectionSpan]) -> List[dict]:
+    """Extract work experience entries.
+
+    The section is segmented in one pass: every date range anchors an entry,
+    whose header is either the rest of the date's line or, for a bare date
+    line, the line just before or just after it (whichever layout the section
+    uses). Blank lines are not needed, so pdfplumber output segments too.
+    """
+    section = as_span(section)
+    if not section:
         return []
-    
+
+    source = section.source
+    bounds = _lines(section)
+    lines = [source[s:e] for s, e in bounds]
+
+    # Merge date ranges (in text order) with lines (in text order): first range per line
+    anchors = []  # (line index, match)
+    li = 0
+    for m in DATE_RANGE.finditer(source, section.start, section.end):
+        while li < len(bounds) and bounds[li][1] <= m.start():
+            li += 1
+        if li < len(bounds) and (not anchors or anchors[-1][0] != li):
+            anchors.append((li, m))
+    if not anchors:
+        return _legacy_blocks(section)
+
+    # Header text left on each date line once the date is cut out
+    inline = []
+    for li, m in anchors:
+        s, e = bounds[li]
+        rest = (source[s:m.start()].strip(DATE_PUNCT) + "\t" + source[m.end():e].strip(DATE_PUNCT)).strip()
+        inline.append(rest if sum(c.isalpha() for c in rest) >= 3 else None)
+
+    # Bare date lines: does the header sit above or below? Vote on the neighbours
+    dated = {li for li, _ in anchors}
+    above = below = 0
+    for (li, _), rest in zip(anchors, inline):
+        if rest is None:
+            if li > 0 and _is_detail(lines[li - 1]):
+                below += 1
+            if li + 1 < len(lines) and _is_detail(lines[li + 1]):
+                above += 1
+    header_below = below > above
+
+    # (first line, header line or None, date line) per entry
+    entries = []
+    last = -1
+    for (li, _), rest in zip(anchors, inline):
+        header = None
+        if rest is None:
+            h = li + 1 if header_below else li - 1
+            if last < h < len(lines) and h not in dated and not _is_detail(lines[h]):
+                header = h
+        first = min(li, header) if header is not None else li
+        entries.append((first, header, li))
+        last = max(li, header if header is not None else li)
+
     items = []
-    blocks = section_text.split("\n\n")
-    
-    for block in blocks:
-        lines = [l.strip() for l in block.splitlines() if l.strip()]
-        if not lines:
-            continue
-        
-        # Find date range
-        m = DATE_RANGE.search(block)
-        dates = (m.group(1), m.group(2)) if m else (None, None)
-        
-        # Parse first line for role and company
-        first = lines[0]
-        role, company = None, None
-        
-        if " at " in first:
-            parts = first.split(" at ", 1)
-            role = parts[0].strip()
-            company = parts[1].strip()
-        elif " - " in first and len(lines) > 1:
-            role = first
-            company = lines[1] if len(lines) > 1 else None
-        else:
-            role = first
-        
-        # Description is remaining lines
-        desc_lines = lines[1:] if company else lines[2:] if len(lines) > 2 else []
-        description = "\n".join(desc_lines) if desc_lines else None
-        
-        items.append({
-            "company": company,
-            "role": role,
-            "start_date": dates[0],
-            "end_date": dates[1],
-            "description": description
-        })
-    
+    for k, ((first, header, li), (_, m), rest) in enumerate(zip(entries, anchors, inline)):
+        stop = entries[k + 1][0] if k + 1 < len(entries) else len(lines)
+        details = [lines[i] for i in range(first, stop) if i != header and i != li]
+        head = rest if rest is not None else lines[header] if header is not None else None
+        items.append(_entry(head, (m.group(1), m.group(2)), details))
+
     return items
@@ -0,0 +1,205 @@
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .matcher import TOKEN_RE, tokenize
+
+# Allowed edits as a fraction of the query length (0.15 -> 1 edit up to 13 chars)
+MAX_EDIT_RATIO = float(os.environ.get("SKILLS_FUZZY_MAX_RATIO", "0.15"))
+# Shorter words collide with ordinary English ("scale" ~ "scala"), so only exact
+MIN_LENGTH = int(os.environ.get("SKILLS_FUZZY_MIN_LENGTH", "6"))
+# Wall-clock allowance for the fuzzy pass over one document
+BUDGET_MS = float(os.environ.get("SKILLS_FUZZY_BUDGET_MS", "25"))
+# Lookups are memoized per index; the memo is dropped when it grows past this
+CACHE_SIZE = 50000
+
+# Words worth a lookup: letters with at most one stray digit (OCR's "1" for "l")
+WORD_RE = re.compile(r"[^\W\d_]*\d?[^\W\d_]+|[^\W\d_]+\d")
+
+
+def trigrams(term: str) -> Set[str]:
+    """Distinct character trigrams of `term`, padded so ends count too"""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance counting adjacent transpositions as one edit, capped at limit + 1.
+
+    Only the diagonal band of width `limit` is filled, and the scan stops as
+    soon as a whole row exceeds the limit.
+    """
+    over = limit + 1
+    n, m = len(a), len(b)
+    if abs(n - m) > limit:
+        return over
+    prev2 = None
+    prev = [j if j <= limit else over for j in range(m + 1)]
+    for i in range(1, n + 1):
+        cur = [over] * (m + 1)
+        cur[0] = i if i <= limit else over
+        row_min = cur[0]
+        for j in range(max(1, i - limit), min(m, i + limit) + 1):
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+        if row_min > limit:
+            return over
+        prev2, prev = prev, cur
+    return min(prev[m], over)
+
+
+class TrigramIndex:
+    """Inverted index from (first letter, term length, trigram) to terms.
+
+    Candidates must start with the query's first letter, have a compatible
+    length, and share enough trigrams to be within the edit limit, so a
+    lookup only touches a small slice of the vocabulary. Requiring the first
+    letter to agree also keeps aliases that merely extend an ordinary word
+    ("rstudio" vs "studio") from matching it.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, Any]]):
+        self.terms: List[str] = []
+        self.values: List[Any] = []
+        self._grams: List[Set[str]] = []
+        self._multiword: List[bool] = []
+        self._shapes: Set[Tuple[str, int]] = set()
+        self._postings: Dict[Tuple[str, int, str], List[int]] = defaultdict(list)
+        self._cache: Dict[tuple, Optional[Tuple[str, Any, int]]] = {}
+        seen = set()
+        for term, value in terms:
+            # Spaces are dropped so "machine lerning" and "postgre sql" need
+            # only one joined lookup each
+            term_text = term.casefold()
+            term = term_text.replace(" ", "")
+            if term in seen:
+                continue
+            seen.add(term)
+            tid = len(self.terms)
+            self.terms.append(term)
+            self.values.append(value)
+            self._multiword.append(len(tokenize(term_text)) > 1)
+            grams = trigrams(term)
+            self._grams.append(grams)
+            self._shapes.add((term[0], len(term)))
+            for gram in grams:
+                self._postings[(term[0], len(term), gram)].append(tid)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term: str) -> bool:
+        return self.lookup(term, 0) is not None
+
+    def lookup(self, query: str, max_edits: int,
+               single_word: bool = False) -> Optional[Tuple[str, Any, int]]:
+        """Closest term within `max_edits` as (term, value, distance), or None.
+
+        Terms are stored without spaces, so `query` should be too. With
+        `single_word`, multi-word terms are skipped: one word that resembles
+        "objective-c" is far more likely to be the word "objective".
+        """
+        key = (query, max_edits, single_word)
+        if key in self._cache:
+            return self._cache[key]
+
+        first = query[0]
+        lengths = range(len(query) - max_edits, len(query) + max_edits + 1)
+        best = None
+        # Cheap reject: no term starts with this letter at a compatible length
+        if any((first, length) in self._shapes for length in lengths):
+            best = self._closest(query, first, lengths, max_edits, single_word)
+
+        if len(self._cache) >= CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = best
+        return best
+
+    def _closest(self, query: str, first: str, lengths: range, max_edits: int, single_word: bool):
+        grams = trigrams(query)
+        # An edit touches at most 3 trigrams, a transposition at most 4
+        need = len(grams) - 4 * max_edits
+        best = None
+        if need > 0:
+            # A term sharing `need` of the query's grams must contain at least
+            # one of any len(grams) - need + 1 of them, so probe only those
+            probe = sorted(grams)[:len(grams) - need + 1]
+            candidates = set()
+            for length in lengths:
+                for gram in probe:
+                    candidates.update(self._postings.get((first, length, gram), ()))
+            for tid in candidates:
+                if single_word and self._multiword[tid]:
+                    continue
+                if len(grams & self._grams[tid]) < need:
+                    continue
+                dist = bounded_distance(query, self.terms[tid], max_edits)
+                if dist <= max_edits and (best is None or dist < best[2]):
+                    best = (self.terms[tid], self.values[tid], dist)
+                    if dist == 0:
+                        break
+        return best
+
+
+def allowed_edits(length: int, max_ratio: float = MAX_EDIT_RATIO,
+                  min_length: int = MIN_LENGTH) -> int:
+    """Edit budget for a query of `length` characters (0 = exact only)"""
+    if length < min_length:
+        return 0
+    return max(1, int(length * max_ratio))
+
+
+def find_fuzzy(index: TrigramIndex, text: str, start: int = 0, end: Optional[int] = None,
+               covered: Iterable[Tuple[int, int]] = (), max_ratio: float = MAX_EDIT_RATIO,
+               min_length: int = MIN_LENGTH, budget_ms: float = BUDGET_MS) -> List[Tuple[int, int, Any]]:
+    """Misspelled vocabulary terms in casefolded `text` as (start, end, value).
+
+    Every word outside the `covered` (already matched) spans is looked up,
+    and so is each adjacent word pair, joined, so "postgre sql" and
+    "machine lerning" resolve. Terms shorter than `min_length`, and words
+    that are a term plus a trailing "s" or "r", are not taken. Lookups stop
+    once `budget_ms` is spent.
+    """
+    deadline = time.perf_counter() + budget_ms / 1000
+    covered = sorted(covered)
+    tokens = []
+    ci = 0
+    for m in TOKEN_RE.finditer(text, start, len(text) if end is None else end):
+        s, e = m.span()
+        while ci < len(covered) and covered[ci][1] <= s:
+            ci += 1
+        if ci < len(covered) and covered[ci][0] < e:
+            tokens.append(None)
+            continue
+        tok = m.group()
+        # One-letter words only ever pair into false hits ("objective i")
+        tokens.append((s, e, tok) if len(tok) > 1 and WORD_RE.fullmatch(tok) else None)
+
+    found = []
+    for i, tok in enumerate(tokens):
+        if tok is None:
+            continue
+        if time.perf_counter() > deadline:
+            break
+        queries = [(tok[0], tok[1], tok[2], True)]
+        nxt = tokens[i + 1] if i + 1 < len(tokens) else None
+        if nxt is not None:
+            queries.append((tok[0], nxt[1], tok[2] + nxt[2], False))
+        for s, e, query, single_word in queries:
+            k = allowed_edits(len(query), max_ratio, min_length)
+            if not k:
+                continue
+            # "kotlins", "javascripts": a term plus "s" or "r" is a word, not a typo
+            if query[-1] in "sr" and query[:-1] in index:
+                continue
+            hit = index.lookup(query, k, single_word)
+            # Short skill names are as close to ordinary words as short queries are
+            if hit is not None and len(hit[0]) >= min_length:
+                found.append((s, e, hit[1]))
+    return found
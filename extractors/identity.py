@@ -0,0 +1,151 @@
+import os
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Optional
+from .matcher import PhraseMatcher
+from .patterns import EMAIL_RE, PHONE_RE
+from .sections import HEADERS, fold_text
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+FIRST_NAMES_PATH = os.environ.get("FIRST_NAMES_PATH", os.path.join(DATA_DIR, "first_names.txt"))
+CITIES_PATH = os.environ.get("CITIES_PATH", os.path.join(DATA_DIR, "cities.tsv"))
+
+# Lines considered: the top of the resume plus a few around the first email/phone
+HEADER_LINES = 6
+CONTACT_WINDOW = 3
+
+# Confidence levels; spaCy is skipped at HIGH, or at MEDIUM with a location
+LOW, MEDIUM, HIGH = 0, 1, 2
+
+US_STATES = frozenset(
+    "AL AK AZ AR CA CO CT DE DC FL GA HI ID IL IN IA KS KY LA ME MD MA MI MN MS MO MT NE NV NH NJ "
+    "NM NY NC ND OH OK OR PA RI SC SD TN TX UT VT VA WA WV WI WY "
+    # Canadian provinces
+    "AB BC MB NB NL NS ON PE QC SK".split()
+)
+# "Dallas, TX 75025" -> Dallas, TX
+CITY_STATE_RE = re.compile(r"\b([A-Z][A-Za-z.'-]+(?: [A-Z][A-Za-z.'-]+){0,2}), ([A-Z]{2})\b(?!\.\w)")
+NAME_RE = re.compile(r"[A-Z][A-Za-z'’.-]*(?: [A-Z][A-Za-z'’.-]*){1,3}")
+# Words that make a name-shaped line something else
+NOT_NAME_WORDS = frozenset(h for header in HEADERS for h in header.split()) | {
+    "resume", "curriculum", "vitae", "cv", "page", "email", "phone", "mobile", "address",
+    "analyst", "engineer", "developer", "manager", "consultant", "designer", "scientist", "intern",
+}
+PART_SEP_RE = re.compile(r"\s*[|•·\t]\s*|\s{2,}")
+# "HaydenSmith": pdfplumber drops the space between words set in large type
+CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")
+
+
+class IdentityGuess(NamedTuple):
+    name: Optional[str]
+    location: Optional[str]
+    confidence: int
+
+    @property
+    def sufficient(self) -> bool:
+        """Confident enough to skip NER"""
+        return self.confidence >= HIGH or (self.confidence >= MEDIUM and self.location is not None)
+
+
+@lru_cache(maxsize=None)
+def load_first_names(path: str = FIRST_NAMES_PATH) -> FrozenSet[str]:
+    """Casefolded given names, one per line"""
+    with open(path, encoding="utf-8") as f:
+        return frozenset(l.strip().casefold() for l in f if l.strip() and not l.startswith("#"))
+
+
+@lru_cache(maxsize=None)
+def get_city_matcher(path: str = CITIES_PATH) -> PhraseMatcher:
+    """Automaton over city names; values are (city, region, country)"""
+    matcher = PhraseMatcher()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            city, region, country = (line.rstrip("\n").split("\t") + ["", ""])[:3]
+            matcher.add(city, (city, region or None, country or None))
+    return matcher.build()
+
+
+def header_lines(text: str) -> tuple:
+    """(top lines of the resume, lines around the first email or phone)"""
+    head = text[:text.find("\n", 4000) if len(text) > 4000 else len(text)]
+    top = [l for l in map(str.strip, head.split("\n")) if l][:HEADER_LINES]
+    near = []
+    contact = EMAIL_RE.search(text) or PHONE_RE.search(text)
+    if contact:
+        start = contact.start()
+        for _ in range(CONTACT_WINDOW + 1):
+            start = text.rfind("\n", 0, start - 1) if start > 0 else -1
+            if start < 0:
+                break
+        end = contact.end()
+        for _ in range(CONTACT_WINDOW + 1):
+            end = text.find("\n", end + 1)
+            if end < 0:
+                end = len(text)
+                break
+        near = [l for l in map(str.strip, text[start + 1:end].split("\n")) if l]
+    return top, near
+
+
+def _name_candidate(part: str) -> Optional[str]:
+    part = part.strip(" ,;:")
+    if part.isupper():
+        part = part.title()
+    if " " not in part:
+        part = CAMEL_RE.sub(" ", part)
+    if not NAME_RE.fullmatch(part):
+        return None
+    if any(w.casefold().strip(".") in NOT_NAME_WORDS for w in part.split()):
+        return None
+    return part
+
+
+def guess_name(lines: List[str]) -> tuple:
+    """(name, confidence) from the header lines"""
+    first_names = load_first_names()
+    fallback = None
+    for i, line in enumerate(lines):
+        parts = PART_SEP_RE.split(line)
+        has_contact = len(parts) > 1 and any(EMAIL_RE.search(p) or PHONE_RE.search(p) for p in parts)
+        for part in parts[:1] if has_contact else parts:
+            name = _name_candidate(part)
+            if name is None:
+                continue
+            if name.split()[0].casefold().strip(".") in first_names:
+                return name, HIGH
+            # Unknown first name: trust it only at the very top or beside contact details
+            if fallback is None and (i == 0 or has_contact):
+                fallback = name
+    return (fallback, MEDIUM) if fallback else (None, LOW)
+
+
+def guess_location(lines: List[str], name: Optional[str] = None) -> Optional[str]:
+    """"City, ST" or a gazetteer city from the header lines, ignoring the name itself"""
+    for line in lines:
+        if name and name in line:
+            line = line.replace(name, "")
+        m = CITY_STATE_RE.search(line)
+        if m and m.group(2) in US_STATES:
+            return f"{m.group(1)}, {m.group(2)}"
+    matcher = get_city_matcher()
+    for line in lines:
+        if name and name in line:
+            line = line.replace(name, "")
+        found = matcher.find(fold_text(line))
+        if found:
+            m = found[0]
+            # Keep a trailing region or country as written: "Pune, India"
+            tail = re.match(r",\s*[A-Z][A-Za-z.]*(?: [A-Z][A-Za-z.]*)?", line[m.end:])
+            return line[m.start:m.end] + (tail.group() if tail else "")
+    return None
+
+
+def guess_identity(text: str) -> IdentityGuess:
+    """Cheap name/location tier from the resume header, before any NER"""
+    top, near = header_lines(text)
+    name, confidence = guess_name(top + [l for l in near if l not in top])
+    # A location is most likely beside the contact details
+    location = guess_location(near + [l for l in top if l not in near], name)
+    return IdentityGuess(name, location, confidence)
@@ -0,0 +1,113 @@
+import re
+from collections import deque
+from typing import Any, Iterator, List, NamedTuple, Optional
+
+# A token starts with a letter or digit and may carry "+", "#" and inner dots,
+# so "c++", "c#", "node.js" and "asp.net" survive as single tokens while
+# sentence punctuation and separators ("/", "-", ",") split them.
+TOKEN_RE = re.compile(r"\.?[^\W_][\w+#]*(?:\.[\w+#]+)*")
+
+
+class PhraseMatch(NamedTuple):
+    start: int
+    end: int
+    value: Any
+
+
+def tokenize(text: str) -> List[str]:
+    """Split casefolded text into matcher tokens"""
+    return TOKEN_RE.findall(text)
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton over word tokens.
+
+    Phrases are matched on token boundaries, so "java" never fires inside
+    "javascript" and "c" never inside "c++". Scanning costs one transition
+    per token however many phrases are loaded.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        # Per state: ((phrase length in tokens, value), ...) including suffix outputs
+        self._out = [()]
+        self._built = False
+        # Identifies the vocabulary, so results cached against it can be invalidated
+        self.version = None
+
+    def __len__(self) -> int:
+        return sum(1 for out in self._out if out)
+
+    def add(self, phrase: str, value: Any) -> bool:
+        """Register `phrase` (matched caselessly); the first value for a phrase wins"""
+        tokens = tokenize(phrase.casefold())
+        if not tokens:
+            return False
+        state = 0
+        for tok in tokens:
+            nxt = self._goto[state].get(tok)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][tok] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if not self._out[state]:
+            self._out[state] = ((len(tokens), value),)
+        self._built = False
+        return True
+
+    def build(self) -> "PhraseMatcher":
+        """Compute failure links; called lazily before the first scan"""
+        goto, fail, out = self._goto, self._fail, self._out
+        queue = deque()
+        for nxt in goto[0].values():
+            fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and tok not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(tok, 0)
+                if out[fail[nxt]]:
+                    out[nxt] = out[nxt] + out[fail[nxt]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[PhraseMatch]:
+        """Yield every (possibly overlapping) phrase occurrence in casefolded `text`"""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        end = len(text) if end is None else end
+        starts = []
+        state = 0
+        for m in TOKEN_RE.finditer(text, start, end):
+            tok = m.group()
+            starts.append(m.start())
+            if state:
+                while state and tok not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(tok, 0)
+            else:
+                state = root.get(tok, 0)
+            if out[state]:
+                last, tok_end = len(starts), m.end()
+                for n, value in out[state]:
+                    yield PhraseMatch(starts[last - n], tok_end, value)
+
+    def find(self, text: str, start: int = 0, end: Optional[int] = None) -> List[PhraseMatch]:
+        """Leftmost-longest, non-overlapping phrase matches in casefolded `text`"""
+        matches = sorted(self.iter_matches(text, start, end), key=lambda m: (m.start, -m.end))
+        chosen, covered = [], -1
+        for m in matches:
+            if m.start >= covered:
+                chosen.append(m)
+                covered = m.end
+        return chosen
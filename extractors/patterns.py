@@ -1,9 +1,51 @@
 import re
-from typing import Optional, List
+from typing import Dict, Optional, List, NamedTuple
 
-EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
-PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-\s]?)?(?:\d{10}|\d{3}[-\s]?\d{3}[-\s]?\d{4})")
-URL_RE = re.compile(r"https?://[^\s]+|(?:www\.)?linkedin\.com/[^\s]+|github\.com/[^\s]+")
+# Pattern bodies shared by the single-field regexes and the fused scanner.
+# Backtracking guards: a contact only starts where a token starts, the email
+# local part is possessive (a long run without "@" is consumed once, not
+# retried from every offset), and a phone may not sit inside a longer digit run.
+# The phone lookahead rejects short numbers (prices, dates, table cells)
+# before the country-code/separator alternatives are tried.
+_START = r"(?<![\w.%+-])"
+_EMAIL = r"[A-Za-z0-9._%+-]++@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+_PHONE = r"(?=\+?\d[-\s\d]{9})(?:\+?\d{1,3}[-\s]?)?\d{3}[-\s]?\d{3}[-\s]?\d{4}(?!\d)"
+_URL = r"(?:https?://|(?:www\.)?linkedin\.com/|github\.com/)\S++"
+
+EMAIL_RE = re.compile(_START + _EMAIL)
+PHONE_RE = re.compile(_START + _PHONE)
+URL_RE = re.compile(_START + _URL)
+
+# One pass for every contact field; at a given offset a URL wins over an
+# email, and an email over a phone, so digits inside either are not phones
+CONTACT_RE = re.compile(
+    _START + f"(?:(?P<url>{_URL})|(?P<email>{_EMAIL})|(?P<phone>{_PHONE}))"
+)
+
+
+class Contact(NamedTuple):
+    kind: str  # "email", "phone" or "url"
+    value: str
+    start: int
+    end: int
+
+
+def scan_contacts(text: str) -> List[Contact]:
+    """Every email, phone and URL in text, in order, with offsets"""
+    return [Contact(m.lastgroup, m.group(), m.start(), m.end()) for m in CONTACT_RE.finditer(text)]
+
+
+def extract_contacts(text: str) -> Dict:
+    """First email and phone plus all links, from a single scan"""
+    fields = {"email": None, "phone": None}
+    links = {}
+    for contact in scan_contacts(text):
+        if contact.kind == "url":
+            links[contact.value] = None
+        elif fields[contact.kind] is None:
+            fields[contact.kind] = contact.value
+    fields["links"] = list(links)
+    return fields
 
 def extract_email(text: str) -> Optional[str]:
     """Extract first email address"""
@@ -1,3 +1,6 @@
+import re
+from typing import Dict, List, Optional, Union
+
 HEADERS = [
     "summary", "objective", "profile", "about",
     "education", "academic", "qualification",
@@ -6,25 +9,184 @@ HEADERS = [
     "projects", "certifications", "certificates", "licenses"
 ]
 
+# Alternation order follows HEADERS so the first listed header wins, as before
+HEADER_RE = re.compile(r"[^\S\n]*(?:" + "|".join(re.escape(h) for h in HEADERS) + ")")
+# Scanning for header lines: the leading newline gives the regex engine a
+# literal prefix to search for, which is much faster than a MULTILINE "^"
+HEADER_LINE_RE = re.compile(r"\n" + HEADER_RE.pattern)
+_HEADER_RES_I = (re.compile(HEADER_RE.pattern, re.I), re.compile(HEADER_LINE_RE.pattern, re.I))
+
+# One or more blank (whitespace-only) lines separate blocks
+BLOCK_SEP_RE = re.compile(r"\n(?:[^\S\n]*\n)+")
+
+
+class SectionSpan:
+    """A (start, end) slice of the original resume text, materialized lazily"""
+
+    __slots__ = ("source", "start", "end", "lowered")
+
+    def __init__(self, source: str, start: int = 0, end: Optional[int] = None,
+                 lowered: Optional[str] = None):
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+        self.lowered = lowered
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+
+    @property
+    def lower(self) -> str:
+        """Lowercased view, sliced from the shared lowered document when available"""
+        if self.lowered is not None:
+            return self.lowered[self.start:self.end]
+        return lower_text(self.text)
+
+    def lower_view(self) -> tuple:
+        """(lowered string, offset) with source[i] lowered at string[i - offset], copy-free when shared"""
+        if self.lowered is not None:
+            return self.lowered, 0
+        return lower_text(self.text), self.start
+
+    def sub(self, start: int, end: int) -> "SectionSpan":
+        """A narrower span over the same document, trimmed of surrounding whitespace"""
+        start, end = _trim(self.source, start, end)
+        return SectionSpan(self.source, start, end, self.lowered)
+
+    def joined_lines(self) -> str:
+        """Text of the span without its blank lines, as split_sections has always returned it"""
+        text = self.text
+        if not BLOCK_SEP_RE.search(text):
+            return text
+        return "\n".join(l for l in text.split("\n") if l.strip())
+
+    def lines(self) -> List[str]:
+        """Non-blank lines inside the span, stripped"""
+        return [l for l in map(str.strip, self.text.split("\n")) if l]
+
+    def blocks(self) -> List["SectionSpan"]:
+        """Blank-line separated blocks inside the span"""
+        blocks = []
+        for s, e in block_bounds(self.source, self.start, self.end):
+            block = self.sub(s, e)
+            if block:
+                blocks.append(block)
+        return blocks
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __bool__(self) -> bool:
+        return self.end > self.start
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"SectionSpan({self.start}, {self.end})"
+
+
+def as_span(section: Union[str, SectionSpan, None]) -> SectionSpan:
+    """Accept either a plain string or a span so extractors keep their str API"""
+    if isinstance(section, SectionSpan):
+        return section
+    return SectionSpan(section or "")
+
+
+def lower_text(text: str, chunk_size: int = 8192) -> str:
+    """Lowercase once for sharing, one character for one so offsets stay aligned"""
+    return _map_chunks(text, str.lower, chunk_size)
+
+
+def fold_text(text: str, chunk_size: int = 8192) -> str:
+    """Casefold for caseless matching, one character for one so offsets stay aligned"""
+    return _map_chunks(text, str.casefold, chunk_size)
+
+
+def _map_char(c: str, fn) -> str:
+    # "İ".lower() is "i" plus a combining dot and "ß".casefold() is "ss"; keep one character
+    mapped = fn(c)
+    if len(mapped) == 1:
+        return mapped
+    lowered = c.lower()
+    return lowered if len(lowered) == 1 else mapped[0]
+
+
+def _map_chunks(text: str, fn, chunk_size: int) -> str:
+    if text.isascii():
+        return fn(text)
+    # Case mapping non-ASCII input allocates a UCS-4 scratch buffer several
+    # times the input size, so map line-aligned chunks to bound the peak
+    parts = []
+    pos, size = 0, len(text)
+    while pos < size:
+        end = text.find("\n", pos + chunk_size)
+        end = size if end == -1 else end
+        chunk = text[pos:end]
+        mapped = fn(chunk)
+        if len(mapped) != len(chunk):
+            # Rare: a character maps to several; redo this chunk one character at a time
+            mapped = "".join(_map_char(c, fn) for c in chunk)
+        parts.append(mapped)
+        pos = end
+    return "".join(parts)
+
+
+def block_bounds(text: str, start: int = 0, end: Optional[int] = None) -> List[tuple]:
+    """(start, end) offsets of blank-line separated blocks in text[start:end]"""
+    end = len(text) if end is None else end
+    bounds = []
+    for m in BLOCK_SEP_RE.finditer(text, start, end):
+        bounds.append((start, m.start()))
+        start = m.end()
+    bounds.append((start, end))
+    return bounds
+
+
+def _trim(text: str, start: int, end: int) -> tuple:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def find_sections(text: str, lowered: Optional[str] = None) -> Dict[str, SectionSpan]:
+    """Locate resume sections as spans over `text` without copying any lines"""
+    size = len(text)
+    bounds = {}
+    current, start = "other", 0
+
+    # Lowercased text lets the case-sensitive patterns run; otherwise ignore case
+    if lowered is not None:
+        haystack, header_re, line_re = lowered, HEADER_RE, HEADER_LINE_RE
+    else:
+        haystack, (header_re, line_re) = text, _HEADER_RES_I
+
+    heads = [(m.start() + 1, m.end()) for m in line_re.finditer(haystack)]
+    first = header_re.match(haystack)
+    if first:
+        heads.insert(0, (0, first.end()))
+
+    for pos, end in heads:
+        # A repeated header starts its section over, as the line-list version did
+        bounds[current] = (start, pos)
+        current = haystack[pos:end].strip().lower()
+        bounds.pop(current, None)
+        nl = text.find("\n", end)
+        start = size if nl == -1 else nl + 1
+
+    bounds[current] = (start, size)
+
+    sections = {}
+    for name, (s, e) in bounds.items():
+        s, e = _trim(text, s, e)
+        if s < e:
+            sections[name] = SectionSpan(text, s, e, lowered)
+    return sections
+
+
 def split_sections(text: str) -> dict:
     """Split resume into sections based on headers"""
-    lines = text.splitlines()
-    sections = {}
-    current = "other"
-    
-    for line in lines:
-        line_lower = line.strip().lower()
-        
-        # Check if line is a header
-        matched = False
-        for header in HEADERS:
-            if line_lower.startswith(header) or line_lower == header:
-                current = header
-                sections[current] = []
-                matched = True
-                break
-        
-        if not matched and line.strip():
-            sections.setdefault(current, []).append(line)
-    
-    return {k: "\n".join(v).strip() for k, v in sections.items() if v}
+    return {k: span.joined_lines() for k, span in find_sections(text).items()}
@@ -0,0 +1,254 @@
+"""Compile the skill taxonomy into a binary index that workers memory-map.
+
+    python -m extractors.skill_index build [--taxonomy PATH] [--output PATH]
+
+The index holds the token Aho-Corasick automaton as flat little-endian uint32
+arrays (CSR transitions, failure links, outputs) plus an open-addressing hash
+table from token to id, so loading is an mmap and a header parse: no Python
+objects are built per skill, and the pages are shared by every worker that
+maps the same file.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from typing import Iterator, List, Optional
+
+from .matcher import TOKEN_RE, PhraseMatch, PhraseMatcher
+
+MAGIC = b"RSKIDX\x00\x00"
+FORMAT_VERSION = 1
+# magic, format version, states, edges, tokens, hash slots, outputs, skills, taxonomy digest
+HEADER = struct.Struct("<8sIIIIIII32s")
+
+INDEX_PATH = os.environ.get(
+    "SKILLS_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "skills.idx")
+)
+
+
+def taxonomy_digest(path: str) -> bytes:
+    """SHA-256 of the taxonomy file; the index is stale when this changes"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def index_version(digest: bytes) -> str:
+    """Version string for cache invalidation: format version plus taxonomy digest"""
+    return f"{FORMAT_VERSION}-{digest.hex()[:16]}"
+
+
+def _u32(values) -> bytes:
+    arr = array("I", values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _pad(blob: bytes) -> bytes:
+    return blob + b"\x00" * (-len(blob) % 4)
+
+
+def _slot_count(n: int) -> int:
+    size = 8
+    while size < n * 2:
+        size *= 2
+    return size
+
+
+def compile_index(skills: list, output: str, digest: bytes) -> str:
+    """Write the compiled index for `skills` to `output`; returns its version"""
+    from .skills import build_matcher
+
+    matcher = build_matcher(skills)
+    goto, fail, out = matcher._goto, matcher._fail, matcher._out
+
+    tokens = sorted({tok for edges in goto for tok in edges})
+    token_ids = {tok: i for i, tok in enumerate(tokens)}
+    names = sorted({skill.name for skill in skills})
+    skill_ids = {name: i for i, name in enumerate(names)}
+    categories = {skill.name: skill.category or "" for skill in skills}
+
+    edge_off, edge_tok, edge_tgt = [0], [], []
+    out_off, out_ntok, out_val = [0], [], []
+    for state, edges in enumerate(goto):
+        for tok in sorted(edges, key=token_ids.get):
+            edge_tok.append(token_ids[tok])
+            edge_tgt.append(edges[tok])
+        edge_off.append(len(edge_tok))
+        for n, (name, section_only) in out[state]:
+            out_ntok.append(n)
+            out_val.append(skill_ids[name] << 1 | int(section_only))
+        out_off.append(len(out_ntok))
+
+    tok_bytes = [tok.encode("utf-8") for tok in tokens]
+    tok_off = [0]
+    for b in tok_bytes:
+        tok_off.append(tok_off[-1] + len(b))
+    slots = [0] * _slot_count(len(tokens))
+    mask = len(slots) - 1
+    for i, b in enumerate(tok_bytes):
+        h = zlib.crc32(b) & mask
+        while slots[h]:
+            h = (h + 1) & mask
+        slots[h] = i + 1
+
+    skill_bytes = [f"{name}\t{categories[name]}".encode("utf-8") for name in names]
+    skill_off = [0]
+    for b in skill_bytes:
+        skill_off.append(skill_off[-1] + len(b))
+
+    tmp = output + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(goto), len(edge_tok), len(tokens),
+                            len(slots), len(out_ntok), len(names), digest))
+        for values in (edge_off, edge_tok, edge_tgt, fail, out_off, out_ntok, out_val,
+                       tok_off, slots, skill_off):
+            f.write(_u32(values))
+        f.write(_pad(b"".join(tok_bytes)))
+        f.write(_pad(b"".join(skill_bytes)))
+    # Atomic swap so running workers never map a half-written file
+    os.replace(tmp, output)
+    return index_version(digest)
+
+
+class CompiledMatcher(PhraseMatcher):
+    """Read-only PhraseMatcher backed by a memory-mapped index file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+        (magic, fmt, n_states, n_edges, n_tokens, n_slots, n_outputs,
+         n_skills, self.digest) = HEADER.unpack_from(buf)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"Unsupported skills index: {path}")
+        self.version = index_version(self.digest)
+
+        pos = HEADER.size
+        arrays = []
+        for count in (n_states + 1, n_edges, n_edges, n_states, n_states + 1,
+                      n_outputs, n_outputs, n_tokens + 1, n_slots, n_skills + 1):
+            arrays.append(self._view(buf, pos, count))
+            pos += count * 4
+        (self._edge_off, self._edge_tok, self._edge_tgt, self._fail_links, self._out_off,
+         self._out_ntok, self._out_val, self._tok_off, self._slots, self._skill_off) = arrays
+        self._tok_blob = buf[pos:pos + self._tok_off[-1]]
+        pos += len(self._tok_blob) + (-len(self._tok_blob) % 4)
+        self._skill_blob = buf[pos:pos + self._skill_off[-1]]
+        self._mask = n_slots - 1
+        self._n_states = n_states
+        self._names = {}
+
+    @staticmethod
+    def _view(buf: memoryview, pos: int, count: int):
+        view = buf[pos:pos + count * 4]
+        if sys.byteorder == "big":
+            arr = array("I", view.tobytes())
+            arr.byteswap()
+            return arr
+        return view.cast("I")
+
+    def __len__(self) -> int:
+        return sum(1 for s in range(self._n_states) if self._out_off[s + 1] > self._out_off[s])
+
+    def add(self, phrase, value):
+        raise TypeError("CompiledMatcher is read-only; rebuild the index instead")
+
+    def build(self) -> "CompiledMatcher":
+        return self
+
+    def skill(self, skill_id: int) -> tuple:
+        """(name, category) for a skill id"""
+        entry = self._names.get(skill_id)
+        if entry is None:
+            raw = bytes(self._skill_blob[self._skill_off[skill_id]:self._skill_off[skill_id + 1]])
+            name, category = raw.decode("utf-8").split("\t")
+            entry = self._names[skill_id] = (name, category or None)
+        return entry
+
+    def token_id(self, tok: str) -> Optional[int]:
+        """Id of a vocabulary token, or None if no phrase contains it"""
+        b = tok.encode("utf-8")
+        mask, slots, off, blob = self._mask, self._slots, self._tok_off, self._tok_blob
+        h = zlib.crc32(b) & mask
+        while True:
+            slot = slots[h]
+            if not slot:
+                return None
+            if blob[off[slot - 1]:off[slot]] == b:
+                return slot - 1
+            h = (h + 1) & mask
+
+    def _step(self, state: int, tid: int) -> Optional[int]:
+        lo, hi = self._edge_off[state], self._edge_off[state + 1]
+        i = bisect_left(self._edge_tok, tid, lo, hi)
+        if i < hi and self._edge_tok[i] == tid:
+            return self._edge_tgt[i]
+        return None
+
+    def iter_matches(self, text: str, start: int = 0, end: Optional[int] = None) -> Iterator[PhraseMatch]:
+        fail, out_off, out_ntok, out_val = self._fail_links, self._out_off, self._out_ntok, self._out_val
+        mask, slots, tok_off, blob = self._mask, self._slots, self._tok_off, self._tok_blob
+        crc32, step = zlib.crc32, self._step
+        end = len(text) if end is None else end
+        starts = []
+        state = 0
+        for m in TOKEN_RE.finditer(text, start, end):
+            starts.append(m.start())
+            # Inlined token_id(): most resume tokens miss on the first probe
+            b = m.group().encode("utf-8")
+            h = crc32(b) & mask
+            tid = None
+            while slots[h]:
+                slot = slots[h]
+                if blob[tok_off[slot - 1]:tok_off[slot]] == b:
+                    tid = slot - 1
+                    break
+                h = (h + 1) & mask
+            if tid is None:
+                # No phrase contains this token, so every partial match dies here
+                state = 0
+                continue
+            nxt = step(state, tid)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = step(state, tid)
+            state = nxt or 0
+            lo, hi = out_off[state], out_off[state + 1]
+            if lo < hi:
+                last, tok_end = len(starts), m.end()
+                for i in range(lo, hi):
+                    val = out_val[i]
+                    yield PhraseMatch(starts[last - out_ntok[i]], tok_end,
+                                      (self.skill(val >> 1)[0], bool(val & 1)))
+
+
+def load_index(path: str = INDEX_PATH) -> CompiledMatcher:
+    """Memory-map a compiled skills index"""
+    return CompiledMatcher(path)
+
+
+def main(argv: Optional[List[str]] = None):
+    from .skills import TAXONOMY_PATH, load_taxonomy
+
+    parser = argparse.ArgumentParser(description="Compile the skill taxonomy into a binary index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="compile the taxonomy TSV")
+    build.add_argument("--taxonomy", default=TAXONOMY_PATH)
+    build.add_argument("--output", default=INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    skills = load_taxonomy(args.taxonomy)
+    version = compile_index(skills, args.output, taxonomy_digest(args.taxonomy))
+    size = os.path.getsize(args.output)
+    print(f"Wrote {args.output}: {len(skills)} skills, {size} bytes, version {version}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,118 @@
-import re
-from typing import List
-
-KNOWN_SKILLS = {
-    "python", "java", "javascript", "typescript", "c", "c++", "c#", "ruby", "php", "swift", "kotlin", "go", "rust",
-    "react", "angular", "vue", "node.js", "express", "django", "flask", "spring", "asp.net",
-    "sql", "mysql", "postgresql", "mongodb", "redis", "elasticsearch",
-    "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "git", "ci/cd",
-    "machine learning", "deep learning", "nlp", "computer vision", "tensorflow", "pytorch",
-    "html", "css", "sass", "bootstrap", "tailwind",
-    "rest api", "graphql", "microservices", "agile", "scrum"
-}
-
-def extract_skills(section_text: str) -> List[str]:
-    """Extract skills from skills section"""
-    if not section_text:
+import os
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Union
+from .fuzzy import MIN_LENGTH, TrigramIndex, find_fuzzy
+from .matcher import PhraseMatcher
+from .skill_index import INDEX_PATH, index_version, load_index, taxonomy_digest
+from .sections import SectionSpan, as_span
+
+TAXONOMY_PATH = os.environ.get(
+    "SKILLS_TAXONOMY_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "skills.tsv")
+)
+
+
+class Skill(NamedTuple):
+    name: str
+    category: Optional[str]
+    aliases: tuple
+    section_only: bool
+
+
+def load_taxonomy(path: str = TAXONOMY_PATH) -> List[Skill]:
+    """Read the skill taxonomy TSV: skill, category, |-separated aliases, flags"""
+    skills = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t") + ["", "", ""]
+            name, category, aliases, flags = fields[:4]
+            skills.append(Skill(
+                name=name.strip().casefold(),
+                category=category.strip() or None,
+                aliases=tuple(a.strip() for a in aliases.split("|") if a.strip()),
+                section_only="section" in flags.split(",")
+            ))
+    return skills
+
+
+def build_matcher(skills: List[Skill]) -> PhraseMatcher:
+    """Compile skills and aliases into one automaton; values are (skill, section_only)"""
+    matcher = PhraseMatcher()
+    for skill in skills:
+        matcher.add(skill.name, (skill.name, skill.section_only))
+    # Aliases go in after every canonical name so a name always maps to itself
+    for skill in skills:
+        for alias in skill.aliases:
+            matcher.add(alias, (skill.name, False))
+    return matcher.build()
+
+
+@lru_cache(maxsize=None)
+def get_matcher(path: str = TAXONOMY_PATH) -> PhraseMatcher:
+    """Map the compiled index if it matches the taxonomy, else compile in-process"""
+    digest = taxonomy_digest(path)
+    if os.path.exists(INDEX_PATH):
+        index = load_index(INDEX_PATH)
+        if index.digest == digest:
+            return index
+        print(f"Warning: skills index {INDEX_PATH} is stale. Run: python -m extractors.skill_index build")
+    matcher = build_matcher(load_taxonomy(path))
+    matcher.version = index_version(digest)
+    return matcher
+
+
+@lru_cache(maxsize=None)
+def get_fuzzy_index(path: str = TAXONOMY_PATH) -> TrigramIndex:
+    """Trigram index over skill names and aliases, built on first fuzzy use"""
+    terms = []
+    for skill in load_taxonomy(path):
+        # Short names collide with words through their aliases too ("reacts" ~ "reactjs")
+        if len(skill.name) < MIN_LENGTH:
+            continue
+        # Ambiguous bare names are too short and common to guess at
+        if not skill.section_only:
+            terms.append((skill.name, skill.name))
+        terms.extend((alias, skill.name) for alias in skill.aliases)
+    return TrigramIndex(terms)
+
+
+def skills_version() -> str:
+    """Version of the active skill vocabulary, for invalidating cached results"""
+    return get_matcher().version
+
+
+def extract_skills(section: Union[str, SectionSpan],
+                   document: Optional[SectionSpan] = None,
+                   fuzzy: bool = False) -> List[str]:
+    """Extract skills from the resume.
+
+    With a `document`, skills are matched anywhere in it; names flagged as
+    ambiguous in the taxonomy (e.g. "go", "swift") only count inside `section`.
+    `fuzzy` also accepts near-misses such as OCR's "Pyhton" or "Kubernets".
+    """
+    section = as_span(section)
+    scope = document if document is not None else section
+    if not scope:
         return []
-    
-    tokens = re.split(r"[,\n;•·\|]", section_text.lower())
-    found_skills = set()
-    
-    for token in tokens:
-        cleaned = token.strip()
-        if cleaned in KNOWN_SKILLS:
-            found_skills.add(cleaned)
-    
-    return sorted(list(found_skills))
+
+    haystack, offset = scope.lower_view()
+    start, end = scope.start - offset, scope.end - offset
+    in_section = section.source is scope.source
+    found = set()
+    matched = []
+
+    for m in get_matcher().find(haystack, start, end):
+        name, section_only = m.value
+        if section_only:
+            s, e = m.start + offset, m.end + offset
+            if not (in_section and section.start <= s and e <= section.end):
+                continue
+        found.add(name)
+        matched.append((m.start, m.end))
+
+    if fuzzy:
+        found.update(v for _, _, v in find_fuzzy(get_fuzzy_index(), haystack, start, end, matched))
+
+    return sorted(found)
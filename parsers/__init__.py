@@ -1,5 +1,14 @@
+from .registry import (
+    parse_file, parser_for, sniff, register,
+    UnsupportedFormatError, InvalidDocumentError
+)
 from .pdf_parser import parse_pdf
 from .docx_parser import parse_docx
 from .image_parser import parse_image
+from .sandbox import parse_sandboxed, SandboxPool, ParseTimeoutError, ParseResourceError
 
-__all__ = ['parse_pdf', 'parse_docx', 'parse_image']
+__all__ = [
+    'parse_pdf', 'parse_docx', 'parse_image', 'parse_file', 'parser_for', 'sniff', 'register',
+    'UnsupportedFormatError', 'InvalidDocumentError',
+    'parse_sandboxed', 'SandboxPool', 'ParseTimeoutError', 'ParseResourceError'
+]
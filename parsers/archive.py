@@ -0,0 +1,55 @@
+import os
+import zipfile
+from typing import BinaryIO, List, Tuple
+
+from .registry import InvalidDocumentError
+
+# Zip bomb limits: members, uncompressed bytes per member and in total, compression ratio
+ARCHIVE_MAX_MEMBERS = int(os.environ.get("ARCHIVE_MAX_MEMBERS", "500"))
+ARCHIVE_MAX_MEMBER_MB = int(os.environ.get("ARCHIVE_MAX_MEMBER_MB", "20"))
+ARCHIVE_MAX_TOTAL_MB = int(os.environ.get("ARCHIVE_MAX_TOTAL_MB", "500"))
+ARCHIVE_MAX_RATIO = int(os.environ.get("ARCHIVE_MAX_RATIO", "100"))
+
+
+class ArchiveLimitError(InvalidDocumentError):
+    """The archive or one of its members exceeds a zip bomb limit"""
+
+
+def _skipped(info: zipfile.ZipInfo) -> bool:
+    # Directories and macOS/OS metadata that ride along in zips made by hand
+    base = os.path.basename(info.filename)
+    return info.is_dir() or info.filename.startswith("__MACOSX/") or base.startswith(".") or not base
+
+
+def open_archive(fileobj: BinaryIO) -> Tuple[zipfile.ZipFile, List[zipfile.ZipInfo]]:
+    """Open an uploaded zip and list its documents; limits are checked on the central directory"""
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise InvalidDocumentError("Not a zip archive")
+    members = [info for info in archive.infolist() if not _skipped(info)]
+    if len(members) > ARCHIVE_MAX_MEMBERS:
+        archive.close()
+        raise ArchiveLimitError(f"Archive has {len(members)} files; the limit is {ARCHIVE_MAX_MEMBERS}")
+    declared = sum(info.file_size for info in members)
+    if declared > ARCHIVE_MAX_TOTAL_MB << 20:
+        archive.close()
+        raise ArchiveLimitError(f"Archive expands to {declared >> 20} MB; the limit is {ARCHIVE_MAX_TOTAL_MB} MB")
+    return archive, members
+
+
+def read_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Member bytes, decompressed in memory; the declared sizes are not trusted"""
+    limit = ARCHIVE_MAX_MEMBER_MB << 20
+    if info.flag_bits & 0x1:
+        raise InvalidDocumentError("File is password-protected")
+    if info.file_size > limit:
+        raise ArchiveLimitError(f"File expands to {info.file_size >> 20} MB; the limit is {ARCHIVE_MAX_MEMBER_MB} MB")
+    if info.compress_size and info.file_size / info.compress_size > ARCHIVE_MAX_RATIO:
+        raise ArchiveLimitError(f"File compression ratio exceeds {ARCHIVE_MAX_RATIO}:1")
+    with archive.open(info) as f:
+        # One byte past the limit catches a member that inflates beyond its header
+        data = f.read(limit + 1)
+    if len(data) > limit:
+        raise ArchiveLimitError(f"File expands past {ARCHIVE_MAX_MEMBER_MB} MB")
+    return data
@@ -1,9 +1,25 @@
+import os
+import zipfile
 from docx import Document
+from .registry import DOCX, InvalidDocumentError, Source, as_file, register
 
-def parse_docx(path: str) -> str:
+DOCX_TIMEOUT = float(os.environ.get("DOCX_PARSE_TIMEOUT", "15"))
+
+def validate_docx(source: Source):
+    """Reject corrupt or empty DOCX packages from the zip directory alone"""
+    try:
+        with zipfile.ZipFile(as_file(source)) as z:
+            info = z.getinfo("word/document.xml")
+    except (zipfile.BadZipFile, KeyError):
+        raise InvalidDocumentError("DOCX package is corrupt")
+    if info.file_size == 0:
+        raise InvalidDocumentError("DOCX has no document body")
+
+@register(DOCX, validate=validate_docx, timeout=DOCX_TIMEOUT)
+def parse_docx(source: Source) -> str:
     """Extract text from DOCX file including tables"""
     try:
-        doc = Document(path)
+        doc = Document(as_file(source))
         parts = []
         
         # Extract paragraphs
@@ -19,5 +35,8 @@ def parse_docx(path: str) -> str:
                     parts.append(row_text)
         
         return "\n".join(parts)
+    except MemoryError:
+        # Left as is so the sandbox reports its memory limit
+        raise
     except Exception as e:
         raise Exception(f"Error parsing DOCX: {str(e)}")
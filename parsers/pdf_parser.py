@@ -1,13 +1,53 @@
+import io
+import os
+import re
+import time
 import pdfplumber
+from pdfminer.pdfdocument import PDFDocument, PDFEncryptionError, PDFPasswordIncorrect
+from pdfminer.pdfparser import PDFParser
+from .registry import InvalidDocumentError, Source, as_file, note_skipped, parse_time_left, read_bytes, register
 
-def parse_pdf(path: str) -> str:
-    """Extract text from PDF file"""
+PDF_TIMEOUT = float(os.environ.get("PDF_PARSE_TIMEOUT", "30"))
+ENCRYPT_RE = re.compile(rb"/Encrypt\b")
+# A page object; "/Pages" is the page tree root, not a page
+PAGE_RE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
+def validate_pdf(source: Source):
+    """Reject password-protected and page-less PDFs without parsing content"""
+    data = read_bytes(source)
+    if ENCRYPT_RE.search(data):
+        # Owner-password-only files open with an empty password; only the trailer is read
+        try:
+            PDFDocument(PDFParser(io.BytesIO(data)), password="")
+        except (PDFPasswordIncorrect, PDFEncryptionError):
+            raise InvalidDocumentError("PDF is password-protected")
+        except MemoryError:
+            raise
+        except Exception:
+            pass  # leave malformed files to the parser's own recovery
+    # Page objects can be compressed inside object streams, so only trust plain files
+    elif not PAGE_RE.search(data) and b"/ObjStm" not in data:
+        raise InvalidDocumentError("PDF has no pages")
+
+@register("application/pdf", validate=validate_pdf, timeout=PDF_TIMEOUT)
+def parse_pdf(source: Source) -> str:
+    """Extract text from PDF file; under a parse budget, stops before a page that would overrun it"""
     text = []
     try:
-        with pdfplumber.open(path) as pdf:
-            for page in pdf.pages:
+        with pdfplumber.open(as_file(source)) as pdf:
+            started = time.perf_counter()
+            pages = pdf.pages
+            for i, page in enumerate(pages):
+                left = parse_time_left()
+                # The first page is always read; later ones if the average page still fits
+                if i and left is not None and left < (time.perf_counter() - started) / i:
+                    note_skipped(f"pdf.pages {i + 1}-{len(pages)}")
+                    break
                 t = page.extract_text() or ""
                 text.append(t)
         return "\n".join(text)
+    except MemoryError:
+        # Left as is so the sandbox reports its memory limit
+        raise
     except Exception as e:
         raise Exception(f"Error parsing PDF: {str(e)}")
@@ -0,0 +1,164 @@
+import contextvars
+import io
+import os
+import time
+import zipfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Union
+
+# Parsers take a path or the document's bytes (e.g. a member read from an uploaded zip)
+Source = Union[str, bytes]
+
+# Bytes read to identify a file; PDF allows junk before %PDF- in the first 1 KB
+SNIFF_BYTES = 1024
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+# (magic, offset, MIME type), checked in order
+MAGIC = [
+    (b"\x89PNG\r\n\x1a\n", 0, "image/png"),
+    (b"\xff\xd8\xff", 0, "image/jpeg"),
+    (b"II*\x00", 0, "image/tiff"),
+    (b"MM\x00*", 0, "image/tiff"),
+    (b"BM", 0, "image/bmp"),
+    (b"GIF8", 0, "image/gif"),
+    (b"RIFF", 0, "image/webp"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", 0, "application/x-ole-storage"),
+    (b"{\\rtf", 0, "application/rtf"),
+]
+
+# Readable names for formats that are recognised but have no parser
+DESCRIPTIONS = {
+    "application/x-ole-storage": "legacy Word (.doc) or password-protected Office document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "Excel workbook",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "PowerPoint deck",
+    "application/zip": "zip archive",
+    "application/rtf": "RTF document",
+}
+
+
+class UnsupportedFormatError(ValueError):
+    """The file's content is not a format any parser handles"""
+
+
+class InvalidDocumentError(ValueError):
+    """The file is a supported format but cannot be parsed (encrypted, empty, corrupt)"""
+
+
+class Parser(NamedTuple):
+    mime: str
+    parse: Callable[[Source], str]
+    # Cheap checks run before parse; raise InvalidDocumentError to reject
+    validate: Optional[Callable[[Source], None]] = None
+    # Wall-clock seconds before a sandboxed parse is killed
+    timeout: float = 30.0
+
+
+PARSERS: Dict[str, Parser] = {}
+
+# Monotonic time the current parse should wrap up by, and what it left out to make it
+_parse_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("parse_deadline", default=None)
+_parse_skipped: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("parse_skipped", default=None)
+
+
+@contextmanager
+def parse_budget(seconds: Optional[float]) -> Iterator[List[str]]:
+    """Give the parses in this block seconds to finish; yields the list of what they skipped"""
+    skipped = []
+    deadline = _parse_deadline.set(None if seconds is None else time.monotonic() + seconds)
+    notes = _parse_skipped.set(skipped)
+    try:
+        yield skipped
+    finally:
+        _parse_skipped.reset(notes)
+        _parse_deadline.reset(deadline)
+
+
+def parse_time_left() -> Optional[float]:
+    """Seconds left in the current parse budget, or None when there is none"""
+    deadline = _parse_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def note_skipped(what: str):
+    """Record content a parser left out to meet its budget"""
+    skipped = _parse_skipped.get()
+    if skipped is not None:
+        skipped.append(what)
+
+
+def register(*mime_types: str, validate: Optional[Callable[[Source], None]] = None, timeout: float = 30.0):
+    """Decorator declaring the MIME types a parser handles"""
+    def decorator(fn):
+        for mime in mime_types:
+            if mime in PARSERS:
+                raise ValueError(f"Parser already registered for {mime}")
+            PARSERS[mime] = Parser(mime, fn, validate, timeout)
+        return fn
+    return decorator
+
+
+def as_file(source: Source):
+    """Something pdfplumber, python-docx, PIL and zipfile can all open"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def read_bytes(source: Source, limit: int = -1) -> bytes:
+    if isinstance(source, bytes):
+        return source if limit < 0 else source[:limit]
+    with open(source, "rb") as f:
+        return f.read(limit)
+
+
+def _sniff_zip(source: Source) -> str:
+    # OOXML formats are zips told apart by their parts; only the central directory is read
+    try:
+        with zipfile.ZipFile(as_file(source)) as z:
+            names = set(z.namelist())
+    except zipfile.BadZipFile:
+        return "application/zip"
+    if "word/document.xml" in names:
+        return DOCX
+    if "xl/workbook.xml" in names:
+        return "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    if "ppt/presentation.xml" in names:
+        return "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+    return "application/zip"
+
+
+def sniff(source: Source) -> Optional[str]:
+    """MIME type from the document's leading bytes, or None if unrecognised"""
+    head = read_bytes(source, SNIFF_BYTES)
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return _sniff_zip(source)
+    for magic, offset, mime in MAGIC:
+        if head.startswith(magic, offset):
+            if mime == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return mime
+    # Last: a zip member or image metadata may contain %PDF- too
+    if b"%PDF-" in head:
+        return "application/pdf"
+    return None
+
+
+def parser_for(source: Source, name: Optional[str] = None) -> Parser:
+    """Parser for the document's content; the file name is only used in the error message"""
+    mime = sniff(source)
+    parser = PARSERS.get(mime)
+    if parser is None:
+        if name is None and isinstance(source, str):
+            name = source
+        kind = DESCRIPTIONS.get(mime, mime) or os.path.splitext(name or "")[1].lower() or "unknown"
+        raise UnsupportedFormatError(f"Unsupported file type: {kind}")
+    return parser
+
+
+def parse_file(source: Source, name: Optional[str] = None) -> str:
+    """Sniff, validate and parse a document from its path or bytes"""
+    parser = parser_for(source, name)
+    if parser.validate is not None:
+        parser.validate(source)
+    return parser.parse(source)
@@ -0,0 +1,250 @@
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from common.resources import MEMORY_ACCOUNTING, SANDBOX_WORKERS, measure_memory
+
+from .registry import Source, parse_budget, parse_file, parser_for
+
+try:
+    import resource
+except ImportError:  # Windows: timeouts still apply, rlimits do not
+    resource = None
+
+# Parse in worker subprocesses; 0 parses in the calling process
+SANDBOX = os.environ.get("PARSE_SANDBOX", "1") == "1"
+# Address-space cap per worker, and CPU seconds allowed per document
+SANDBOX_MEMORY_MB = int(os.environ.get("SANDBOX_MEMORY_MB", "1024"))
+SANDBOX_CPU_SECONDS = int(os.environ.get("SANDBOX_CPU_SECONDS", "60"))
+# Documents per worker before it is replaced, returning fragmented memory to the OS
+SANDBOX_MAX_JOBS = int(os.environ.get("SANDBOX_MAX_JOBS", "50"))
+
+
+class ParseTimeoutError(TimeoutError):
+    """The parser ran past its format's wall-clock timeout and was killed"""
+
+
+class ParseResourceError(RuntimeError):
+    """The parser exceeded its memory or CPU cap, or its worker died"""
+
+
+def _set_cpu_limit(seconds: int):
+    # RLIMIT_CPU counts the whole process, so each job gets its budget on top of what is spent
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(usage.ru_utime + usage.ru_stime) + seconds
+    resource.setrlimit(resource.RLIMIT_CPU, (soft if hard == resource.RLIM_INFINITY else min(soft, hard), hard))
+
+
+def _worker_main(conn, parse: Callable[[str], str], memory_mb: int, cpu_seconds: int, max_jobs: int,
+                 track_memory: bool = False):
+    """Subprocess loop: receive (path or bytes, seconds of budget or None), send back
+    ("ok", text, info) or ("error", exception, info). info lists what the parser
+    skipped to meet the budget, plus the measure_memory figures with track_memory."""
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    for _ in range(max_jobs):
+        try:
+            source, budget = conn.recv()
+        except EOFError:
+            return
+        if resource is not None and cpu_seconds > 0:
+            _set_cpu_limit(cpu_seconds)
+        info = {}
+        try:
+            with parse_budget(budget) as info["skipped"]:
+                if track_memory:
+                    text, measured = measure_memory(parse, source)
+                    info.update(measured)
+                else:
+                    text = parse(source)
+            reply = ("ok", text, info)
+        except MemoryError:
+            reply = ("error", ParseResourceError("Parser exceeded its memory limit"), info)
+        except Exception as e:
+            reply = ("error", e, info)
+        try:
+            conn.send(reply)
+        except Exception:
+            # Unpicklable exception from a parser library
+            conn.send(("error", RuntimeError(str(reply[1])), info))
+    conn.close()
+
+
+class SandboxWorker:
+    """One parser subprocess, replaced when it is killed or has served max_jobs"""
+
+    def __init__(self, context, parse: Callable[[str], str], memory_mb: int, cpu_seconds: int, max_jobs: int,
+                 track_memory: bool = False):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main,
+                                       args=(child, parse, memory_mb, cpu_seconds, max_jobs, track_memory),
+                                       daemon=True, name="parse-sandbox")
+        self.process.start()
+        child.close()
+        self.jobs = 0
+        self.max_jobs = max_jobs
+
+    @property
+    def usable(self) -> bool:
+        return self.process.is_alive() and self.jobs < self.max_jobs
+
+    def parse(self, source: Source, timeout: float, info: Optional[dict] = None,
+              deadline: Optional[float] = None) -> str:
+        self.jobs += 1
+        try:
+            # Monotonic deadline to seconds left, counted from when the worker gets the job
+            self.conn.send((source, None if deadline is None else deadline - time.monotonic()))
+            finished = self.conn.poll(timeout)
+            if finished:
+                status, value, reported = self.conn.recv()
+        except (EOFError, OSError):
+            # Killed by an rlimit, or never started properly: the pipe is gone either way
+            self.process.join(1)
+            code = self.process.exitcode
+            reason = signal.Signals(-code).name if code is not None and code < 0 else f"exit code {code}"
+            raise ParseResourceError(f"Parser worker died ({reason})")
+        if not finished:
+            self.kill()
+            raise ParseTimeoutError(f"Parsing timed out after {timeout:g}s")
+        if info is not None:
+            info.update(reported)
+        if status == "error":
+            raise value
+        return value
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SandboxPool:
+    """Parses documents in rlimited subprocesses with per-format timeouts.
+
+    Formats are sniffed in the caller so the parser's registered timeout is
+    known; validation and parsing happen in the worker. A worker that times
+    out is killed and replaced, so a document that spins or balloons only
+    costs its own request.
+    """
+
+    def __init__(self, workers: int = SANDBOX_WORKERS, memory_mb: int = SANDBOX_MEMORY_MB,
+                 cpu_seconds: int = SANDBOX_CPU_SECONDS, max_jobs: int = SANDBOX_MAX_JOBS,
+                 start_method: Optional[str] = None, parse: Callable[[str], str] = parse_file,
+                 track_memory: bool = MEMORY_ACCOUNTING):
+        if start_method is None:
+            # forkserver forks from a clean process with the parsers preloaded;
+            # forking the API process itself would copy its threads' locks
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self.context.set_forkserver_preload(["parsers"])
+        # Must be importable by name in the worker
+        self.parse_fn = parse
+        self.memory_mb = memory_mb
+        self.cpu_seconds = cpu_seconds
+        self.max_jobs = max_jobs
+        self.track_memory = track_memory
+        # Slots are None until first use, so idle pools start no processes
+        self._idle = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(None)
+        self.workers = workers
+        # Jobs waiting for a worker and jobs being parsed, by parser name
+        self._waiting = Counter()
+        self._busy = Counter()
+        self._stats_lock = threading.Lock()
+
+    def _spawn(self) -> SandboxWorker:
+        return SandboxWorker(self.context, self.parse_fn, self.memory_mb, self.cpu_seconds, self.max_jobs,
+                             self.track_memory)
+
+    def parse(self, source: Source, name: Optional[str] = None, info: Optional[dict] = None,
+              deadline: Optional[float] = None) -> str:
+        """Text of the document, or the parser's exception re-raised here.
+
+        deadline is a time.monotonic() value the parser should wrap up by,
+        leaving out content if it must (parse_budget). When info is given, the
+        parser's name ("parser"), what it skipped ("skipped") and, with
+        track_memory, the worker's measure_memory figures are added to it.
+        """
+        parser = parser_for(source, name)
+        key = parser.parse.__name__
+        with self._stats_lock:
+            self._waiting[key] += 1
+        try:
+            worker = self._idle.get()
+        finally:
+            with self._stats_lock:
+                self._waiting[key] -= 1
+                self._busy[key] += 1
+        try:
+            if worker is None or not worker.usable:
+                if worker is not None:
+                    worker.kill()
+                worker = self._spawn()
+            if info is not None:
+                info["parser"] = key
+            return worker.parse(source, parser.timeout, info, deadline)
+        finally:
+            with self._stats_lock:
+                self._busy[key] -= 1
+            self._idle.put(worker if worker is not None and worker.usable else None)
+
+    def stats(self) -> dict:
+        """Worker count plus jobs waiting and parsing, by parser name"""
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "waiting": {k: n for k, n in self._waiting.items() if n},
+                "busy": {k: n for k, n in self._busy.items() if n},
+            }
+
+    def close(self):
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.kill()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def sandbox_stats() -> Optional[dict]:
+    """The process-wide pool's stats, or None when parsing is not sandboxed"""
+    return get_sandbox().stats() if SANDBOX else None
+
+
+def get_sandbox() -> SandboxPool:
+    """Process-wide pool, created on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxPool()
+        return _pool
+
+
+def parse_sandboxed(source: Source, name: Optional[str] = None, info: Optional[dict] = None,
+                    deadline: Optional[float] = None) -> str:
+    """parse_file in a worker subprocess, or in-process when PARSE_SANDBOX=0; see SandboxPool.parse"""
+    if SANDBOX:
+        return get_sandbox().parse(source, name, info, deadline)
+    info = {} if info is None else info
+    info["parser"] = parser_for(source, name).parse.__name__
+    with parse_budget(None if deadline is None else deadline - time.monotonic()) as info["skipped"]:
+        if not MEMORY_ACCOUNTING:
+            return parse_file(source, name)
+        text, measured = measure_memory(parse_file, source, name)
+    info.update(measured)
+    return text
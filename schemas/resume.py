@@ -6,6 +6,7 @@ class ExperienceItem(BaseModel):
     role: Optional[str] = None
     start_date: Optional[str] = None
     end_date: Optional[str] = None
+    tenure_months: Optional[int] = None
     description: Optional[str] = None
 
 class EducationItem(BaseModel):
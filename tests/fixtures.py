@@ -0,0 +1,21 @@
+"""Sample files and rogue parsers shared by the tests and the benchmarks"""
+import os
+
+SAMPLES = os.path.join(os.path.dirname(__file__), "sample_resumes")
+
+EMPTY_PDF = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+             b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+ENCRYPTED_PDF = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+                 b"2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj\n"
+                 b"3 0 obj<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>endobj\n"
+                 b"4 0 obj<</Filter/Standard/V 1/R 2/O<" + b"11" * 32 + b">/U<" + b"22" * 32 + b">/P -4>>endobj\n"
+                 b"trailer<</Root 1 0 R/Encrypt 4 0 R/ID[<00112233445566778899aabbccddeeff>"
+                 b"<00112233445566778899aabbccddeeff>]>>\n%%EOF\n")
+
+# Sandbox workers import these by name
+def spin(path):
+    while True:
+        pass
+
+def balloon(path):
+    return len(bytearray(1 << 30))
@@ -1,5 +1,8 @@
 import io
+import json
+import zipfile
 import pytest
+import parsers.archive
 from fastapi.testclient import TestClient
 import app.main as main_mod
 from app.main import app
@@ -16,6 +19,11 @@ def test_health():
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
 
+def test_metrics():
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert {"counters", "timings", "spacy_bypass_rate"} <= set(response.json())
+
 def test_upload_success(monkeypatch):
     # Patch extraction pipeline to avoid heavy deps
     monkeypatch.setattr(main_mod, "extract_text", lambda path: "dummy extracted text")
@@ -48,3 +56,229 @@ def test_upload_processing_error(monkeypatch):
     resp = client.post("/extract", files=files)
     assert resp.status_code == 500
     assert "Processing error" in resp.json().get("detail", "")
+
+@pytest.mark.parametrize("error, status", [
+    (main_mod.ParseTimeoutError("Parsing timed out after 30s"), 504),
+    (main_mod.ParseResourceError("Parser exceeded its memory limit"), 422),
+])
+def test_upload_sandbox_errors(monkeypatch, error, status):
+    def _fail(path):
+        raise error
+    monkeypatch.setattr(main_mod, "extract_text", _fail)
+    files = {"file": ("resume.pdf", b"%PDF-1.4\n", "application/pdf")}
+    resp = client.post("/extract", files=files)
+    assert resp.status_code == status
+    assert str(error) in resp.json().get("detail", "")
+
+def _zip(members):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in members.items():
+            z.writestr(name, data)
+    return buf.getvalue()
+
+def test_extract_archive_streams_ndjson(monkeypatch):
+    monkeypatch.setattr(main_mod, "extract_text", lambda source, name=None: source.decode())
+    # Streamed requests count towards /ready's in-flight total while they run
+    monkeypatch.setattr(main_mod, "to_json", lambda text: {"name": text, "in_flight": main_mod._in_flight})
+    archive = _zip({"a/alice.pdf": b"Alice", "b/bob.docx": b"Bob", "__MACOSX/._a": b"", "bomb.pdf": bytes(1 << 20)})
+    resp = client.post("/extract/archive", files={"file": ("batch.zip", archive, "application/zip")})
+    assert resp.status_code == 200 and resp.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(l) for l in resp.text.splitlines()]
+    assert lines[-1]["status"] == "done" and lines[-1]["files"] == 3 and lines[-1]["errors"] == 1
+    by_name = {l["filename"]: l for l in lines[:-1]}
+    assert by_name["a/alice.pdf"]["data"] == {"name": "Alice", "in_flight": 1} and main_mod._in_flight == 0
+    assert "compression ratio" in by_name["bomb.pdf"]["error"]
+
+def test_extract_archive_limits(monkeypatch):
+    monkeypatch.setattr(parsers.archive, "ARCHIVE_MAX_MEMBERS", 2)
+    archive = _zip({f"r{i}.pdf": b"x" for i in range(3)})
+    resp = client.post("/extract/archive", files={"file": ("batch.zip", archive, "application/zip")})
+    assert resp.status_code == 400 and "limit is 2" in resp.json()["detail"]
+    resp = client.post("/extract/archive", files={"file": ("batch.zip", b"not a zip", "application/zip")})
+    assert resp.status_code == 400
+
+def test_extract_stream_emits_field_groups(monkeypatch):
+    in_flight = []
+    monkeypatch.setattr(main_mod, "extract_text", lambda source, name=None: in_flight.append(main_mod._in_flight)
+                        or "Jane Doe\njane@example.com\n\nSkills\nPython\n")
+    files = {"file": ("resume.pdf", b"%PDF-1.4\n", "application/pdf")}
+    resp = client.post("/extract/stream", files=files)
+    assert resp.status_code == 200
+    events = [json.loads(l) for l in resp.text.splitlines()]
+    assert events[0]["event"] == "text" and events[-1]["event"] == "done"
+    groups = {e["event"]: e.get("data") for e in events}
+    assert set(groups) == {"text", "contacts", "sections", "identity", "done"}
+    assert groups["contacts"]["email"] == "jane@example.com" and groups["sections"]["skills"] == ["python"]
+    assert [e["ms"] for e in events] == sorted(e["ms"] for e in events)
+    assert in_flight == [1] and main_mod._in_flight == 0
+
+def test_extract_stream_errors(monkeypatch):
+    resp = client.post("/extract/stream", files={"file": ("resume.txt", b"plain text", "text/plain")})
+    assert resp.status_code == 400 and "Unsupported file type" in resp.json()["detail"]
+    def _timeout(source, name=None):
+        raise main_mod.ParseTimeoutError("Parsing timed out after 30s")
+    monkeypatch.setattr(main_mod, "extract_text", _timeout)
+    resp = client.post("/extract/stream", files={"file": ("resume.pdf", b"%PDF-1.4\n", "application/pdf")})
+    assert [json.loads(l)["status"] for l in resp.text.splitlines()] == [504]
+
+def test_extract_profile_is_admin_gated(monkeypatch):
+    files = {"file": ("resume.pdf", b"%PDF-1.4\n1 0 obj<</Type /Page>>endobj\n", "application/pdf")}
+    assert client.post("/extract?profile=1", files=files).status_code == 403
+    monkeypatch.setattr(main_mod.profiling, "PROFILE_TOKEN", "secret")
+    resp = client.post("/extract?profile=1", files=files, headers={"X-Profile-Token": "wrong"})
+    assert resp.status_code == 403
+
+    monkeypatch.setattr(main_mod, "extract_text", lambda path: "Jane Doe\njane@example.com\n\nSkills\nPython")
+    resp = client.post("/extract?profile=1&hot=5", files=files, headers={"X-Profile-Token": "secret"})
+    assert resp.status_code == 200
+    j = resp.json()
+    assert j["data"]["email"] == "jane@example.com"
+    report = j["profile"]
+    assert {"context", "entities", "contacts", "skills"} <= set(report["stages"])
+    assert (report["chars"], report["lines"], report["pages"]) == (40, 5, 1)
+    assert len(report["hot"]) == 5 and {"function", "calls", "self_ms"} <= set(report["hot"][0])
+    assert "profile" not in client.post("/extract", files=files).json()
+
+def test_extract_is_traced(monkeypatch):
+    from app import tracing
+
+    class Spans:
+        records = []
+
+        def write(self, records):
+            self.records.extend(records)
+
+    sink = Spans()
+    previous = tracing.configure(sink)
+    try:
+        monkeypatch.setattr(main_mod, "extract_text", lambda path: "Jane Doe\njane@example.com\n")
+        files = {"file": ("resume.pdf", b"%PDF-1.4\n%fake", "application/pdf")}
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        resp = client.post("/extract", files=files, headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+        assert resp.headers["X-Trace-Id"] == trace_id
+        bad = client.post("/extract", files={"file": ("resume.txt", b"plain text", "text/plain")})
+        assert bad.status_code == 400 and bad.headers["X-Trace-Id"] != trace_id
+        tracing._exporter.flush()
+    finally:
+        tracing._exporter = previous
+
+    spans = {s["name"]: s for s in sink.records if s["trace_id"] == trace_id}
+    assert {"POST /extract", "upload.read", "dispatch", "tempfile.write", "parse", "pipeline",
+            "stage.skills", "stage.entities", "serialize"} <= set(spans)
+    root = spans["POST /extract"]
+    assert root["parent_id"] is None and root["attributes"]["status"] == 200
+    assert spans["parse"]["parent_id"] == root["span_id"] and spans["parse"]["attributes"]["parser"] == "parse_pdf"
+    # The threaded NER stage still hangs off the pipeline span
+    assert spans["stage.entities"]["parent_id"] == spans["pipeline"]["span_id"]
+    failed = [s for s in sink.records if s["trace_id"] == bad.headers["X-Trace-Id"]]
+    assert any(s["name"] == "dispatch" and "UnsupportedFormatError" in s["error"] for s in failed)
+
+def test_otlp_round_trip():
+    from app.tracing import from_otlp, to_otlp
+    record = {"trace_id": "ab" * 16, "span_id": "cd" * 8, "parent_id": None, "name": "job",
+              "start_unix_ns": 1_700_000_000_000_000_000, "duration_ms": 2.5, "status": "error",
+              "error": "ValueError: bad", "attributes": {"n": 3, "ok": True, "parser": "parse_pdf"}}
+    assert from_otlp(to_otlp([record])) == [record]
+
+def test_extract_deadline_skips_optional_work(monkeypatch):
+    monkeypatch.setattr(main_mod, "extract_text", lambda path: "Jane Doe\njane@example.com\n\nSkills\nPython\n")
+    files = {"file": ("resume.pdf", b"%PDF-1.4\n%fake", "application/pdf")}
+    j = client.post("/extract?deadline_ms=0", files=files).json()
+    # The header answers name and location, so spaCy was never needed and is not listed
+    assert j["partial"] is True and j["skipped"] == ["skills.fuzzy"]
+    assert j["data"]["email"] == "jane@example.com" and j["data"]["skills"] == ["python"]
+    assert "partial" not in client.post("/extract?deadline_ms=60000", files=files).json()
+    monkeypatch.setattr(main_mod, "extract_text", lambda path: "jane@example.com\n\nSkills\nPython\n")
+    j = client.post("/extract?deadline_ms=0", files=files).json()
+    assert set(j["skipped"]) == {"stage.entities", "skills.fuzzy"}
+
+    # Deep queues impose DEGRADE_DEADLINE_MS on requests that did not bring a deadline
+    monkeypatch.setattr(main_mod.deadline, "DEGRADE_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(main_mod.deadline, "DEGRADE_DEADLINE_MS", 0)
+    monkeypatch.setattr(main_mod, "_in_flight", 1)
+    assert client.post("/extract", files=files).json()["partial"] is True
+
+def test_ready_reports_saturation(monkeypatch):
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    j = resp.json()
+    assert j["status"] == "ready" and j["reasons"] == []
+    assert {"model_loaded", "in_flight", "queue", "p95_ms"} <= set(j)
+
+    monkeypatch.setattr(main_mod, "_in_flight", main_mod.readiness.READY_MAX_IN_FLIGHT)
+    monkeypatch.setattr(main_mod.readiness, "READY_MAX_P95_MS", 100)
+    monkeypatch.setattr(main_mod, "LATENCY", main_mod.readiness.LatencyWindow(60))
+    for seconds in (0.05, 0.05, 2.0):
+        main_mod.LATENCY.add(seconds)
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    reasons = resp.json()["reasons"]
+    assert len(reasons) == 2 and "in flight" in reasons[0] and "p95 latency 2000 ms" in reasons[1]
+
+def test_latency_window_forgets_old_requests():
+    window = main_mod.readiness.LatencyWindow(seconds=0.05)
+    window.add(3.0)
+    assert window.percentile(95) == 3.0
+    import time
+    time.sleep(0.06)
+    assert window.percentile(95) is None
+
+def test_extract_stores_complete_results(monkeypatch, tmp_path):
+    from app.store import ResultStore
+    store = ResultStore(str(tmp_path / "results.db"))
+    monkeypatch.setattr(main_mod, "default_store", lambda: store)
+    monkeypatch.setattr(main_mod, "extract_text", lambda path: "Jane Doe\njane@example.com\n\nSkills\nPython\n")
+    files = {"file": ("resume.pdf", b"%PDF-1.4\nstored", "application/pdf")}
+    resp = client.post("/extract", files=files)
+    digest = resp.headers["X-Resume-Sha256"]
+    stored = client.get(f"/resumes/{digest}").json()
+    assert stored["filename"] == "resume.pdf" and stored["data"] == resp.json()["data"]
+    assert client.get("/resumes/" + "0" * 64).status_code == 404
+    # A partial result is returned but not stored
+    files = {"file": ("resume.pdf", b"%PDF-1.4\npartial", "application/pdf")}
+    resp = client.post("/extract?deadline_ms=0", files=files)
+    assert resp.json()["partial"] and "X-Resume-Sha256" not in resp.headers
+    assert store.count() == 1
+
+def test_stream_and_archive_results_are_stored(monkeypatch, tmp_path):
+    from app.store import ResultStore
+    store = ResultStore(str(tmp_path / "results.db"))
+    monkeypatch.setattr(main_mod, "default_store", lambda: store)
+    def extract_text(source, name=None):
+        if b"broken" in source:
+            raise ValueError("Unreadable PDF")
+        return source.decode().split("\n", 1)[1] + "\nSkills\nPython, Go\n"
+
+    monkeypatch.setattr(main_mod, "extract_text", extract_text)
+    client.post("/extract/stream", files={"file": ("resume.pdf", b"%PDF-1.4\nSam Lee", "application/pdf")})
+    archive = _zip({"kim.pdf": b"%PDF-1.4\nKim Park", "broken.pdf": b"%PDF-1.4\nbroken"})
+    lines = client.post("/extract/archive", files={"file": ("batch.zip", archive, "application/zip")}).text
+    assert json.loads(lines.splitlines()[-1])["errors"] == 1
+    assert store.count() == 2
+    assert sorted(r["filename"] for r in store.search("skill:go")) == ["kim.pdf", "resume.pdf"]
+
+def test_search_endpoint(monkeypatch, tmp_path):
+    from app.store import ResultStore
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.save("a" * 64, {"name": "Jane Doe", "skills": ["python", "kubernetes"], "experience": []})
+    monkeypatch.setattr(main_mod, "default_store", lambda: store)
+    resp = client.get("/search", params={"q": "python AND k8s"})
+    assert resp.status_code == 200
+    assert [r["name"] for r in resp.json()["results"]] == ["Jane Doe"]
+    assert client.get("/search", params={"q": "python AND"}).status_code == 400
+
+def test_rank_endpoint(monkeypatch, tmp_path):
+    from app.store import ResultStore
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.save("a" * 64, {"name": "Jane Doe", "skills": ["python", "kubernetes"], "experience": []})
+    store.save("b" * 64, {"name": "Sam Lee", "skills": ["react"], "experience": []})
+    monkeypatch.setattr(main_mod, "default_store", lambda: store)
+    resp = client.post("/rank", json={"job": "Python and Kubernetes engineer", "k": 5})
+    assert resp.status_code == 200
+    results = resp.json()["results"]
+    assert [r["name"] for r in results] == ["Jane Doe"] and results[0]["skills"] == ["kubernetes", "python"]
+    # Saved after the matrix was built: ranked without a rebuild
+    store.save("c" * 64, {"name": "Kim Park", "skills": ["python", "kubernetes", "go"], "experience": []})
+    assert len(client.post("/rank", json={"job": "Python and Kubernetes engineer"}).json()["results"]) == 2
+    assert client.post("/rank", json={"job": "python", "k": 0}).status_code == 422
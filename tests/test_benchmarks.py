@@ -0,0 +1,46 @@
+from app.pipeline import to_json
+from benchmarks.corpus import generate
+from benchmarks.suite import compare
+from parsers import parse_file
+
+def test_corpus_is_deterministic_and_extractable(tmp_path):
+    first = generate(str(tmp_path / "a"), count=3, formats=("pdf", "docx"))
+    second = generate(str(tmp_path / "b"), count=3, formats=("pdf", "docx"))
+    for a, b in zip(first, second):
+        with open(a["path"], "rb") as fa, open(b["path"], "rb") as fb:
+            assert fa.read() == fb.read()
+        data = to_json(parse_file(a["path"]))
+        assert (data["name"], data["email"]) == (a["name"], a["email"])
+        assert len(data["experience"]) == a["positions"]
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"stages": {"a": {"p50_ms": 10.0}, "b": {"p50_ms": 0.01}, "c": {"p50_ms": 10.0}},
+                "thresholds": {"c": 1.0}}
+    results = {"stages": {"a": {"p50_ms": 13.0}, "b": {"p50_ms": 0.03}, "c": {"p50_ms": 15.0},
+                          "new": {"p50_ms": 99.0}}}
+    # b tripled but stays under the noise floor; c is within its own looser threshold
+    assert [m.split(":")[0] for m in compare(results, baseline, threshold=0.25, floor_ms=0.05)] == ["a"]
+
+def test_loadtest_schedule_and_percentiles():
+    from benchmarks.loadtest import schedule, summarize
+    files = {"pdf": [("a.pdf", b"1"), ("b.pdf", b"2")], "docx": [("c.docx", b"3")]}
+    mix = {"pdf": 0.5, "docx": 0.5, "png": 1.0}
+    picks = schedule(files, mix, 50, seed=3)
+    assert picks == schedule(files, mix, 50, seed=3)
+    assert {fmt for fmt, _, _ in picks} == {"pdf", "docx"}
+    samples = [("pdf", 200, i / 1000) for i in range(1, 101)] + [("pdf", 500, 9.0), ("docx", 0, 1.0)]
+    report = summarize(samples, seconds=10)
+    assert report["pdf"]["p50_ms"] == 50.0 and report["pdf"]["p99_ms"] == 99.0
+    assert report["pdf"]["statuses"] == {"200": 100, "500": 1}
+    assert report["docx"]["error_rate"] == 1.0 and report["docx"]["p50_ms"] is None
+    assert report["all"]["requests"] == 102 and report["all"]["rps"] == 10.0
+
+def test_search_benchmark_store_and_queries(tmp_path):
+    from app.store import ResultStore
+    from benchmarks.bench_search import QUERIES, fill
+    store = ResultStore(str(tmp_path / "search.db"))
+    fill(store, 300, batch=100)
+    assert store.count() == 300 and fill(store, 300) == 0.0
+    assert store.search("python")
+    for query in QUERIES:
+        store.search(query)
@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+from app import cli
+from app.cli import extract, main
+from parsers import ParseTimeoutError
+from tests.fixtures import SAMPLES
+
+def _tree(tmp_path):
+    root = tmp_path / "resumes"
+    (root / "2019").mkdir(parents=True)
+    shutil.copy(os.path.join(SAMPLES, "Sample Resume 2.docx"), root / "2019" / "alex.docx")
+    (root / "notes.txt").write_text("not a resume")
+    return root
+
+def test_extract_writes_jsonl_and_resumes_from_checkpoint(tmp_path):
+    root, out = _tree(tmp_path), tmp_path / "out.jsonl"
+    counts = extract(str(root), str(out), str(out) + ".done", workers=0)
+    assert (counts["processed"], counts["errors"], counts["skipped"]) == (2, 1, 0)
+    records = {os.path.basename(r["path"]): r for r in map(json.loads, out.read_text().splitlines())}
+    assert records["alex.docx"]["data"]["name"] == "Alex Sample"
+    assert records["notes.txt"]["error"].startswith("UnsupportedFormatError")
+    # A moved file is recognised by its hash; only the new one is extracted
+    shutil.move(str(root / "2019" / "alex.docx"), str(root / "alex.docx"))
+    shutil.copy(os.path.join(SAMPLES, "sampleresume.pdf"), root / "hayden.pdf")
+    counts = extract(str(root), str(out), str(out) + ".done", workers=0)
+    assert (counts["processed"], counts["skipped"]) == (1, 2)
+    assert len(out.read_text().splitlines()) == 3
+
+def test_temporary_failures_are_retried(tmp_path, monkeypatch):
+    root, out = _tree(tmp_path), tmp_path / "out.jsonl"
+    parse_file = cli.parse_file
+
+    def slow(path):
+        raise ParseTimeoutError("Parsing timed out after 1s")
+
+    monkeypatch.setattr(cli, "parse_file", slow)
+    counts = extract(str(root), str(out), str(out) + ".done", workers=0)
+    assert (counts["processed"], counts["errors"]) == (2, 2)
+    # The unsupported file is done for good; the timed-out one is tried again
+    monkeypatch.setattr(cli, "parse_file", parse_file)
+    counts = extract(str(root), str(out), str(out) + ".done", workers=0)
+    assert (counts["processed"], counts["errors"], counts["skipped"]) == (1, 0, 1)
+
+def test_cli_runs_on_a_process_pool(tmp_path, capsys):
+    root, out = _tree(tmp_path), tmp_path / "out.jsonl"
+    main(["extract", str(root), "-o", str(out), "--workers", "2"])
+    assert len(out.read_text().splitlines()) == 2
+    assert "2/2 files (0 skipped, 1 errors)" in capsys.readouterr().err
+
+def test_extract_into_store_and_export(tmp_path, capsys):
+    root, out, db = _tree(tmp_path), tmp_path / "out.jsonl", tmp_path / "results.db"
+    main(["extract", str(root), "-o", str(out), "--workers", "0", "--db", str(db), "--batch", "1"])
+    main(["export", str(db), "-o", str(tmp_path / "resumes.jsonl")])
+    records = [json.loads(line) for line in (tmp_path / "resumes.jsonl").read_text().splitlines()]
+    assert [r["data"]["name"] for r in records] == ["Alex Sample"]
+    assert "1 results written" in capsys.readouterr().err
@@ -0,0 +1,163 @@
+from extractors.sections import find_sections, split_sections, lower_text
+from extractors.context import DocumentContext
+from extractors.education import extract_education
+from extractors.experience import extract_experience
+from extractors.fuzzy import bounded_distance
+from extractors.identity import guess_identity, guess_location
+from extractors.matcher import PhraseMatcher
+from extractors.patterns import extract_contacts, scan_contacts
+from extractors.skill_index import compile_index, load_index, taxonomy_digest
+from extractors.skills import build_matcher, extract_skills, load_taxonomy
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary
+Backend engineer.
+
+Skills
+Python, Docker
+SQL
+
+Experience
+Engineer at Acme
+Jan 2020 - Present
+"""
+
+def test_find_sections_returns_spans_over_original_text():
+    sections = find_sections(RESUME, lower_text(RESUME))
+    skills = sections["skills"]
+    assert skills.source is RESUME
+    assert skills.text == "Python, Docker\nSQL"
+    assert skills.lower == "python, docker\nsql"
+    assert sections["other"].text == "Jane Doe\njane@example.com"
+
+def test_split_sections_keeps_string_api():
+    sections = split_sections(RESUME)
+    assert sections["summary"] == "Backend engineer."
+    assert sections["experience"].startswith("Engineer at Acme")
+
+def test_split_sections_drops_blank_lines():
+    # Spans keep blank lines for block parsing; the string API and summary never did
+    assert split_sections("Summary\nfoo\n\n  \nbar\nSkills\nx")["summary"] == "foo\nbar"
+
+def test_repeated_header_restarts_section():
+    sections = split_sections("Skills\nJava\nSkills\nGo\n")
+    assert sections["skills"] == "Go"
+
+def test_extractors_accept_spans_and_strings():
+    span = find_sections(RESUME)["skills"]
+    assert extract_skills(span) == extract_skills(span.text) == ["docker", "python", "sql"]
+
+def test_document_context_shares_sections_and_blocks():
+    ctx = DocumentContext(RESUME)
+    assert ctx.folded == RESUME.casefold()
+    skills = ctx.section("technical skills", "skills")
+    assert skills.lines() == ["Python, Docker", "SQL"]
+    assert [b.text for b in ctx.document.blocks()][0] == "Jane Doe\njane@example.com"
+
+def test_experience_blocks_split_on_blank_lines():
+    ctx = DocumentContext("Experience\nDev at A\n2019 - 2020\n\nDev at B\n2020 - present\n")
+    items = extract_experience(ctx.section("experience"))
+    assert [(i["company"], i["start_date"]) for i in items] == [("A", "2019"), ("B", "2020")]
+
+def test_experience_segments_without_blank_lines():
+    items = extract_experience(
+        "Analyst – Chubb – Philadelphia, PA\tMarch 2018 - Oct. 2018\n"
+        "Logged reinsurance rates\n"
+        "Assistant | UACT\t12/2016 to 2018-02\n"
+        "Organized tours\n"
+    )
+    assert [(i["role"], i["company"], i["start_date"], i["end_date"], i["tenure_months"])
+            for i in items] == [("Analyst", "Chubb", "2018-03", "2018-10", 8),
+                                ("Assistant", "UACT", "2016-12", "2018-02", 15)]
+    assert items[1]["description"] == "Organized tours"
+
+def test_experience_header_below_bare_date_lines():
+    items = extract_experience(
+        "Dec 2016 – Mar 2017\nCanteen volunteer\n• Served customers.\n"
+        "2015 – 2016\nNewspaper deliverer\n• Delivered papers.\n"
+    )
+    assert [(i["role"], i["start_date"], i["tenure_months"]) for i in items] == [
+        ("Canteen volunteer", "2016-12", 4), ("Newspaper deliverer", "2015", 12)]
+
+def test_phrase_matcher_respects_word_boundaries():
+    matcher = PhraseMatcher()
+    for phrase in ("c", "c++", "java", "machine learning", "asp.net", ".net"):
+        matcher.add(phrase, phrase)
+    found = [m.value for m in matcher.find("c++ and javascript, asp.net; machine learning in c.")]
+    assert found == ["c++", "asp.net", "machine learning", "c"]
+
+def test_skills_found_anywhere_with_aliases():
+    ctx = DocumentContext("Summary\nProficient in Python and Docker, running k8s.\n\nSkills\nGo\n")
+    assert extract_skills(ctx.section("skills"), ctx.document) == ["docker", "go", "kubernetes", "python"]
+
+def test_ambiguous_skills_only_count_in_skills_section():
+    ctx = DocumentContext("Summary\nReady to go the extra mile.\n\nSkills\nJava\n")
+    assert extract_skills(ctx.section("skills"), ctx.document) == ["java"]
+    ctx = DocumentContext("Summary\nI excel at keeping a flask of coffee nearby.\n\nSkills\nJava, Flask\n")
+    assert extract_skills(ctx.section("skills"), ctx.document) == ["flask", "java"]
+
+def test_compiled_skill_index_matches_in_process_matcher(tmp_path):
+    tsv = tmp_path / "skills.tsv"
+    tsv.write_text("python\tlanguage\tpython3\t\ngo\tlanguage\tgolang\tsection\nkubernetes\tdevops\tk8s\t\n")
+    idx = str(tmp_path / "skills.idx")
+    version = compile_index(load_taxonomy(str(tsv)), idx, taxonomy_digest(str(tsv)))
+    mapped = load_index(idx)
+    text = "python3 services on k8s, written in golang; go"
+    assert mapped.version == version
+    assert mapped.find(text) == build_matcher(load_taxonomy(str(tsv))).find(text)
+    assert mapped.skill(0) == ("go", "language")
+
+def test_bounded_distance_counts_transposition_as_one_edit():
+    assert bounded_distance("pyhton", "python", 1) == 1
+    assert bounded_distance("kubernets", "kubernetes", 1) == 1
+    assert bounded_distance("docker", "python", 2) == 3
+
+def test_fuzzy_skills_resolve_ocr_typos():
+    ctx = DocumentContext("Skills\nPyhton, Kubernets, Postgrse, machine lerning\nscale, experience\n"
+                          "scalar, reacts, kotlins, javascripts, typescripts\n")
+    assert extract_skills(ctx.section("skills"), ctx.document) == []
+    assert extract_skills(ctx.section("skills"), ctx.document, fuzzy=True) == [
+        "kubernetes", "machine learning", "postgresql", "python"]
+
+def test_scan_contacts_single_pass_with_offsets():
+    text = "jane@example.com | +1 415-555-0100 | https://github.com/jane/12345678901\n"
+    contacts = scan_contacts(text)
+    assert [(c.kind, c.value) for c in contacts] == [
+        ("email", "jane@example.com"), ("phone", "+1 415-555-0100"),
+        ("url", "https://github.com/jane/12345678901")]
+    assert all(text[c.start:c.end] == c.value for c in contacts)
+
+def test_contacts_ignore_long_digit_runs():
+    text = "9" * 50000 + " ref 4155550100123456\nbob@example.org"
+    assert extract_contacts(text) == {"email": "bob@example.org", "phone": None, "links": []}
+
+def test_education_uses_degree_matcher_and_gazetteer():
+    items = extract_education(
+        "Bachelor of Science in business – Drexel University – Philadelphia, PA\tJune 2020\n\n"
+        "MS in Data Science, MIT, 2017 - 2018\n\n"
+        "Database Administration, Acme Training 2019\n\n"
+        "Diploma in Design – Springfield College of Art 2015 - 2016\n"
+    )
+    assert [(i["institution"], i["degree"], i["start_year"], i["end_year"]) for i in items] == [
+        ("Drexel University", "Bachelor of Science", "2020", "2020"),
+        ("Massachusetts Institute of Technology", "Master of Science", "2017", "2018"),
+        ("Springfield College of Art", "Diploma", "2015", "2016"),
+    ]
+
+def test_identity_guess_from_header_lines():
+    guess = guess_identity("ALEX SAMPLE\nData Analyst\nalex@example.com | (333) 222 1111\nDallas, TX 75025\n")
+    assert guess == ("Alex Sample", "Dallas, TX", 2) and guess.sufficient
+    # A job title is not a name, and without contact context nothing is trusted
+    guess = guess_identity("Senior Software Engineer\n\nSkills\nPython\n")
+    assert guess.name is None and not guess.sufficient
+
+def test_location_offsets_survive_casefold():
+    # "ß".casefold() is "ss"; the city must still be sliced from the right place
+    assert guess_location(["Hauptstraße 5 Berlin, Germany"]) == "Berlin, Germany"
+
+def test_lower_text_keeps_offsets():
+    text = "İstanbul Straße\nPython"
+    assert len(lower_text(text)) == len(text)
+    assert lower_text(text)[text.index("Python"):] == "python"
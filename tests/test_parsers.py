@@ -0,0 +1,121 @@
+import io
+import os
+import zipfile
+import pytest
+from PIL import Image
+from parsers import (InvalidDocumentError, ParseResourceError, ParseTimeoutError, SandboxPool,
+                     UnsupportedFormatError, parse_file, sniff)
+from parsers.registry import DOCX, PARSERS
+from tests.fixtures import EMPTY_PDF, ENCRYPTED_PDF, SAMPLES, balloon, spin
+
+def test_sniff_ignores_misleading_extensions(tmp_path):
+    with open(os.path.join(SAMPLES, "Sample Resume 2.docx"), "rb") as f:
+        docx = f.read()
+    mislabeled = tmp_path / "resume.pdf"
+    mislabeled.write_bytes(docx)
+    assert sniff(str(mislabeled)) == DOCX
+    assert "Alex Sample" in parse_file(str(mislabeled))
+    assert "Alex Sample" in parse_file(docx)
+    assert sniff(os.path.join(SAMPLES, "sampleresume.pdf")) == "application/pdf"
+    assert sniff(os.path.join(SAMPLES, "Simple-Sales-Manager-CV-Resume-1.jpg")) == "image/jpeg"
+
+def test_sniff_prefers_leading_signatures_over_embedded_pdf():
+    with zipfile.ZipFile(os.path.join(SAMPLES, "Sample Resume 2.docx")) as src:
+        parts = [(info, src.read(info)) for info in src.infolist()]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as out:
+        # A stored PDF as the first member puts %PDF- within the sniffed bytes
+        out.writestr(zipfile.ZipInfo("word/media/attachment.pdf"), EMPTY_PDF, zipfile.ZIP_STORED)
+        for info, data in parts:
+            out.writestr(info, data)
+    assert b"%PDF-" in buf.getvalue()[:1024]
+    assert sniff(buf.getvalue()) == DOCX
+    assert sniff(b"\x89PNG\r\n\x1a\n" + b"tEXt%PDF-1.4") == "image/png"
+    # Junk before the header is still a PDF
+    assert sniff(b"garbage\n" + EMPTY_PDF) == "application/pdf"
+
+@pytest.mark.parametrize("name, data, message", [
+    ("resume.doc", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(504), "legacy Word"),
+    ("resume.pdf", b"just some text", ".pdf"),
+])
+def test_unsupported_formats_are_named(tmp_path, name, data, message):
+    path = tmp_path / name
+    path.write_bytes(data)
+    with pytest.raises(UnsupportedFormatError, match=f"Unsupported file type: .*{message}"):
+        parse_file(str(path))
+
+@pytest.mark.parametrize("data, message", [
+    (EMPTY_PDF, "no pages"),
+    (ENCRYPTED_PDF, "password-protected"),
+])
+def test_invalid_pdfs_rejected_before_parsing(tmp_path, data, message):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(data)
+    with pytest.raises(InvalidDocumentError, match=message):
+        parse_file(str(path))
+
+def test_image_dimensions_checked_from_header(tmp_path):
+    path = tmp_path / "resume.png"
+    Image.new("L", (40, 40)).save(path)
+    with pytest.raises(InvalidDocumentError, match="too small"):
+        parse_file(str(path))
+
+@pytest.mark.parametrize("parse, cpu_seconds, error, message", [
+    (spin, 0, ParseTimeoutError, "timed out"),
+    (spin, 1, ParseResourceError, "SIGXCPU"),
+    (balloon, 0, ParseResourceError, "memory limit"),
+])
+def test_sandbox_contains_rogue_parsers(monkeypatch, parse, cpu_seconds, error, message):
+    timeout = 1 if error is ParseTimeoutError else 10
+    monkeypatch.setitem(PARSERS, "application/pdf", PARSERS["application/pdf"]._replace(timeout=timeout))
+    pool = SandboxPool(workers=1, memory_mb=512, cpu_seconds=cpu_seconds, parse=parse)
+    try:
+        with pytest.raises(error, match=message):
+            pool.parse(os.path.join(SAMPLES, "sampleresume.pdf"))
+    finally:
+        pool.close()
+
+def test_sandbox_reports_real_parser_out_of_memory():
+    # Enough to start the worker, not to lay out a PDF page
+    pool = SandboxPool(workers=1, memory_mb=150)
+    try:
+        with pytest.raises(ParseResourceError, match="memory limit"):
+            pool.parse(os.path.join(SAMPLES, "sampleresume.pdf"))
+    finally:
+        pool.close()
+
+def test_sandbox_recycles_workers():
+    pool = SandboxPool(workers=1, max_jobs=2)
+    path = os.path.join(SAMPLES, "Sample Resume 2.docx")
+    try:
+        pids = []
+        for _ in range(3):
+            assert "Alex Sample" in pool.parse(path)
+            worker = pool._idle.queue[0]
+            pids.append(worker.process.pid if worker else None)
+        # Retired after its second job, replaced by a fresh process on the third
+        assert pids[0] is not None and pids[1] is None and pids[2] not in (None, pids[0])
+    finally:
+        pool.close()
+
+def test_sandbox_reports_parse_memory():
+    pool = SandboxPool(workers=1, track_memory=True)
+    try:
+        usage = {}
+        assert "Alex Sample" in pool.parse(os.path.join(SAMPLES, "Sample Resume 2.docx"), info=usage)
+        assert usage["parser"] == "parse_docx" and usage["peak_bytes"] > 0
+        assert {"rss_delta_bytes", "base_bytes"} <= set(usage)
+    finally:
+        pool.close()
+
+def test_pdf_parse_stops_at_budget(tmp_path):
+    from benchmarks.corpus import write_pdf
+    from parsers.registry import parse_budget
+    path = str(tmp_path / "long.pdf")
+    write_pdf(path, [f"line {i}" for i in range(150)])
+    with parse_budget(None) as skipped:
+        assert "line 149" in parse_file(path) and skipped == []
+    with parse_budget(0) as skipped:
+        text = parse_file(path)
+    # The first page is always read
+    assert "line 59" in text and "line 60" not in text and skipped == ["pdf.pages 2-3"]
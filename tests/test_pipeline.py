@@ -0,0 +1,96 @@
+import threading
+import pytest
+import app.pipeline as pipeline
+from app.metrics import METRICS, Metrics
+from app.pipeline import RESUME_FIELDS, run_pipeline
+from app.registry import StageRegistry
+
+def test_stages_run_in_dependency_order():
+    registry = StageRegistry(Metrics(), workers=0)
+    registry.register("b", inputs=("a",), outputs=("b",))(lambda a: {"b": a + 1})
+    registry.register("a", inputs=("text",), outputs=("a",))(lambda text: {"a": len(text)})
+    values, timings = registry.run(text="abc")
+    assert values["b"] == 4
+    assert [s.name for s in registry.plan()] == ["a", "b"]
+    assert set(timings) == {"a", "b"}
+
+def test_bad_graphs_are_rejected():
+    registry = StageRegistry(Metrics(), workers=0)
+    registry.register("a", inputs=("b",), outputs=("a",))(lambda b: {})
+    registry.register("b", inputs=("a",), outputs=("b",))(lambda a: {})
+    with pytest.raises(ValueError, match="cycle"):
+        registry.plan()
+    registry.register("c", inputs=("missing",), outputs=("c",))(lambda missing: {})
+    with pytest.raises(ValueError, match="never produced"):
+        registry.plan()
+
+def test_threaded_stage_overlaps_inline_stages():
+    started = threading.Event()
+    registry = StageRegistry(Metrics(), workers=2)
+    # Only completes if the inline stage runs while the threaded one is waiting
+    registry.register("slow", inputs=("text",), outputs=("slow",), threaded=True)(
+        lambda text: {"slow": started.wait(timeout=5)})
+    registry.register("fast", inputs=("text",), outputs=("fast",))(
+        lambda text: started.set() or {"fast": True})
+    values, _ = registry.run(text="")
+    assert values["slow"] is True
+
+def test_run_pipeline_returns_fields_and_stage_timings():
+    data, timings = run_pipeline("Jane Doe\njane@example.com\n\nSkills\nPython\n")
+    assert tuple(data) == RESUME_FIELDS
+    assert data["email"] == "jane@example.com" and data["skills"] == ["python"]
+    assert {"context", "entities", "skills", "contacts"} <= set(timings)
+
+def test_summary_drops_blank_lines():
+    assert pipeline.to_json("Summary\nfoo\n\nbar\nSkills\nPython")["summary"] == "foo\nbar"
+
+def test_skills_after_non_ascii_text():
+    # "İ".lower() is two characters; later offsets must not shift
+    assert pipeline.to_json("İstanbul\nSkills\nPython, Go\n")["skills"] == ["go", "python"]
+
+def test_heuristic_tier_skips_ner(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pipeline, "extract_entities",
+                        lambda text: calls.append(text) or {"PERSON": ["Jim"], "ORG": [], "GPE": ["Ohio"], "DATE": []})
+    METRICS.reset()
+    data, _ = run_pipeline("Jane Doe\njane@example.com | Austin, TX\n")
+    assert (data["name"], data["location"]) == ("Jane Doe", "Austin, TX") and not calls
+    data, _ = run_pipeline("jane@example.com\n\nSkills\nPython\n")
+    assert (data["name"], data["location"]) == ("Jim", "Ohio") and len(calls) == 1
+    counters = METRICS.snapshot()["counters"]
+    assert counters["identity.tier.heuristic"] == 1 and counters["identity.tier.spacy"] == 1
+
+def test_spacy_outranks_weak_heuristic(monkeypatch):
+    entities = {"PERSON": ["Jim Beam"], "ORG": [], "GPE": [], "DATE": []}
+    monkeypatch.setattr(pipeline, "extract_entities", lambda text: entities)
+    text = "Quinn Harlow\nData Analyst\n\nSkills\nPython\n"
+    data, _ = run_pipeline(text)
+    assert (data["name"], data["location"]) == ("Jim Beam", None)
+    # Without a PERSON from spaCy the header guess is still better than nothing
+    entities["PERSON"] = []
+    data, _ = run_pipeline(text)
+    assert data["name"] == "Quinn Harlow"
+
+def test_memory_accounting_records_stages_and_budgets(monkeypatch, capsys):
+    import tracemalloc
+    from app import memory
+    monkeypatch.setattr(memory, "MEMORY_BUDGETS", {"stage.big": 1.0})
+    metrics = Metrics()
+    # Threaded stages run inline while measuring, or an inline stage's reset_peak would wipe theirs
+    registry = StageRegistry(metrics, workers=2, track_memory=True)
+    threads = []
+    registry.register("big", inputs=("text",), outputs=("big",), threaded=True)(
+        lambda text: threads.append(threading.current_thread()) or {"big": len(bytearray(4 << 20))})
+    registry.register("side", inputs=("text",), outputs=("side",))(lambda text: {"side": text})
+    registry.register("small", inputs=("big",), outputs=("small",))(lambda big: {"small": big})
+    try:
+        registry.run(text="")
+    finally:
+        tracemalloc.stop()
+    assert threads == [threading.main_thread()]
+    usage = metrics.snapshot()["memory"]
+    assert set(usage) == {"stage.big", "stage.side", "stage.small", "pipeline"}
+    assert usage["stage.big"]["peak_mb_max"] >= 4 and usage["stage.big"]["over_budget"] == 1
+    assert usage["stage.small"]["peak_mb_max"] < 1 and usage["stage.small"]["over_budget"] == 0
+    assert usage["pipeline"]["peak_mb_max"] >= 4
+    assert "stage.big used" in capsys.readouterr().out
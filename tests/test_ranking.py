@@ -0,0 +1,35 @@
+from app.ranking import TfidfIndex
+from benchmarks.bench_rank import JOB, loop_ranker
+from benchmarks.bench_search import synthetic_resumes
+
+def _resume(skills, role="Engineer", description=None):
+    return {"skills": skills, "experience": [{"role": role, "description": description}]}
+
+def test_rank_orders_by_similarity_and_lists_matched_skills():
+    index = TfidfIndex()
+    index.add_many([
+        ("devops", _resume(["kubernetes", "python", "aws"], "Platform Engineer", "Ran clusters")),
+        ("web", _resume(["react", "javascript"], "Frontend Developer")),
+        ("data", _resume(["python", "sql"], "Data Analyst")),
+    ])
+    ranked = index.rank("Platform engineer with Python and k8s", k=5)
+    assert [r.key for r in ranked] == ["devops", "data"]
+    assert ranked[0].skills == ["kubernetes", "python"] and ranked[0].score > ranked[1].score
+    assert index.rank("nothing in common", k=5) == []
+
+def test_updates_match_a_fresh_build():
+    resumes = list(synthetic_resumes(400))
+    index = TfidfIndex(capacity=16)
+    index.add_many((key, data) for key, data, _ in resumes[:300])
+    index.rank(JOB)
+    # Rows added after the CSC copy are scored from the tail; replaced and removed rows drop out
+    index.add_many((key, data) for key, data, _ in resumes[300:])
+    index.add(resumes[0][0], resumes[1][1])
+    for key, _, _ in resumes[100:250]:
+        index.remove(key)
+    live = [(resumes[0][0], resumes[1][1], None)] + resumes[1:100] + resumes[250:]
+    fresh = TfidfIndex()
+    fresh.add_many((key, data) for key, data, _ in live)
+    assert len(index) == len(fresh) == 250
+    assert [r.key for r in index.rank(JOB, 10)] == [r.key for r in fresh.rank(JOB, 10)]
+    assert [r.key for r in fresh.rank(JOB, 10)] == loop_ranker(fresh, live)(JOB, 10)
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import pytest
+from app.store import ResultStore, export
+
+RESUME = {
+    "name": "Jane Doe", "email": "jane@example.com", "phone": None, "location": "Berlin",
+    "links": ["https://github.com/jane"], "summary": "Engineer",
+    "skills": ["python", "sql"],
+    "experience": [{"company": "Acme", "role": "Engineer", "start_date": "2019-01", "end_date": "present",
+                    "tenure_months": 40, "description": None}],
+    "education": [{"institution": "TU Berlin", "degree": "BSc", "start_year": "2014", "end_year": "2018"}],
+    "certifications": [],
+}
+
+def test_store_round_trips_and_replaces(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    other = dict(RESUME, name="John Roe", skills=["go"], experience=[], education=[])
+    assert store.save_many([("a" * 64, RESUME, "jane.pdf"), ("b" * 64, other, "john.pdf")]) == 2
+    assert store.get("a" * 64)["data"] == RESUME
+    assert store.with_skill("python") == ["a" * 64]
+    # Storing the same file again replaces its rows, children included
+    store.save("a" * 64, dict(RESUME, skills=["rust"]), "jane.pdf")
+    assert store.count() == 2 and store.with_skill("python") == []
+    assert store._conn.execute("SELECT COUNT(*) FROM experience").fetchone()[0] == 1
+
+def test_repeated_hash_in_one_batch(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.save("a" * 64, RESUME, "jane.pdf")
+    # Two copies of one file in a batch, as a bulk run over duplicated folders produces
+    copy = dict(RESUME, skills=["rust"])
+    assert store.save_many([("a" * 64, RESUME, "one/jane.pdf"), ("a" * 64, copy, "two/jane.pdf")]) == 1
+    assert store.count() == 1 and store.get("a" * 64)["data"] == copy
+    assert [r["sha256"] for r in store.search("rust")] == ["a" * 64] and store.search("python") == []
+    assert store._conn.execute("SELECT COUNT(*) FROM experience").fetchone()[0] == 1
+    assert store._conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+
+def test_export_jsonl_in_batches(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.save_many((f"{i:064x}", dict(RESUME, name=f"N{i}"), None) for i in range(5))
+    out = tmp_path / "resumes.jsonl"
+    assert export(store, str(out), batch_size=2) == 5
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["data"]["name"] for r in records] == [f"N{i}" for i in range(5)]
+
+def test_search_boolean_fields_and_years(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    devops = dict(RESUME, skills=["kubernetes", "python"],
+                  experience=[{"company": "Acme", "role": "Platform Engineer", "start_date": "2015-01",
+                               "end_date": "2021-12", "description": "Ran clusters"}])
+    junior = dict(RESUME, name="Sam Lee", skills=["python", "c++"],
+                  experience=[{"company": "Initech", "role": "Intern", "start_date": "2021-01",
+                               "end_date": "2021-06", "description": None}])
+    store.save_many([("a" * 64, devops, None), ("b" * 64, junior, None)])
+    found = lambda q: [r["sha256"][0] for r in store.search(q)]
+    assert found("python") == ["b", "a"]
+    assert found("python AND k8s, 5+ years") == ["a"]
+    assert found("skill:python NOT role:intern") == ["a"]
+    assert found("c++ OR company:acme") == ["b", "a"]
+    assert found("role:plat* years:0-1") == []
+    assert found("years:0-1") == ["b"] and found("years:2-7") == ["a"]
+    assert found("text:clusters") == ["a"]
+    assert store.search("years:6+")[0]["experience_years"] == 7.0
+    # Replacing a result drops its old postings
+    store.save("a" * 64, dict(devops, skills=["go"]))
+    assert found("kubernetes") == []
+    for bad in ("NOT java", "(python", "foo:bar", "python OR years:3+", "years:5-2"):
+        with pytest.raises(ValueError):
+            store.search(bad)
+
+def test_store_from_before_search_is_indexed_on_open(tmp_path):
+    path = str(tmp_path / "results.db")
+    ResultStore(path).save("a" * 64, RESUME)
+    conn = sqlite3.connect(path)
+    conn.executescript("DROP TABLE resume_text; PRAGMA user_version = 0;")
+    conn.close()
+    assert [r["sha256"] for r in ResultStore(path).search("skill:sql")] == ["a" * 64]